@@ -0,0 +1,235 @@
+"""Benchmarks for easyargs.
+
+Synthetic functions and classes are generated with a configurable number of
+methods and arguments and the following phases are timed:
+
+- decorate: applying the easyargs decorator
+- build: create_base_parser plus function_parser / class_parser
+- build_lazy: as build, but using the lazy class parser
+- parse: handle_parser parsing argv and dispatching to the function
+- help: rendering the -h output
+
+Results are written as JSON so that two runs can be compared:
+
+    $ python benchmarks/bench_easyargs.py run --output before.json
+    $ python benchmarks/bench_easyargs.py run --output after.json
+    $ python benchmarks/bench_easyargs.py compare before.json after.json
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import platform
+import sys
+import timeit
+
+# Allow the benchmarks to be run from a source checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import easyargs  # noqa: E402
+from easyargs import parsers  # noqa: E402
+
+
+def make_function(num_args, name='synthetic', method=False):
+    """Generates a function taking num_args arguments.  The arguments cycle
+    through the kinds that easyargs understands: positional, int, float and
+    string options and flags.  If method is True a self argument is added."""
+    params = []
+    doc = ['A synthetic function with {n} arguments', '']
+    for idx in range(num_args):
+        kind = idx % 5
+        if kind == 0:
+            params.append('p{i}'.format(i=idx))
+        elif kind == 1:
+            params.append('count{i}=1'.format(i=idx))
+        elif kind == 2:
+            params.append('ratio{i}=0.5'.format(i=idx))
+        elif kind == 3:
+            params.append('name{i}="value"'.format(i=idx))
+        else:
+            params.append('flag{i}=False'.format(i=idx))
+        doc.append(':param {p}: help for argument {i}'.format(p=params[-1].split('=')[0], i=idx))
+
+    # Positional arguments must come before the ones with defaults
+    params.sort(key=lambda param: '=' in param)
+    if method:
+        params.insert(0, 'self')
+    source = 'def {name}({params}):\n    """{doc}"""\n    return None\n'.format(
+        name=name, params=', '.join(params), doc='\n    '.join(doc).format(n=num_args))
+
+    namespace = {}
+    exec(source, namespace)
+    return namespace[name]
+
+
+def make_class(num_methods, num_args):
+    """Generates a class with num_methods public methods, each taking
+    num_args arguments"""
+    members = {'__doc__': 'A synthetic class with {n} methods'.format(n=num_methods)}
+    for idx in range(num_methods):
+        function = make_function(num_args, name='command{i}'.format(i=idx), method=True)
+        members[function.__name__] = function
+
+    klass = type('Synthetic', (object,), members)
+    return klass
+
+
+def sample_argv(num_args):
+    """Returns an argv that supplies every argument of make_function(num_args)"""
+    positional = []
+    optional = []
+    for idx in range(num_args):
+        kind = idx % 5
+        if kind == 0:
+            positional.append('value{i}'.format(i=idx))
+        elif kind == 1:
+            optional += ['--count{i}'.format(i=idx), str(idx)]
+        elif kind == 2:
+            optional += ['--ratio{i}'.format(i=idx), '1.5']
+        elif kind == 3:
+            optional += ['--name{i}'.format(i=idx), 'other']
+        else:
+            optional.append('--flag{i}'.format(i=idx))
+    return positional + optional
+
+
+def build_function_parser(function):
+    parser = parsers.create_base_parser(function)
+    parsers.function_parser(function, parser)
+    return parser
+
+
+def build_class_parser(klass, lazy=False):
+    parser = parsers.create_base_parser(klass)
+    parsers.class_parser(klass(), parser, lazy=lazy)
+    return parser
+
+
+def handle(parser, argv):
+    saved_argv = sys.argv
+    sys.argv = ['bench'] + argv
+    try:
+        return parsers.handle_parser(parser)
+    finally:
+        sys.argv = saved_argv
+
+
+def measure(statement, repeat):
+    """Returns the best and mean time, in seconds, of a single call"""
+    timer = timeit.Timer(statement)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return min(times), sum(times) / len(times)
+
+
+def benchmark_function(num_args):
+    function = make_function(num_args)
+    parser = build_function_parser(function)
+    argv = sample_argv(num_args)
+
+    yield 'decorate', lambda: easyargs(function)
+    yield 'build', lambda: build_function_parser(function)
+    yield 'parse', lambda: handle(parser, argv)
+    yield 'help', parser.format_help
+
+
+def benchmark_class(num_methods, num_args):
+    klass = make_class(num_methods, num_args)
+    parser = build_class_parser(klass)
+    command = 'command{i}'.format(i=num_methods - 1)
+    argv = [command] + sample_argv(num_args)
+
+    yield 'decorate', lambda: easyargs(klass)
+    yield 'build', lambda: build_class_parser(klass)
+    yield 'build_lazy', lambda: build_class_parser(klass, lazy=True)
+    yield 'parse', lambda: handle(parser, argv)
+    yield 'help', parser.format_help
+
+
+def parse_sizes(sizes):
+    return [int(size) for size in str(sizes).split(',') if size]
+
+
+@easyargs
+class Benchmarks(object):
+    """Benchmarks for easyargs"""
+
+    def run(self, output=None, args='1,10,100', methods='1,10,100,1000', method_args='1,10', repeat=5):
+        """
+        Run the benchmarks and write the results as JSON
+        :param output: File to write the results to, defaults to stdout
+        :param args: Comma separated argument counts for the function benchmarks
+        :param methods: Comma separated method counts for the class benchmarks
+        :param method_args: Comma separated argument counts for each method
+        :param repeat: Number of times each measurement is repeated
+        """
+        cases = []
+        for num_args in parse_sizes(args):
+            cases.append(({'kind': 'function', 'methods': 0, 'args': num_args},
+                          benchmark_function(num_args)))
+
+        for num_methods in parse_sizes(methods):
+            for num_args in parse_sizes(method_args):
+                cases.append(({'kind': 'class', 'methods': num_methods, 'args': num_args},
+                              benchmark_class(num_methods, num_args)))
+
+        results = []
+        for case, benchmarks in cases:
+            for phase, statement in benchmarks:
+                best, mean = measure(statement, repeat)
+                result = dict(case, phase=phase, best=best, mean=mean)
+                results.append(result)
+                print('{kind:8} methods={methods:<5} args={args:<4} {phase:10} {best:.6f}s'.format(**result),
+                      file=sys.stderr)
+
+        report = {
+            'easyargs': easyargs.__version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'results': results,
+        }
+        if output is None:
+            json.dump(report, sys.stdout, indent=2, sort_keys=True)
+            print()
+        else:
+            with open(output, 'w') as output_file:
+                json.dump(report, output_file, indent=2, sort_keys=True)
+        return 0
+
+    def compare(self, baseline, current, threshold=0.1):
+        """
+        Compare two benchmark results, exits non zero if anything regressed
+        :param baseline: The results to compare against
+        :param current: The new results
+        :param threshold: Allowed slow down as a fraction of the baseline
+        """
+        with open(baseline) as baseline_file:
+            before = json.load(baseline_file)['results']
+        with open(current) as current_file:
+            after = json.load(current_file)['results']
+
+        def key(result):
+            return result['kind'], result['methods'], result['args'], result['phase']
+
+        before = dict((key(result), result) for result in before)
+        regressions = 0
+        for result in after:
+            previous = before.get(key(result))
+            if previous is None:
+                continue
+
+            change = result['best'] / previous['best'] - 1
+            marker = ''
+            if change > threshold:
+                marker = '  REGRESSION'
+                regressions += 1
+            print('{0:8} methods={1:<5} args={2:<4} {3:10} {4:.6f}s -> {5:.6f}s {6:+.1%}{7}'.format(
+                result['kind'], result['methods'], result['args'], result['phase'],
+                previous['best'], result['best'], change, marker))
+
+        return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(Benchmarks())
@@ -1,8 +1,36 @@
-from . import decorators, parsers
+from . import decorators
+from .version import __version__
 import sys
+import types
 
-# This bit of magic allows us to use the module name as a decorator
-decorators.make_easy_args.parsers = parsers
-decorators.make_easy_args.decorators = decorators
+# Submodules that are attributes of the package, but are only imported the
+# first time that they are used to keep 'import easyargs' cheap
+_LAZY_SUBMODULES = ('parsers',)
 
-sys.modules[__name__] = decorators.make_easy_args
+
+class _EasyArgsModule(types.ModuleType):
+    """The easyargs package, which can also be used as a decorator.  Python 2
+    clears the globals of the module that this replaces, so the methods only
+    use the attributes of the replacement."""
+
+    def __call__(self, *args, **kwargs):
+        return self.decorators.make_easy_args(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name not in self.__dict__.get('_LAZY_SUBMODULES', ()):
+            raise AttributeError("module {m!r} has no attribute {n!r}".format(m=self.__name__, n=name))
+
+        import importlib
+        # Importing the submodule also sets it as an attribute of the package
+        return importlib.import_module('.' + name, self.__name__)
+
+
+# This bit of magic allows us to use the module name as a decorator.  The
+# package name, path and spec are kept on the replacement so that submodules,
+# e.g. 'from easyargs import parsers', can still be imported.
+_module = _EasyArgsModule(__name__, decorators.make_easy_args.__doc__)
+_module.__dict__.update((name, value) for name, value in globals().items()
+                        if name not in ('__doc__', '_module'))
+_module.invoke = decorators.invoke
+
+sys.modules[__name__] = _module
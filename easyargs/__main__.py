@@ -0,0 +1,124 @@
+"""Command line tools for programs that use easyargs
+
+    python -m easyargs serve module:main --socket /tmp/main.sock
+    python -m easyargs completion module:main --shell zsh
+    python -m easyargs compile module:main -o cli_generated.py
+"""
+from __future__ import print_function
+
+import sys
+
+import easyargs
+
+
+@easyargs
+class EasyArgs(object):
+    """Tools for programs that use easyargs"""
+
+    def serve(self, target, socket='easyargs.sock', shim=None, prog=None):
+        """
+        Serve a decorated entry point from a warm, pre-forked process
+        :param target: The decorated object, given as module:name
+        :param socket: Path of the Unix socket to listen on
+        :param shim: Write a shell script to this path that runs commands on the server
+        :param prog: Program name shown in usage messages, defaults to name
+        """
+        from easyargs import server, targets
+
+        entry = targets.load_target(target)
+        if prog is None:
+            prog = target.partition(':')[2]
+
+        if shim is not None:
+            server.write_shim(shim, socket)
+
+        def ready():
+            print('easyargs: serving {t} on {s}'.format(t=target, s=socket), file=sys.stderr)
+
+        try:
+            server.serve(entry, socket, prog=prog, ready=ready)
+        except server.ServerError as error:
+            print('easyargs: {e}'.format(e=error), file=sys.stderr)
+            return 2
+        except KeyboardInterrupt:
+            pass
+
+    def compile(self, target, o=None, check=False):
+        """
+        Write a plain argparse module for a decorated entry point, so that it
+        is not inspected at run time
+        :param target: The decorated object, given as module:name
+        :param o: Write the module to this file instead of stdout
+        :param check: Exit with status 1 if the file is out of date instead of writing it
+        """
+        from easyargs import compiler, targets
+
+        entry = targets.load_target(target)
+        try:
+            targets.check_static(entry, 'compile', defaults=True)
+        except ValueError as error:
+            print('easyargs: {e}'.format(e=error), file=sys.stderr)
+            return 2
+
+        source = compiler.generate(targets.target_spec(entry), target,
+                                   getattr(entry, 'dispatch_options', None),
+                                   getattr(entry, 'output_options', None))
+
+        if check:
+            if o is None:
+                print('easyargs: --check needs the file to check, given with -o', file=sys.stderr)
+                return 2
+            try:
+                with open(o) as f:
+                    current = f.read()
+            except IOError:
+                current = None
+            if current != source:
+                print('easyargs: {o} is out of date, run python -m easyargs compile {t} -o {o}'.format(
+                    o=o, t=target), file=sys.stderr)
+                return 1
+            return None
+
+        if o is None:
+            sys.stdout.write(source)
+        else:
+            with open(o, 'w') as f:
+                f.write(source)
+
+    def completion(self, target, shell='bash', prog=None, output=None):
+        """
+        Write a static shell completion script for a decorated entry point
+        :param target: The decorated object, given as module:name
+        :param shell: The shell to complete for, bash, zsh or fish
+        :param prog: The command to complete, defaults to name
+        :param output: Write the script to this file instead of stdout
+        """
+        from easyargs import completion, targets
+
+        if shell not in completion.SHELLS:
+            print('easyargs: unknown shell {s!r}, use one of {c}'.format(
+                s=shell, c=', '.join(completion.SHELLS)), file=sys.stderr)
+            return 2
+
+        entry = targets.load_target(target)
+        try:
+            targets.check_static(entry, 'completion')
+        except ValueError as error:
+            print('easyargs: {e}'.format(e=error), file=sys.stderr)
+            return 2
+
+        spec = targets.target_spec(entry)
+        if prog is None:
+            prog = target.partition(':')[2]
+        script = completion.completion_script(spec, prog, shell)
+
+        if output is None:
+            sys.stdout.write(script)
+        else:
+            with open(output, 'w') as f:
+                f.write(script)
+
+
+if __name__ == '__main__':
+    sys.argv[0] = 'python -m easyargs'
+    sys.exit(EasyArgs())
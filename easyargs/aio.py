@@ -0,0 +1,86 @@
+"""asyncio support.
+
+Coroutine functions and methods can be decorated like any other function.
+When one is selected on the command line it is run to completion on a new
+event loop, which uses uvloop if it is installed.  Set EASYARGS_UVLOOP=0 to
+always use the default asyncio loop.
+
+run_many and gather dispatch a number of command lines to a decorated object
+concurrently within the current process."""
+import asyncio
+import os
+
+from . import dispatch
+
+
+def new_event_loop():
+    """Returns a new event loop, using uvloop when it is available"""
+    if os.environ.get('EASYARGS_UVLOOP', '1') != '0':
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            return uvloop.new_event_loop()
+
+    return asyncio.new_event_loop()
+
+
+def run(awaitable):
+    """Runs awaitable on a new event loop and returns its result"""
+    loop = new_event_loop()
+    try:
+        return loop.run_until_complete(awaitable)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+
+async def call(function, args, map_over=None, workers=None, executor='thread'):
+    """Like dispatch.call, but a coroutine is awaited on the running loop
+    rather than run on a new one"""
+    if getattr(function, 'easyargs_deferred', False):
+        function = function.bind()
+
+    if map_over is not None and map_over in args:
+        return dispatch.call(function, args, map_over, workers, executor)
+
+    try:
+        result = function(**args)
+        if dispatch.is_awaitable(result):
+            result = await result
+    except BaseException:
+        dispatch.release(args)
+        raise
+
+    return dispatch.finish(result, args)
+
+
+async def gather(entry, argvs, concurrency=10, return_exceptions=False):
+    """Dispatches every argv in argvs to the decorated object entry, with at
+    most concurrency commands running at once.  Returns the results in the
+    same order as argvs.
+
+    Every argv is parsed before anything is run, so a usage error raises
+    SystemExit straight away.  If return_exceptions is True, exceptions raised
+    by the commands are returned in place of their results."""
+    commands = [entry.parse_command(list(argv)) for argv in argvs]
+    options = getattr(entry, 'dispatch_options', {})
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_command(function, args):
+        if function is None:
+            return None
+
+        async with semaphore:
+            return await call(function, args, **options)
+
+    return await asyncio.gather(*[run_command(function, args) for function, args in commands],
+                                return_exceptions=return_exceptions)
+
+
+def run_many(entry, argvs, concurrency=10, return_exceptions=False):
+    """Synchronous version of gather, runs the commands on a new event loop"""
+    return run(gather(entry, argvs, concurrency, return_exceptions))
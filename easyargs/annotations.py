@@ -0,0 +1,224 @@
+"""Argument types taken from annotations:
+
+    @easyargs
+    def main(path: Path, level: Level = Level.INFO, mode: Literal['fast', 'safe'] = 'fast',
+             retries: Optional[int] = None, ids: list[int] = None, lines: Stream = '-'):
+        ...
+
+int, float, str, bool, pathlib paths, Enum classes, Literal, Optional, lists
+of any of these and the types in easyargs.argtypes are understood.  Any other
+class is called with the value, as argparse does with type=.
+
+annotation_params works out the argparse params for an annotation once and
+caches them.  The converters used as type= are made at the same time, e.g.
+Choices and EnumType build their lookup tables up front, so parsing a value
+is a single call without looking at the annotation again."""
+import argparse
+
+from . import argtypes
+
+TRUE_VALUES = frozenset(['1', 'true', 'yes', 'on'])
+FALSE_VALUES = frozenset(['0', 'false', 'no', 'off', ''])
+
+# Parameters worked out for each annotation
+_params_cache = {}
+
+
+class Converter(object):
+    """Base for the type= callables made for annotations.  The arguments an
+    instance is made with are kept as public attributes, so that the compiler
+    can write it out, and anything worked out from them is private."""
+
+    def __repr__(self):
+        arguments = ', '.join('{k}={v!r}'.format(k=key, v=value)
+                              for key, value in sorted(vars(self).items())
+                              if not key.startswith('_'))
+        return '{c}({a})'.format(c=type(self).__name__, a=arguments)
+
+
+class Boolean(Converter):
+    """Converts yes / no, true / false, on / off and 1 / 0 to a bool"""
+
+    def __call__(self, value):
+        lowered = value.strip().lower()
+        if lowered in TRUE_VALUES:
+            return True
+        if lowered in FALSE_VALUES:
+            return False
+        raise argparse.ArgumentTypeError('invalid boolean value: {v!r}'.format(v=value))
+
+
+class Choices(Converter):
+    """Converts a value to one of values, as given to Literal"""
+
+    def __init__(self, values):
+        self.values = tuple(values)
+        self._lookup = dict((str(choice), choice) for choice in self.values)
+
+    @property
+    def metavar(self):
+        return '{' + ','.join(str(choice) for choice in self.values) + '}'
+
+    def __call__(self, value):
+        try:
+            return self._lookup[value]
+        except KeyError:
+            raise argparse.ArgumentTypeError('invalid choice: {v!r} (choose from {c})'.format(
+                v=value, c=', '.join(repr(str(choice)) for choice in self.values)))
+
+
+class EnumType(Converter):
+    """Converts the name, or the value, of a member of enum to the member"""
+
+    def __init__(self, enum):
+        self.enum = enum
+        self._lookup = {}
+        for member in enum:
+            self._lookup.setdefault(str(member.value), member)
+        # Names win over values
+        self._lookup.update(enum.__members__)
+
+    @property
+    def metavar(self):
+        return '{' + ','.join(self.enum.__members__) + '}'
+
+    def __call__(self, value):
+        try:
+            return self._lookup[value]
+        except KeyError:
+            raise argparse.ArgumentTypeError('invalid choice: {v!r} (choose from {c})'.format(
+                v=value, c=', '.join(repr(name) for name in self.enum.__members__)))
+
+
+def _typing_forms():
+    """Returns (Literal forms, Union forms) of the installed typing modules"""
+    literals, unions = [], []
+    modules = []
+    for name in ('typing', 'typing_extensions'):
+        try:
+            modules.append(__import__(name))
+        except ImportError:
+            pass
+
+    for module in modules:
+        for forms, form_name in ((literals, 'Literal'), (unions, 'Union')):
+            form = getattr(module, form_name, None)
+            if form is not None and form not in forms:
+                forms.append(form)
+
+    # int | None on Python 3.10 and later
+    import types
+    union_type = getattr(types, 'UnionType', None)
+    if union_type is not None:
+        unions.append(union_type)
+    return literals, unions
+
+
+def _origin(annotation):
+    import typing
+    get_origin = getattr(typing, 'get_origin', None)
+    if get_origin is not None:
+        return get_origin(annotation)
+    return getattr(annotation, '__origin__', None)
+
+
+def _arguments(annotation):
+    import typing
+    get_args = getattr(typing, 'get_args', None)
+    if get_args is not None:
+        return get_args(annotation)
+    return getattr(annotation, '__args__', None) or ()
+
+
+def _is_enum(annotation):
+    try:
+        import enum
+    except ImportError:
+        return False
+    return isinstance(annotation, type) and issubclass(annotation, enum.Enum)
+
+
+def _is_path(annotation):
+    try:
+        import pathlib
+    except ImportError:
+        return False
+    return isinstance(annotation, type) and issubclass(annotation, pathlib.PurePath)
+
+
+def _type_params(annotation):
+    """Returns the params for a single value of type annotation, or None"""
+    if annotation is str:
+        return {}
+    if annotation is bool:
+        return {'type': Boolean()}
+    if annotation in (int, float) or _is_path(annotation):
+        return {'type': annotation}
+    if _is_enum(annotation):
+        converter = EnumType(annotation)
+        return {'type': converter, 'metavar': converter.metavar}
+
+    argument_type = argtypes.argument_type(annotation)
+    if argument_type is not None:
+        return {'type': argument_type}
+
+    origin = _origin(annotation)
+    if origin is None:
+        # Any other class converts the value itself, typing.Any does not
+        if isinstance(annotation, type) and annotation.__module__ != 'typing':
+            return {'type': annotation}
+        return None
+
+    literals, unions = _typing_forms()
+    if origin in literals:
+        converter = Choices(_arguments(annotation))
+        return {'type': converter, 'metavar': converter.metavar}
+    return None
+
+
+def _params(annotation):
+    literals, unions = _typing_forms()
+    params = {}
+
+    # Optional[X] is Union[X, None]
+    origin = _origin(annotation)
+    if origin in unions:
+        arguments = [argument for argument in _arguments(annotation) if argument is not type(None)]
+        if len(arguments) != 1:
+            return {}
+        params['optional'] = True
+        annotation = arguments[0]
+        origin = _origin(annotation)
+
+    if annotation is list or origin is list:
+        items = _arguments(annotation)
+        item_params = _type_params(items[0]) if items else {}
+        if item_params is None:
+            return {}
+        params.update(item_params)
+        params['nargs'] = '+'
+        return params
+
+    type_params = _type_params(annotation)
+    if type_params is None:
+        return {}
+    params.update(type_params)
+    return params
+
+
+def annotation_params(annotation):
+    """Returns the argparse params for an argument annotated with annotation,
+    e.g. {'type': int}.  'optional' is True for Optional annotations, and
+    lists have 'nargs' set to '+'.  Annotations that are not understood give
+    {}.  The result is cached and must not be modified."""
+    if annotation is None:
+        return {}
+
+    try:
+        return _params_cache[annotation]
+    except KeyError:
+        params = _params_cache[annotation] = _params(annotation)
+        return params
+    except TypeError:
+        # Unhashable annotations are not cached
+        return _params(annotation)
@@ -0,0 +1,315 @@
+"""Argument types that hand the function an open file instead of a value.
+
+These are used as default values, in the same way as int and float:
+
+    from easyargs.argtypes import Stream
+
+    @easyargs
+    def main(lines=Stream, _words=Stream(buffering=1 << 20)):
+        for line in lines:
+            ...
+
+Stream iterates over the lines of a file and MappedFile maps the file into
+memory.  The argument is positional.  Its value on the command line is a path,
+or '-' for stdin.  An optional Stream, whose name starts with '_', reads stdin
+by default.  Files are only opened when the function first uses them, and dispatch.call closes
+them once the function returns."""
+import argparse
+import io
+import os
+import stat
+import sys
+
+STDIN = '-'
+
+
+class Resource(object):
+    """An argument value that holds an open file.  dispatch.release closes
+    every Resource that was passed to a function."""
+
+    easyargs_resource = True
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    @property
+    def is_stdin(self):
+        return self.path == STDIN
+
+    def _open(self):
+        raise NotImplementedError
+
+    @property
+    def file(self):
+        """The open file, opened on first use"""
+        if self._file is None:
+            self._file = self._open()
+        return self._file
+
+    def close(self):
+        file, self._file = self._file, None
+        if file is not None and not self.is_stdin:
+            file.close()
+
+    def __getstate__(self):
+        # Open files cannot be pickled, e.g. for a process pool, so the copy
+        # opens its own when it is first used
+        state = dict(self.__dict__)
+        state['_file'] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '{c}({p!r})'.format(c=type(self).__name__, p=self.path)
+
+
+class ArgumentType(object):
+    """Base for the default values that select a Resource.  Instances are
+    used as the argparse type, so they convert a path to a Resource."""
+
+    # The value used when an optional argument is not given
+    optional_default = None
+
+    def check(self, path):
+        """Reports a path that cannot be opened while the command line is
+        parsed, rather than when the function first uses it.  Returns the
+        result of os.stat, or None for stdin."""
+        if path == STDIN:
+            return None
+        try:
+            return os.stat(path)
+        except OSError as error:
+            raise _type_error("can't open '{p}': {e}".format(p=path, e=error.strerror))
+
+
+def _type_error(message):
+    import argparse
+    return argparse.ArgumentTypeError(message)
+
+
+class LineStream(Resource):
+    """Iterates over the lines of a file, or stdin, without reading it all"""
+
+    def __init__(self, path, buffering=-1, encoding=None, errors=None, binary=False,
+                 keep_ends=False):
+        super(LineStream, self).__init__(path)
+        self.buffering = buffering
+        self.encoding = encoding
+        self.errors = errors
+        self.binary = binary
+        self.keep_ends = keep_ends
+
+    def _open(self):
+        mode = 'rb' if self.binary else 'r'
+        encoding = None if self.binary else self.encoding
+        errors = None if self.binary else self.errors
+
+        if not self.is_stdin:
+            return io.open(self.path, mode, self.buffering, encoding, errors)
+
+        stdin = getattr(sys.stdin, 'buffer', sys.stdin) if self.binary else sys.stdin
+        if self.buffering == -1 and encoding is None and errors is None:
+            return stdin
+        # Reopen the descriptor to honour the requested buffering
+        return io.open(stdin.fileno(), mode, self.buffering, encoding, errors, closefd=False)
+
+    def __iter__(self):
+        if self.keep_ends:
+            for line in self.file:
+                yield line
+            return
+
+        newline = b'\n' if self.binary else '\n'
+        for line in self.file:
+            if line.endswith(newline):
+                line = line[:-1]
+            yield line
+
+
+class Stream(ArgumentType):
+    """Passes the function a lazy iterator over the lines of a file, or stdin
+    for '-'.  buffering, encoding and errors are passed to io.open, binary
+    yields bytes, keep_ends keeps the line endings."""
+
+    optional_default = STDIN
+
+    def __init__(self, buffering=-1, encoding=None, errors=None, binary=False, keep_ends=False):
+        self.buffering = buffering
+        self.encoding = encoding
+        self.errors = errors
+        self.binary = binary
+        self.keep_ends = keep_ends
+
+    def __call__(self, path):
+        self.check(path)
+        return LineStream(path, self.buffering, self.encoding, self.errors, self.binary,
+                          self.keep_ends)
+
+
+class MappedView(Resource):
+    """A read-only memory map of a file.  It is indexed and sliced like
+    bytes, the other methods of mmap.mmap can be used and view is a
+    memoryview of the file.  Nothing is mapped until it is first used, and
+    pages are only read from the file when they are touched."""
+
+    def __init__(self, path):
+        super(MappedView, self).__init__(path)
+        self._view = None
+
+    def _open(self):
+        import mmap
+
+        if self.is_stdin:
+            fileno = sys.stdin.fileno()
+        else:
+            source = io.open(self.path, 'rb')
+            fileno = source.fileno()
+
+        try:
+            if os.fstat(fileno).st_size == 0:
+                # Empty files cannot be mapped
+                return b''
+            # The map keeps its own duplicate of the descriptor
+            return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        finally:
+            if not self.is_stdin:
+                source.close()
+
+    @property
+    def view(self):
+        """A read-only memoryview of the whole file"""
+        if self._view is None:
+            self._view = memoryview(self.file)
+        return self._view
+
+    def close(self):
+        view, self._view = self._view, None
+        if view is not None and hasattr(view, 'release'):
+            view.release()
+
+        mapped, self._file = self._file, None
+        if mapped is None or isinstance(mapped, bytes):
+            return
+        try:
+            mapped.close()
+        except BufferError:
+            # The function kept a slice of the view, the map is closed once
+            # that is garbage collected
+            pass
+
+    def __getstate__(self):
+        state = super(MappedView, self).__getstate__()
+        state['_view'] = None
+        return state
+
+    def __len__(self):
+        return len(self.file)
+
+    def __getitem__(self, key):
+        return self.file[key]
+
+    def __getattr__(self, name):
+        # Only called for names that are not found, e.g. find or readline
+        if name.startswith('__') or name in ('_file', '_view', 'path'):
+            raise AttributeError(name)
+        return getattr(self.file, name)
+
+
+class MappedFile(ArgumentType):
+    """Passes the function a MappedView of a file instead of its contents.
+    '-' maps stdin, which must be redirected from a regular file."""
+
+    def check(self, path):
+        if path == STDIN:
+            status = os.fstat(sys.stdin.fileno())
+        else:
+            status = super(MappedFile, self).check(path)
+
+        if not stat.S_ISREG(status.st_mode):
+            raise _type_error("can't map '{p}': not a regular file".format(p=path))
+
+    def __call__(self, path):
+        self.check(path)
+        return MappedView(path)
+
+
+def _use_numpy():
+    if os.environ.get('EASYARGS_NUMPY') == '0':
+        return None
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class _ArrayAction(argparse.Action):
+    """Stores the values of a typed list argument, e.g. [int], as a numpy
+    array if numpy is installed, otherwise as an array.array.  All of the
+    values are converted in one step instead of one at a time."""
+
+    item_type = None
+    typecode = None
+
+    def convert(self, values):
+        numpy = _use_numpy()
+        if numpy is not None:
+            return numpy.array(values, dtype=self.item_type)
+
+        import array
+        return array.array(self.typecode, [self.item_type(value) for value in values])
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        try:
+            converted = self.convert(values)
+        except (ValueError, TypeError, OverflowError):
+            # Find the value to report
+            for value in values:
+                try:
+                    self.convert([value])
+                except (ValueError, TypeError, OverflowError):
+                    break
+            parser.error('argument {d}: invalid {t} value: {v!r}'.format(
+                d=self.metavar or self.dest, t=self.item_type.__name__, v=value))
+        setattr(namespace, self.dest, converted)
+
+
+class IntArrayAction(_ArrayAction):
+    item_type = int
+    # array.array has no 64 bit typecode on Python 2
+    typecode = 'q' if sys.version_info >= (3, 3) else 'l'
+
+
+class FloatArrayAction(_ArrayAction):
+    item_type = float
+    typecode = 'd'
+
+
+ARRAY_ACTIONS = {int: IntArrayAction, float: FloatArrayAction}
+
+
+def array_action(default_value):
+    """Returns the action for a typed list default value, e.g. [int], or None"""
+    if isinstance(default_value, list) and len(default_value) == 1:
+        try:
+            return ARRAY_ACTIONS.get(default_value[0])
+        except TypeError:
+            # Unhashable item
+            return None
+    return None
+
+
+def argument_type(default_value):
+    """Returns the ArgumentType for a default value, or None.  Both the class
+    and an instance can be used as a default."""
+    if isinstance(default_value, type) and issubclass(default_value, ArgumentType):
+        return default_value()
+    if isinstance(default_value, ArgumentType):
+        return default_value
+    return None
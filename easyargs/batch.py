@@ -0,0 +1,77 @@
+"""Batch mode: runs many command lines through a single parser.
+
+Each line of the input is split like a shell command line and dispatched
+through handle_parser, so the parser, and the class instance for class based
+commands, are only built once for the whole batch.  Blank lines and comments
+starting with # are skipped.
+
+The exit status of each line is written to the report stream as
+'<line number>\\t<status>'.  A line's status is the value returned by the
+function if it is an int, 0 if it returned anything else, the code passed to
+sys.exit (argparse uses 2 for errors, as does a line that cannot be split)
+or 1 if an exception was raised."""
+from __future__ import print_function
+
+import shlex
+import sys
+import traceback
+
+from . import parsers
+from .dispatch import combine_statuses, exit_status
+
+
+def run_line(parser, argv, **options):
+    """Runs a single argv through handle_parser, returns its exit status"""
+    try:
+        return exit_status(parsers.handle_parser(parser, argv, **options))
+    except SystemExit as exit:
+        if exit.code is None:
+            return 0
+        if isinstance(exit.code, int):
+            return exit.code
+        print(exit.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def run(parser, lines, report=None, **options):
+    """Runs every command line in lines, returns the list of exit statuses.
+    options are passed on to handle_parser."""
+    if report is None:
+        report = sys.stderr
+
+    statuses = []
+    for line_number, line in enumerate(lines, 1):
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as error:
+            # e.g. an unclosed quote, which is a usage error for the line
+            print('line {n}: {e}'.format(n=line_number, e=error), file=sys.stderr)
+            status = 2
+        else:
+            if not argv:
+                continue
+            status = run_line(parser, argv, **options)
+
+        statuses.append(status)
+        print('{n}\t{s}'.format(n=line_number, s=status), file=report)
+        report.flush()
+
+    return statuses
+
+
+def run_source(parser, source, report=None, **options):
+    """Runs the command lines in the file called source, or stdin if source
+    is '-'.  Returns the combined exit status."""
+    if source == '-':
+        return combine_statuses(run(parser, sys.stdin, report, **options))
+
+    try:
+        lines = open(source)
+    except (IOError, OSError) as error:
+        parser.error("can't open batch file {s!r}: {e}".format(s=source, e=error.strerror))
+
+    with lines:
+        return combine_statuses(run(parser, lines, report, **options))
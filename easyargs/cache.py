@@ -0,0 +1,307 @@
+"""Caching of the parsers that easyargs builds for decorated objects.
+
+This module is imported when an object is decorated, so only cheap modules
+are imported at the top level.  The on disk cache imports what it needs when
+it is used."""
+import contextlib
+import operator
+import os
+import sys
+
+from .version import __version__
+
+
+def cache_key(obj):
+    """Works out a key that changes whenever the decorated object is redefined.
+
+    For functions this is the code object and the docstring.  For classes it is
+    the docstring of the class plus the names and values of the attributes of
+    every class in the hierarchy.  The values are compared by identity, so
+    adding, removing or replacing a method changes the key, but changing a
+    method in place, e.g. its docstring, needs cache_clear."""
+    code = getattr(obj, '__code__', None)
+    if code is not None:
+        return code, obj.__doc__
+
+    members = [obj.__doc__]
+    for klass in getattr(obj, '__mro__', ()):
+        if klass is not object:
+            namespace = vars(klass)
+            members.extend(namespace)
+            members.extend(namespace.values())
+    return tuple(members)
+
+
+def same_key(key, other):
+    """Returns True if the two keys returned by cache_key hold the same
+    objects.  Only identities are compared, so class attributes with an
+    unusual __eq__ are never called."""
+    if key is None or other is None or len(key) != len(other):
+        return False
+    return all(map(operator.is_, key, other))
+
+
+class ParserCache(object):
+    """Stores what is built for a decorated object, e.g. its parser, so that
+    repeated calls to the decorated object do not have to inspect it again.
+
+    Each value is made by the builder registered under its name the first time
+    it is asked for.  Everything is rebuilt whenever the key returned by
+    cache_key changes, or after clear has been called.  Working out the key
+    walks every class in the hierarchy, so a call to the decorated object
+    checks it once, see checked, rather than for every value it asks for."""
+
+    def __init__(self, obj, build=None, **builders):
+        import threading
+        self.obj = obj
+        self._builders = builders
+        if build is not None:
+            self._builders['parser'] = build
+        self._key = None
+        self._values = {}
+        self._local = threading.local()
+
+    def _check_key(self):
+        if getattr(self._local, 'checked', False):
+            return
+
+        key = cache_key(self.obj)
+        if not same_key(key, self._key):
+            self._values = {}
+            self._key = key
+
+    @contextlib.contextmanager
+    def checked(self):
+        """Checks the key once, then uses the cached values without checking
+        it again until the end of the with block on this thread"""
+        if getattr(self._local, 'checked', False):
+            yield
+            return
+
+        self._check_key()
+        self._local.checked = True
+        try:
+            yield
+        finally:
+            self._local.checked = False
+
+    def get(self, name):
+        """Returns the cached value called name, building it if needed"""
+        self._check_key()
+        try:
+            return self._values[name]
+        except KeyError:
+            value = self._values[name] = self._builders[name]()
+            return value
+
+    def has(self, name):
+        """Returns True if the value called name has already been built"""
+        self._check_key()
+        return name in self._values
+
+    def variant(self, name, key, build):
+        """Returns a variant of the value called name, made by calling build.
+        Only the variant for the latest key is kept, and it is discarded along
+        with everything else."""
+        self._check_key()
+        cached = self._values.get((name, 'variant'))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        value = build()
+        self._values[(name, 'variant')] = key, value
+        return value
+
+    def parser(self):
+        """Returns the cached parser, building it if needed"""
+        return self.get('parser')
+
+    def clear(self):
+        """Discards everything that has been cached"""
+        self._key = None
+        self._values = {}
+
+
+def default_cache_dir():
+    """Returns the directory used for the on disk cache.  This can be set with
+    the EASYARGS_CACHE_DIR environment variable."""
+    directory = os.environ.get('EASYARGS_CACHE_DIR')
+    if directory:
+        return directory
+
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'easyargs')
+
+
+def source_file(obj):
+    """Returns the file that obj was defined in, or None if it cannot be found"""
+    code = getattr(obj, '__code__', None)
+    if code is not None:
+        filename = code.co_filename
+    else:
+        module = sys.modules.get(getattr(obj, '__module__', None))
+        filename = getattr(module, '__file__', None)
+
+    if filename is None or not os.path.isfile(filename):
+        return None
+
+    return os.path.abspath(filename)
+
+
+def source_files(obj):
+    """Returns the files that obj, and for a class every class that it
+    inherits from, were defined in"""
+    files = []
+    for item in getattr(obj, '__mro__', (obj,)):
+        if item is object:
+            continue
+        path = source_file(item)
+        if path is not None and path not in files:
+            files.append(path)
+    return files
+
+
+def _modification_times(files):
+    """Returns a (path, mtime) pair for each file, or None if one is missing"""
+    try:
+        return [(path, os.stat(path).st_mtime) for path in files]
+    except OSError:
+        return None
+
+
+class DiskCache(object):
+    """Stores a value built for a decorated object on disk so that a new
+    process does not have to build it again.
+
+    An entry is only used if the source files of the object and of the
+    classes it inherits from, and any other files it was saved with, have
+    the same modification times and the easyargs version matches.
+    Subclasses set the suffix of the cache files, and key can tell apart
+    values that depend on more than the object."""
+
+    suffix = '.cache'
+
+    def __init__(self, obj, directory=None, key=''):
+        self.obj = obj
+        self.directory = directory or default_cache_dir()
+        self.key = key
+
+    def _source(self):
+        path = source_file(self.obj)
+        if path is None:
+            return None, None
+
+        try:
+            return path, os.stat(path).st_mtime
+        except OSError:
+            return None, None
+
+    def _cache_file(self, path):
+        import hashlib
+        name = getattr(self.obj, '__qualname__', self.obj.__name__)
+        key = '{p}:{m}.{n}'.format(p=path, m=self.obj.__module__, n=name)
+        if self.key:
+            key += ':' + self.key
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + self.suffix)
+
+    def load(self):
+        """Returns the cached value, or None if there is no valid entry"""
+        path, mtime = self._source()
+        if path is None:
+            return None
+
+        import pickle
+        try:
+            with open(self._cache_file(path), 'rb') as cache_file:
+                entry = pickle.load(cache_file)
+        except Exception:
+            # A missing or unreadable entry is the same as a cache miss
+            return None
+
+        if (entry.get('path'), entry.get('mtime'), entry.get('version')) != (path, mtime, __version__):
+            return None
+
+        files = entry.get('files', [])
+        if _modification_times([name for name, modified in files]) != files:
+            return None
+
+        return entry.get('value')
+
+    def save(self, value, files=()):
+        """Writes value to the cache.  files are other source files that value
+        depends on.  Failures are ignored, the cache is only an
+        optimisation."""
+        path, mtime = self._source()
+        if path is None:
+            return
+
+        import pickle
+        import tempfile
+
+        depends = [name for name in source_files(self.obj) + list(files) if name != path]
+        modified = _modification_times(sorted(set(depends)))
+        if modified is None:
+            return
+
+        entry = {'path': path, 'mtime': mtime, 'files': modified, 'version': __version__,
+                 'value': value}
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            handle, temp_name = tempfile.mkstemp(dir=self.directory)
+        except OSError:
+            return
+
+        # Write to a temporary file first so that readers never see a
+        # partially written entry
+        try:
+            with os.fdopen(handle, 'wb') as cache_file:
+                pickle.dump(entry, cache_file, pickle.HIGHEST_PROTOCOL)
+            os.rename(temp_name, self._cache_file(path))
+        except Exception:
+            try:
+                os.remove(temp_name)
+            except OSError:
+                pass
+
+
+class SpecCache(DiskCache):
+    """Stores the spec of a decorated object, see parsers.object_spec"""
+
+    suffix = '.spec'
+
+    def __init__(self, obj, directory=None):
+        super(SpecCache, self).__init__(obj, directory)
+
+
+class HelpCache(DiskCache):
+    """Stores the rendered help of a decorated object, as a dict from the
+    path of sub command names, e.g. () or ('clone',), to the text printed for
+    -h.  argparse puts the program name in the help and wraps it to the
+    width of the terminal, so both are part of the key.  So are the entry
+    points in the plugins group, and the source files of the command groups
+    are saved with the help, see easyargs.groups."""
+
+    suffix = '.help'
+
+    def __init__(self, obj, directory=None, prog=None, columns=None, plugins=None):
+        if prog is None:
+            prog = os.path.basename(sys.argv[0])
+        if columns is None:
+            columns = terminal_columns()
+        key = '{p}:{c}'.format(p=prog, c=columns)
+        if plugins:
+            from . import groups
+            key += ':' + groups.plugins_key(plugins)
+        super(HelpCache, self).__init__(obj, directory, key)
+
+
+def terminal_columns():
+    """Returns the terminal width that argparse will wrap the help text to"""
+    try:
+        import shutil
+        return shutil.get_terminal_size().columns
+    except (ImportError, AttributeError):
+        # Python 2's argparse only looks at $COLUMNS
+        return os.environ.get('COLUMNS')
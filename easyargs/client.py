@@ -0,0 +1,82 @@
+"""Client for the easyargs warm server.
+
+    python client.py SOCKET [ARGS...]
+
+Sends ARGS, the current directory and the environment to the server that is
+listening on SOCKET, along with this process' stdin, stdout and stderr, so
+that the command's output goes straight to them.  The client then exits with
+the command's exit status.
+
+This file only uses the standard library and does not import easyargs, so it
+can be run directly by path with 'python -S' for the fastest start up."""
+import os
+import socket
+import struct
+import sys
+
+# Must match easyargs.server
+HEADER = struct.Struct('!I')
+STATUS = struct.Struct('!i')
+
+
+def _encode(value):
+    if isinstance(value, bytes):
+        return value
+    return os.fsencode(value)
+
+
+def encode_request(argv, cwd, environ):
+    """Packs the request as NUL separated fields: the current directory, the
+    number of arguments, the arguments and then the environment as key=value"""
+    fields = [_encode(cwd), str(len(argv)).encode('ascii')]
+    fields.extend(_encode(arg) for arg in argv)
+    fields.extend(_encode(key) + b'=' + _encode(value) for key, value in environ.items())
+    return b'\0'.join(fields)
+
+
+def _receive_exactly(connection, size):
+    data = b''
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def run(socket_path, argv, fds=(0, 1, 2)):
+    """Runs argv on the server listening at socket_path, returns the exit
+    status of the command"""
+    payload = encode_request(argv, os.getcwd(), os.environ)
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+        ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, struct.pack('3i', *fds))]
+        connection.sendmsg([HEADER.pack(len(payload))], ancillary)
+        connection.sendall(payload)
+
+        status = _receive_exactly(connection, STATUS.size)
+    finally:
+        connection.close()
+
+    if status is None:
+        # The server went away before the command finished
+        return 1
+    return STATUS.unpack(status)[0]
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.stderr.write('usage: client.py SOCKET [ARGS...]\n')
+        return 2
+
+    try:
+        return run(sys.argv[1], sys.argv[2:])
+    except socket.error as error:
+        sys.stderr.write('easyargs client: cannot reach {s}: {e}\n'.format(s=sys.argv[1], e=error))
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
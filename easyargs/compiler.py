@@ -0,0 +1,151 @@
+"""Ahead of time compilation of a decorated object to a plain argparse module.
+
+    python -m easyargs compile module:main -o cli_generated.py
+
+The generated module builds the same parser as easyargs, straight from the
+spec, so running it never inspects the target or parses docstrings.  It
+imports the target to call it, and easyargs.dispatch so that commands behave
+in the same way.  generate is deterministic: the module is stale whenever
+generating it again gives different source."""
+from __future__ import print_function
+
+from .version import __version__
+
+# Types that can be named in the generated code without an import
+BUILTIN_TYPES = (int, float, str, bool, list, tuple, dict)
+
+
+class _Imports(object):
+    """The imports needed by the generated module, as name -> statement"""
+
+    def __init__(self):
+        self.statements = {}
+
+    def add(self, module, name, alias=None):
+        alias = alias or name
+        statement = 'from {m} import {n}'.format(m=module, n=name)
+        if alias != name:
+            statement += ' as ' + alias
+        if self.statements.setdefault(alias, statement) != statement:
+            raise ValueError('{a} is imported from two places'.format(a=alias))
+        return alias
+
+
+def _expression(value, imports):
+    """Returns python source that evaluates to value"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        items = [_expression(item, imports) for item in value]
+        if isinstance(value, tuple):
+            return '(' + ', '.join(items) + (',)' if len(items) == 1 else ')')
+        return '[' + ', '.join(items) + ']'
+    if isinstance(value, type):
+        if value in BUILTIN_TYPES:
+            return value.__name__
+        return imports.add(value.__module__, value.__name__)
+
+    import enum
+    if isinstance(value, enum.Enum):
+        cls = type(value)
+        return '{c}.{n}'.format(c=imports.add(cls.__module__, cls.__name__), n=value.name)
+
+    from . import annotations, argtypes
+    if isinstance(value, (argtypes.ArgumentType, annotations.Converter)):
+        # These keep the arguments they were made with as public attributes
+        cls = type(value)
+        name = imports.add(cls.__module__, cls.__name__)
+        arguments = ', '.join('{k}={v}'.format(k=key, v=_expression(item, imports))
+                              for key, item in sorted(vars(value).items())
+                              if not key.startswith('_'))
+        return '{n}({a})'.format(n=name, a=arguments)
+
+    raise ValueError('{v!r} cannot be written to a compiled module'.format(v=value))
+
+
+def _add_arguments(lines, parser_name, spec, imports, indent='    '):
+    for arg_name, params in spec['arguments']:
+        arguments = [repr(arg_name)]
+        arguments += ['{k}={v}'.format(k=key, v=_expression(value, imports))
+                      for key, value in sorted(params.items())]
+        lines.append('{i}{p}.add_argument({a})'.format(i=indent, p=parser_name,
+                                                       a=', '.join(arguments)))
+
+
+def generate(spec, target, options=None, output=None):
+    """Returns the source of a module that parses the command line for spec
+    and calls target, given as 'module:name'.  options are passed to
+    dispatch.call and output to output.stream_result."""
+    module_name, _, name = target.partition(':')
+    imports = _Imports()
+    imports.add('easyargs', 'dispatch')
+    imports.add('easyargs', 'output')
+
+    is_class = 'commands' in spec
+    body = [
+        'def build_parser(target):',
+        '    """Returns the parser for the command line of target{i}"""'.format(
+            i=', a dispatch.Instance' if is_class else ''),
+        '    parser = argparse.ArgumentParser(description={d})'.format(d=repr(spec['description'])),
+    ]
+    if is_class:
+        body.append("    subparsers = parser.add_subparsers(help='sub-command help')")
+        for command, help_text, command_spec in spec['commands']:
+            body += [
+                '',
+                '    command = subparsers.add_parser({c}, help={h})'.format(c=repr(command),
+                                                                          h=repr(help_text)),
+                '    command.set_defaults(func=target.method({c}))'.format(c=repr(command)),
+            ]
+            _add_arguments(body, 'command', command_spec, imports)
+    else:
+        body.append('    parser.set_defaults(func=target)')
+        _add_arguments(body, 'parser', spec, imports)
+    body += ['    return parser']
+
+    def dict_expression(values):
+        items = ', '.join('{k}: {v}'.format(k=repr(key), v=_expression(value, imports))
+                          for key, value in sorted((values or {}).items()))
+        return '{' + items + '}'
+    lines = [
+        '# Generated by easyargs {v} from {t}, do not edit.'.format(v=__version__, t=target),
+        '# Regenerate with: python -m easyargs compile {t} -o FILE'.format(t=target),
+        'import argparse',
+        'import sys',
+        '',
+        'import {m} as _module'.format(m=module_name),
+    ]
+    lines += sorted(imports.statements.values())
+    lines += [
+        '',
+        '# The decorated object, the undecorated one is called',
+        '_target = _module.{n}'.format(n=name),
+        "_target = getattr(_target, '__wrapped__', _target)",
+        '',
+        '# Options for dispatch.call',
+        'OPTIONS = {o}'.format(o=dict_expression(options)),
+        '',
+        '# Options for writing the records of a generator, see output.write_records',
+        'OUTPUT = {o}'.format(o=dict_expression(output)),
+        '',
+        '',
+    ]
+    lines += body
+    lines += [
+        '',
+        '',
+        'def main(argv=None):',
+        '    """Parses argv, or sys.argv, and calls the selected function.  If it',
+        '    returns an iterator, the records are written to stdout."""',
+        '    target = {t}'.format(t='dispatch.Instance(_target)' if is_class else '_target'),
+        '    args = vars(build_parser(target).parse_args(argv))',
+        "    function = args.pop('func', None)",
+        '    if function is None:',
+        '        return None',
+        '    return output.stream_result(dispatch.call(function, args, **OPTIONS), OUTPUT)',
+        '',
+        '',
+        "if __name__ == '__main__':",
+        '    sys.exit(dispatch.exit_status(main()))',
+    ]
+    return '\n'.join(lines) + '\n'
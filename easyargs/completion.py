@@ -0,0 +1,248 @@
+"""Static shell completion scripts generated from a spec.
+
+    python -m easyargs completion module:main --shell bash > main.bash
+
+The script lists every sub command and option up front, so completing a word
+only runs the shell's own code and never starts python.  Values of options
+and positional arguments fall back to the shell's file name completion."""
+import re
+
+SHELLS = ('bash', 'zsh', 'fish')
+HELP_OPTIONS = ('-h', '--help')
+HELP_TEXT = 'show this help message and exit'
+
+
+class _Option(object):
+    """An option string of a command, with whether it takes a value"""
+
+    def __init__(self, option_string, help_text, takes_value):
+        self.option_string = option_string
+        self.help = help_text
+        self.takes_value = takes_value
+
+    @property
+    def short(self):
+        return not self.option_string.startswith('--')
+
+
+class _Command(object):
+    """The options and positional arguments of a function spec"""
+
+    def __init__(self, spec):
+        self.options = [_Option(option, HELP_TEXT, False) for option in HELP_OPTIONS]
+        self.positionals = []
+        for arg_name, params in spec['arguments']:
+            help_text = _first_line(params.get('help'))
+            if arg_name.startswith('-'):
+                takes_value = params.get('action') in (None, 'store')
+                self.options.append(_Option(arg_name, help_text, takes_value))
+            else:
+                self.positionals.append((params.get('metavar', arg_name), params.get('nargs'),
+                                         help_text))
+
+    @property
+    def value_options(self):
+        return [option.option_string for option in self.options if option.takes_value]
+
+
+def _first_line(text):
+    if not text:
+        return ''
+    return text.strip().splitlines()[0].strip()
+
+
+def _function_name(prog):
+    return '_easyargs_' + re.sub(r'\W', '_', prog)
+
+
+def _commands(spec):
+    """Returns (root command, [(name, help, command)]) for a spec"""
+    if 'commands' not in spec:
+        return _Command(spec), []
+    root = _Command({'arguments': []})
+    return root, [(name, _first_line(help_text), _Command(command_spec))
+                  for name, help_text, command_spec in spec['commands']]
+
+
+def bash_script(spec, prog):
+    root, commands = _commands(spec)
+    function = _function_name(prog)
+
+    def words(command, names=()):
+        return ' '.join([option.option_string for option in command.options] + list(names))
+
+    lines = [
+        '# bash completion for {p}, generated by easyargs'.format(p=prog),
+        '{f}() {{'.format(f=function),
+        '    local cur="${COMP_WORDS[COMP_CWORD]}" prev="${COMP_WORDS[COMP_CWORD-1]}"',
+        '    local command="" words="" values="" i',
+    ]
+
+    if commands:
+        lines += [
+            '    for ((i = 1; i < COMP_CWORD; i++)); do',
+            '        case "${COMP_WORDS[i]}" in',
+            '            -*) ;;',
+            '            *) command="${COMP_WORDS[i]}"; break ;;',
+            '        esac',
+            '    done',
+            '    case "$command" in',
+            '        "") words="{w}" ;;'.format(w=words(root, [name for name, _, _ in commands])),
+        ]
+        for name, _, command in commands:
+            lines.append('        {n}) words="{w}"; values="{v}" ;;'.format(
+                n=name, w=words(command), v=' '.join(command.value_options)))
+        lines.append('    esac')
+    else:
+        lines.append('    words="{w}"; values="{v}"'.format(w=words(root),
+                                                          v=' '.join(root.value_options)))
+
+    lines += [
+        '    # The value of an option, or a positional argument: complete file names',
+        '    case " $values " in *" $prev "*) return ;; esac',
+    ]
+    if commands:
+        lines.append('    if [[ -n "$command" && "$cur" != -* ]]; then return; fi')
+    else:
+        lines.append('    if [[ "$cur" != -* ]]; then return; fi')
+    lines += [
+        '    COMPREPLY=($(compgen -W "$words" -- "$cur"))',
+        '}',
+        'complete -o default -F {f} {p}'.format(f=function, p=prog),
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def _zsh_quote(text):
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
+def _zsh_description(text):
+    return re.sub(r'([\[\]:\\])', r'\\\1', text)
+
+
+def _zsh_arguments(command, indent):
+    specs = ["'(- *)'{-h,--help}'[" + HELP_TEXT + "]'"]
+    for option in command.options[len(HELP_OPTIONS):]:
+        spec = option.option_string
+        if option.takes_value:
+            spec += '=' if not option.short else '+'
+        spec += '[' + _zsh_description(option.help) + ']'
+        if option.takes_value:
+            spec += ':' + option.option_string.lstrip('-') + ':_default'
+        specs.append(_zsh_quote(spec))
+
+    for name, nargs, help_text in command.positionals:
+        description = _zsh_description(help_text or name)
+        if nargs in ('*', '+'):
+            specs.append(_zsh_quote('*:' + description + ':_default'))
+        elif nargs == '?':
+            specs.append(_zsh_quote(':' + ':' + description + ':_default'))
+        else:
+            specs.append(_zsh_quote(':' + description + ':_default'))
+
+    separator = ' \\\n' + indent + '    '
+    return indent + '_arguments -s' + separator + separator.join(specs)
+
+
+def zsh_script(spec, prog):
+    root, commands = _commands(spec)
+    function = _function_name(prog)
+
+    lines = [
+        '#compdef {p}'.format(p=prog),
+        '# zsh completion for {p}, generated by easyargs'.format(p=prog),
+        '{f}() {{'.format(f=function),
+    ]
+
+    if not commands:
+        lines.append(_zsh_arguments(root, '    '))
+    else:
+        lines += [
+            '    local line state',
+            "    _arguments -C '(- *)'{-h,--help}'[" + HELP_TEXT + "]' '1: :->command' '*:: :->args'",
+            '    case $state in',
+            '        command)',
+            '            local -a commands',
+            '            commands=(',
+        ]
+        for name, help_text, command in commands:
+            lines.append('                ' + _zsh_quote(name + ':' + help_text.replace(':', '\\:')))
+        lines += [
+            '            )',
+            "            _describe 'command' commands",
+            '            ;;',
+            '        args)',
+            '            case $line[1] in',
+        ]
+        for name, help_text, command in commands:
+            lines.append('                {n})'.format(n=name))
+            lines.append(_zsh_arguments(command, '                    '))
+            lines.append('                    ;;')
+        lines += [
+            '            esac',
+            '            ;;',
+            '    esac',
+        ]
+
+    lines += [
+        '}',
+        'if [[ $zsh_eval_context[-1] == loadautofunc ]]; then',
+        '    {f} "$@"'.format(f=function),
+        'else',
+        '    compdef {f} {p}'.format(f=function, p=prog),
+        'fi',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def _fish_quote(text):
+    return "'" + text.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def _fish_options(prog, command, condition):
+    lines = []
+    for option in command.options:
+        parts = ['complete -c', prog]
+        if condition:
+            parts += ['-n', _fish_quote(condition)]
+        name = option.option_string.lstrip('-')
+        parts += ['-s' if option.short else '-l', name]
+        if option.takes_value:
+            parts.append('-r')
+        if option.help:
+            parts += ['-d', _fish_quote(option.help)]
+        lines.append(' '.join(parts))
+    return lines
+
+
+def fish_script(spec, prog):
+    root, commands = _commands(spec)
+    lines = ['# fish completion for {p}, generated by easyargs'.format(p=prog)]
+
+    if not commands:
+        lines += _fish_options(prog, root, None)
+        return '\n'.join(lines) + '\n'
+
+    lines += _fish_options(prog, root, '__fish_use_subcommand')
+    for name, help_text, command in commands:
+        parts = ['complete -c', prog, '-n', "'__fish_use_subcommand'", '-f', '-a', name]
+        if help_text:
+            parts += ['-d', _fish_quote(help_text)]
+        lines.append(' '.join(parts))
+    for name, help_text, command in commands:
+        lines += _fish_options(prog, command, '__fish_seen_subcommand_from ' + name)
+    return '\n'.join(lines) + '\n'
+
+
+GENERATORS = {'bash': bash_script, 'zsh': zsh_script, 'fish': fish_script}
+
+
+def completion_script(spec, prog, shell='bash'):
+    """Returns the completion script for prog, made from a spec returned by
+    parsers.object_spec"""
+    try:
+        generate = GENERATORS[shell]
+    except KeyError:
+        raise ValueError('shell must be one of {s}, not {x!r}'.format(s=', '.join(SHELLS), x=shell))
+    return generate(spec, prog)
@@ -0,0 +1,282 @@
+"""Layered defaults: config files and environment variables override the
+defaults of the arguments, and the command line overrides both.
+
+    @easyargs(config='~/.greet.toml', env=True)
+    def greet(name, count=1, greeting='Hello'):
+        ...
+
+JSON, TOML and INI files are understood, chosen by the file extension.  A top
+level key sets the argument of that name for every command, and a table (an
+INI section) named after a sub command sets it for that command only.  In INI
+files the top level keys go in the [DEFAULT] section.  Files that do not exist
+are skipped, and a parsed file is cached until its modification time or size
+changes, so it is only read once per process.
+
+Environment variables are named after the decorated object, e.g. GREET_COUNT
+for the function above, or GIT_COMMIT_M for the m argument of the commit
+command of a class Git, which wins over GIT_M.  Only arguments that have a
+default can be set: options and optional positional arguments."""
+import argparse
+import io
+import os
+import re
+import shlex
+
+import six
+
+from .annotations import FALSE_VALUES, TRUE_VALUES
+
+_MISSING = object()
+
+# Parsed config files, path: ((mtime, size), values)
+_parsed = {}
+
+
+class ConfigError(ValueError):
+    """Raised when a config file or a value in it cannot be used"""
+
+
+def _read_json(path):
+    import json
+    with io.open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _read_toml(path):
+    try:
+        import tomllib as toml
+    except ImportError:
+        try:
+            import tomli as toml
+        except ImportError:
+            raise ConfigError('{p}: reading TOML files needs Python 3.11 or tomli'.format(p=path))
+
+    with io.open(path, 'rb') as f:
+        return toml.load(f)
+
+
+def _read_ini(path):
+    from six.moves import configparser
+
+    parser = configparser.RawConfigParser()
+    # Keep the case of the keys
+    parser.optionxform = str
+    try:
+        with io.open(path, encoding='utf-8') as f:
+            getattr(parser, 'read_file', getattr(parser, 'readfp', None))(f)
+    except configparser.Error as error:
+        raise ConfigError('{p}: {e}'.format(p=path, e=error))
+
+    values = dict(parser.defaults())
+    for section in parser.sections():
+        values[section] = dict(parser.items(section))
+    return values
+
+
+READERS = {'.json': _read_json, '.toml': _read_toml, '.ini': _read_ini, '.cfg': _read_ini}
+
+
+def _normalise(values):
+    # Keys can be written as dry-run as well as dry_run
+    normalised = {}
+    for key, value in values.items():
+        if isinstance(value, dict):
+            value = _normalise(value)
+        normalised[key.replace('-', '_')] = value
+    return normalised
+
+
+def load(path):
+    """Returns the values in the config file at path, or {} if there is no
+    such file.  The values are cached until the file changes."""
+    path = os.path.abspath(os.path.expanduser(path))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        _parsed.pop(path, None)
+        return {}
+
+    stamp = stat.st_mtime, stat.st_size
+    cached = _parsed.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        read = READERS[extension]
+    except KeyError:
+        raise ConfigError('{p}: unknown config file format, use one of {e}'.format(
+            p=path, e=', '.join(sorted(READERS))))
+
+    try:
+        values = read(path)
+    except ConfigError:
+        raise
+    except (IOError, OSError, ValueError) as error:
+        raise ConfigError('{p}: {e}'.format(p=path, e=error))
+
+    if not isinstance(values, dict):
+        raise ConfigError('{p}: expected a mapping of names to values'.format(p=path))
+
+    values = _normalise(values)
+    _parsed[path] = stamp, values
+    return values
+
+
+def environment_prefix(obj, env=True):
+    """Returns the prefix of the environment variables for obj.  env is True
+    to derive it from the name of obj, or the prefix to use."""
+    name = obj.__name__ if env is True else env
+    return re.sub(r'\W+', '_', name).strip('_').upper() + '_'
+
+
+def _key(arg_name, params):
+    """Returns the name used for an argument in config files, or None if the
+    argument has no default to override"""
+    if not arg_name.startswith('-') and params.get('nargs') not in ('?', '*'):
+        return None
+    return arg_name.lstrip('-').lstrip('_')
+
+
+def _file_value(values, command, key):
+    section = values.get(command) if command is not None else None
+    if isinstance(section, dict) and key in section:
+        return section[key]
+
+    value = values.get(key, _MISSING)
+    # A table at the top level is a sub command, not a value
+    return _MISSING if isinstance(value, dict) else value
+
+
+def _environment_value(environ, prefix, command, key):
+    names = [prefix + key]
+    if command is not None:
+        names.insert(0, prefix + command + '_' + key)
+
+    for name in names:
+        value = environ.get(name.upper())
+        if value is not None:
+            return value
+    return _MISSING
+
+
+def _function_overrides(spec, command, files, prefix, environ):
+    found = {}
+    for arg_name, params in spec['arguments']:
+        key = _key(arg_name, params)
+        if key is None:
+            continue
+
+        value = _MISSING
+        for values in files:
+            file_value = _file_value(values, command, key)
+            if file_value is not _MISSING:
+                value = file_value
+        if prefix is not None:
+            environment_value = _environment_value(environ, prefix, command, key)
+            if environment_value is not _MISSING:
+                value = environment_value
+
+        if value is not _MISSING:
+            found[arg_name] = value
+    return found
+
+
+def overrides(spec, paths=(), prefix=None, environ=None):
+    """Returns the defaults that the config files at paths and the environment
+    variables starting with prefix set for spec, see parsers.object_spec.
+    This is a dict from the sub command name, or None for a function, to a
+    dict from argument name to value.  Later files win over earlier ones and
+    the environment wins over the files."""
+    if environ is None:
+        environ = os.environ
+    files = [load(path) for path in paths]
+
+    found = {}
+    if 'commands' not in spec:
+        commands = [(None, spec)]
+    else:
+        commands = [(name, command_spec) for name, help_text, command_spec in spec['commands']]
+
+    for command, command_spec in commands:
+        values = _function_overrides(command_spec, command, files, prefix, environ)
+        if values:
+            found[command] = values
+    return found
+
+
+def key(found):
+    """Returns a hashable key for the result of overrides"""
+    return repr(sorted((command or '', sorted(values.items())) for command, values in found.items()))
+
+
+def _boolean(arg_name, value):
+    if isinstance(value, (bool, int)):
+        return bool(value)
+    if isinstance(value, six.string_types):
+        lowered = value.strip().lower()
+        if lowered in TRUE_VALUES:
+            return True
+        if lowered in FALSE_VALUES:
+            return False
+    raise ConfigError('argument {a}: invalid boolean value: {v!r}'.format(a=arg_name, v=value))
+
+
+def _convert(arg_name, params, value):
+    """Converts a value from a config file or the environment to the default
+    of the argument"""
+    action = params.get('action')
+    if action in ('store_true', 'store_false'):
+        return _boolean(arg_name, value)
+
+    if params.get('nargs') in ('*', '+'):
+        values = shlex.split(value) if isinstance(value, six.string_types) else list(value)
+        arg_type = params.get('type')
+        if action is None and arg_type is None:
+            return values
+        # argparse does not convert list defaults, e.g. for list[int]
+        if action is None:
+            try:
+                return [arg_type(item) if isinstance(item, six.string_types) else item
+                        for item in values]
+            except (ValueError, TypeError, argparse.ArgumentTypeError) as error:
+                raise ConfigError('argument {a}: {e}'.format(a=arg_name, e=error))
+        # Typed lists are converted by their action, see argtypes.array_action
+        try:
+            return action([], arg_name).convert(values)
+        except (ValueError, TypeError, OverflowError) as error:
+            raise ConfigError('argument {a}: {e}'.format(a=arg_name, e=error))
+
+    # argparse converts string defaults with the type of the argument
+    arg_type = params.get('type')
+    if arg_type is None or isinstance(value, six.string_types):
+        return value
+    if arg_type in (int, float):
+        try:
+            return arg_type(value)
+        except (ValueError, TypeError) as error:
+            raise ConfigError('argument {a}: {e}'.format(a=arg_name, e=error))
+    return str(value)
+
+
+def _apply_function(spec, values):
+    if not values:
+        return spec
+
+    arguments = []
+    for arg_name, params in spec['arguments']:
+        if arg_name in values:
+            params = dict(params, default=_convert(arg_name, params, values[arg_name]))
+        arguments.append((arg_name, params))
+    return dict(spec, arguments=arguments)
+
+
+def apply(spec, found):
+    """Returns a copy of spec with the defaults in found, the result of
+    overrides"""
+    if 'commands' not in spec:
+        return _apply_function(spec, found.get(None))
+
+    commands = [(name, help_text, _apply_function(command_spec, found.get(name)))
+                for name, help_text, command_spec in spec['commands']]
+    return dict(spec, commands=commands)
@@ -1,22 +1,257 @@
-from . import parsers
+from . import cache, instrumentation
 import functools
-import inspect
+import sys
+import types
 
+# The option that switches a decorated object with batch=True to batch mode
+BATCH_OPTION = '--easyargs-batch'
+
+HELP_OPTIONS = ('-h', '--help')
+
+
+def help_request(argv):
+    """Returns the path of sub command names if argv only asks for help, e.g.
+    ('clone',) for ['clone', '-h'], otherwise None"""
+    if not argv or argv[-1] not in HELP_OPTIONS:
+        return None
+
+    path = argv[:-1]
+    if any(word.startswith('-') for word in path):
+        return None
+    return tuple(path)
+
+
+def invoke(obj, argv, stdout=None, stderr=None):
+    """Runs the command line argv through obj in this process and returns an
+    easyargs.invocation.Result, see there"""
+    from . import invocation
+    return invocation.invoke(obj, argv, stdout, stderr)
+
+
+def make_easy_args(obj=None, auto_call=True, lazy=False, disk_cache=False, fast=False,
+                   batch=False, map_over=None, workers=None, executor='thread', groups=None,
+                   plugins=None, response_files=False, config=None, env=False, flush='auto',
+                   output_buffer=None):
+    # Options for dispatching the selected function, see dispatch.call
+    options = {'map_over': map_over, 'workers': workers, 'executor': executor}
+
+    # Options for writing the records of a generator, see output.write_records
+    output = {'flush': flush}
+    if output_buffer:
+        output['buffer_size'] = output_buffer
+
+    # config can either be the path of a config file or a list of paths
+    config_files = list(config) if isinstance(config, (list, tuple)) else [config] if config else []
+
+    # disk_cache can either be True or the directory to use
+    cache_directory = None if disk_cache is True else disk_cache
 
-def make_easy_args(obj=None, auto_call=True):
     def decorate(f):
+        is_function = isinstance(f, types.FunctionType)
+        if map_over is not None:
+            from . import fanout
+            fanout.check_argument(f, map_over)
+
+        def build_target():
+            # Classes are only instantiated once a command is called
+            from . import dispatch
+            return f if is_function else dispatch.Instance(f)
+
+        def build_methods():
+            from . import parsers
+            return parsers.method_table(f)
+
+        def methods():
+            return None if is_function else parser_cache.get('methods')
+
+        def build_groups():
+            # Nested classes, registered groups and plugins, see easyargs.groups
+            if is_function:
+                return None
+
+            from . import groups as command_groups, parsers
+            return command_groups.find_groups(f, parsers.filter_private_methods, groups, plugins)
+
+        def build_spec():
+            # The parsers module pulls in argparse, inspect and re, so it is
+            # only imported once the decorated object is first called
+            from . import parsers
+
+            target = parser_cache.get('target')
+            if not disk_cache:
+                return parsers.object_spec(target, methods=methods())
+
+            spec_cache = cache.SpecCache(f, cache_directory)
+            spec = spec_cache.load()
+            if spec is None:
+                spec = parsers.object_spec(target, methods=methods())
+                spec_cache.save(spec)
+            return spec
+
+        def parser_from_spec(spec):
+            from . import parsers
+            return parsers.spec_parser(spec, parser_cache.get('target'), lazy=lazy,
+                                       groups=parser_cache.get('groups'),
+                                       response_files=response_files)
+
+        def build_parser():
+            from . import parsers
+
+            target = parser_cache.get('target')
+            if disk_cache or parser_cache.has('spec'):
+                return parser_from_spec(parser_cache.get('spec'))
+
+            parser = parsers.create_base_parser(f, response_files)
+            if is_function:
+                parsers.function_parser(target, parser)
+            else:
+                parsers.class_parser(target, parser, lazy=lazy, methods=methods(),
+                                     groups=parser_cache.get('groups'))
+            return parser
+
+        def engine_from_spec(spec):
+            from . import fastpath
+            return fastpath.compile_spec(spec)
+
+        def build_engine():
+            return engine_from_spec(parser_cache.get('spec'))
+
+        parser_cache = cache.ParserCache(f, build_parser, target=build_target,
+                                         methods=build_methods, groups=build_groups,
+                                         spec=build_spec, engine=build_engine)
+
+        def layered(name, build):
+            """Returns the cached value called name, or if the config files or
+            environment variables set any defaults, the one made by build from
+            the spec with those defaults, see easyargs.config"""
+            if not config_files and not env:
+                return parser_cache.get(name)
+
+            from . import config as configuration
+            spec = parser_cache.get('spec')
+            prefix = configuration.environment_prefix(f, env) if env else None
+            try:
+                found = configuration.overrides(spec, config_files, prefix)
+                if not found:
+                    return parser_cache.get(name)
+                return parser_cache.variant(name, configuration.key(found),
+                                            lambda: build(configuration.apply(spec, found)))
+            except configuration.ConfigError as error:
+                parser_cache.parser().error(str(error))
+
+        def fast_parse(argv):
+            """Parses argv without argparse.  Returns the selected function and
+            its args, or None if argparse is needed."""
+            from . import fastpath
+
+            engine = layered('engine', engine_from_spec)
+            if engine is None:
+                return None
+
+            # Response files are expanded by argparse
+            if response_files and any(arg.startswith('@') for arg in argv):
+                return None
+
+            with instrumentation.phase('fast_parse'):
+                try:
+                    command, args = engine.parse(argv)
+                except fastpath.Fallback:
+                    return None
+
+            target = parser_cache.get('target')
+            return (target if command is None else target.method(command)), args
+
+        def fast_call():
+            """Parses sys.argv without argparse.  Returns (True, result) if that
+            was possible and (False, None) if argparse is needed."""
+            from . import dispatch
+
+            parsed = fast_parse(sys.argv[1:])
+            if parsed is None:
+                return False, None
+
+            from . import output as command_output
+            function, args = parsed
+            with instrumentation.phase('dispatch'):
+                result = dispatch.call(function, args, **options)
+                return True, command_output.stream_result(result, output)
+
+        def parse_command(argv):
+            """Parses argv without calling anything.  Returns the selected
+            function, or None if there is none, and its args."""
+            with parser_cache.checked():
+                parsed = fast_parse(argv) if fast else None
+                if parsed is not None:
+                    return parsed
+
+                parser = layered('parser', parser_from_spec)
+            with instrumentation.phase('parse'):
+                args = vars(parser.parse_args(argv))
+            return args.pop('func', None), args
+
+        def group_files():
+            """Returns the source files of the command groups"""
+            found = parser_cache.get('groups')
+            if not found:
+                return []
+
+            from . import groups as command_groups, parsers
+            return command_groups.source_files(found, parsers.filter_private_methods)
+
+        def cached_help():
+            """Returns the help text that sys.argv asks for from the disk cache,
+            or None if sys.argv does not just ask for help"""
+            path = help_request(sys.argv[1:])
+            if path is None:
+                return None
+
+            with instrumentation.phase('help_cache'):
+                help_cache = cache.HelpCache(f, cache_directory, plugins=plugins)
+                texts = help_cache.load()
+                if texts is None:
+                    # Render the help for every sub command once
+                    from . import parsers
+                    texts = parsers.help_texts(parser_cache.parser())
+                    help_cache.save(texts, group_files())
+                return texts.get(path)
+
         @functools.wraps(f)
         def decorated(*args, **kwargs):
-            parser = parsers.create_base_parser(f)
-            if inspect.isfunction(f):
-                parsers.function_parser(f, parser)
-            else:
-                klass_instance = f()
-                parsers.class_parser(klass_instance, parser)
-            if auto_call:
-                return parsers.handle_parser(parser)
+            with instrumentation.phase('decorated'), parser_cache.checked():
+                if auto_call and batch and sys.argv[1:2] == [BATCH_OPTION]:
+                    from . import batch as batch_mode
+                    source = sys.argv[2] if len(sys.argv) > 2 else '-'
+                    return batch_mode.run_source(layered('parser', parser_from_spec), source,
+                                                 output=output, **options)
 
-            return parser
+                if auto_call and disk_cache:
+                    help_text = cached_help()
+                    if help_text is not None:
+                        sys.stdout.write(help_text)
+                        sys.exit(0)
+
+                if auto_call and fast:
+                    handled, result = fast_call()
+                    if handled:
+                        return result
+
+                parser = layered('parser', parser_from_spec)
+                if auto_call:
+                    from . import parsers
+                    return parsers.handle_parser(parser, output=output, **options)
+
+                return parser
+
+        # Allow the cached parser to be thrown away, e.g. after the decorated
+        # object has been modified in a way that the cache key cannot detect
+        decorated.cache_clear = parser_cache.clear
+        decorated.build_parser = parser_cache.parser
+        decorated.build_spec = functools.partial(parser_cache.get, 'spec')
+        decorated.build_groups = functools.partial(parser_cache.get, 'groups')
+        decorated.dispatch_options = options
+        decorated.output_options = output
+        decorated.layered_defaults = {'config': config_files, 'env': env}
+        decorated.parse_command = parse_command
         return decorated
 
     if obj is not None:
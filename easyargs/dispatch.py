@@ -0,0 +1,144 @@
+"""Calls the function selected on the command line with its arguments.
+
+Every way of running a command (handle_parser, the fast path, batch mode and
+the server) goes through call, so they all treat the return value the same
+way.  Coroutine functions return an awaitable, which is run to completion on
+an event loop, see easyargs.aio.
+
+This module is also used by the worker processes of easyargs.fanout, so it
+does not import anything at the top level."""
+
+
+def exit_status(result):
+    """Converts the return value of a command to an exit status"""
+    # A FanOut combines the statuses of all of its calls
+    status = getattr(result, 'exit_status', None)
+    if status is not None:
+        return status
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    return 0
+
+
+def combine_statuses(statuses):
+    """Returns the overall exit status for a number of commands"""
+    return max([0] + [status for status in statuses if status])
+
+
+def is_awaitable(value):
+    """Returns True for coroutines and other objects that can be awaited"""
+    return hasattr(type(value), '__await__')
+
+
+class Instance(object):
+    """Creates an instance of klass the first time that one of its methods is
+    called, so that the work done by __init__ is skipped for -h and for
+    command lines that fail to parse"""
+
+    def __init__(self, klass):
+        import threading
+        self.klass = klass
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._instance is None:
+            # Commands may be invoked from several threads at once
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self.klass()
+        return self._instance
+
+    def method(self, name):
+        """Returns a DeferredMethod for the method called name"""
+        return DeferredMethod(self, name)
+
+
+class DeferredMethod(object):
+    """Stands in for a method of an Instance that has not been created yet"""
+
+    easyargs_deferred = True
+
+    def __init__(self, instance, name):
+        self.instance = instance
+        self.name = name
+
+    def bind(self):
+        """Creates the instance if needed and returns the bound method"""
+        return getattr(self.instance.get(), self.name)
+
+    def __call__(self, *args, **kwargs):
+        return self.bind()(*args, **kwargs)
+
+
+def resources(args):
+    """Yields the files opened for the args, including those in lists, e.g.
+    for a list[Stream] annotation"""
+    for value in args.values():
+        items = value if isinstance(value, (list, tuple)) else (value,)
+        for item in items:
+            if getattr(item, 'easyargs_resource', False):
+                yield item
+
+
+def release(args):
+    """Closes the files opened for the args, see easyargs.argtypes"""
+    for resource in resources(args):
+        resource.close()
+
+
+def _release_after(iterator, args):
+    """Yields the items of iterator, then closes the files opened for args"""
+    try:
+        for item in iterator:
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+        release(args)
+
+
+def invoke(function, args):
+    """Calls function with args, running it to completion if it is a
+    coroutine function"""
+    result = function(**args)
+    if is_awaitable(result):
+        from . import aio
+        result = aio.run(result)
+    return result
+
+
+def call(function, args, map_over=None, workers=None, executor='thread'):
+    """Calls function with the parsed args and returns its result.  Files
+    opened for the args are closed once it returns, or if it returns an
+    iterator, once that is exhausted or closed.
+
+    If map_over names one of the args, the function is instead called once
+    for each of its values by a pool of workers, see easyargs.fanout."""
+    if getattr(function, 'easyargs_deferred', False):
+        function = function.bind()
+
+    if map_over is not None and map_over in args:
+        from . import fanout
+        return fanout.FanOut(function, args, map_over, workers, executor)
+
+    try:
+        result = invoke(function, args)
+    except BaseException:
+        release(args)
+        raise
+
+    return finish(result, args)
+
+
+def finish(result, args):
+    """Closes the files opened for args once the command that returned result
+    is done with them, and returns the result"""
+    # A generator reads its files while it is iterated over
+    from .output import is_iterator
+    if is_iterator(result) and next(resources(args), None) is not None:
+        return _release_after(result, args)
+
+    release(args)
+    return result
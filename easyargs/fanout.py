@@ -0,0 +1,211 @@
+"""Fan out over a list argument with a pool of workers.
+
+With @easyargs(map_over='files'), the function is called once for each value
+of the files list argument instead of once with the whole list:
+
+    @easyargs(map_over='files', workers=4, executor='process')
+    def main(files=list, verbose=False):
+        ...
+
+All of the calls are submitted to the pool straight away.  A FanOut yields
+the results in the same order as the values, each one as soon as it is
+available.  Its exit_status combines the exit statuses of every call.  A call
+that raises an exception has its traceback written to stderr, counts as exit
+status 1 and is left out of the results.  Each call is given its own copy
+of the other Stream and MappedFile args, see easyargs.argtypes, which it
+closes when it returns.  stdin can only be read once, so it is shared and
+should only be read by one of the calls.
+
+When the decorated object is called, the results are written to stdout as
+they arrive and the process exits with the combined status, see
+easyargs.output.stream_result.  easyargs.invoke returns the FanOut itself."""
+from __future__ import print_function
+
+import copy
+import functools
+import importlib
+import sys
+import traceback
+
+from . import dispatch
+
+EXECUTORS = ('thread', 'process')
+
+
+class _Reference(object):
+    """A picklable reference to the function being fanned out, used by the
+    process pool.  Decorated functions cannot be pickled directly because the
+    module attribute with their name is the easyargs wrapper."""
+
+    _instances = {}
+
+    def __init__(self, function):
+        instance = getattr(function, '__self__', None)
+        owner = function if instance is None else type(instance)
+        self.module = owner.__module__
+        self.qualname = getattr(owner, '__qualname__', owner.__name__)
+        self.method = None if instance is None else function.__name__
+
+        if '<locals>' in self.qualname:
+            raise ValueError("{q} cannot be used by a process pool as it is not defined at the top "
+                             "level of a module, use executor='thread'".format(q=self.qualname))
+
+    def resolve(self):
+        obj = importlib.import_module(self.module)
+        for name in self.qualname.split('.'):
+            obj = getattr(obj, name)
+        obj = getattr(obj, '__wrapped__', obj)
+
+        if self.method is None:
+            return obj
+
+        # Create one instance of the class per worker process
+        key = (self.module, self.qualname)
+        try:
+            instance = self._instances[key]
+        except KeyError:
+            instance = self._instances[key] = obj()
+        return getattr(instance, self.method)
+
+    def __call__(self, args):
+        return dispatch.call(self.resolve(), args)
+
+
+def _is_list(default, annotation):
+    from . import annotations, argtypes
+    if default is list or argtypes.array_action(default) is not None:
+        return True
+    return annotations.annotation_params(annotation).get('nargs') == '+'
+
+
+def check_argument(obj, name):
+    """Raises ValueError unless name is a list argument, given as list, as
+    [type] or with a list annotation, of the function obj or of a method of
+    the class obj, and is not any other kind of argument of another method"""
+    import inspect
+    from . import parsers, targets
+
+    obj = targets.unwrap(obj)
+    if inspect.isfunction(obj):
+        functions = [(obj.__name__, obj)]
+    else:
+        functions = parsers.method_table(obj)
+
+    found = False
+    for function_name, function in functions:
+        for arg, has_default, default, annotation in parsers.function_parameters(function):
+            if arg != name:
+                continue
+            if not _is_list(default, annotation):
+                raise ValueError('map_over={n!r} must name a list argument, but it is not a list '
+                                 'in {f}'.format(n=name, f=function_name))
+            found = True
+
+    if not found:
+        raise ValueError('map_over={n!r} is not an argument of {o}'.format(
+            n=name, o=getattr(obj, '__name__', obj)))
+
+
+def _copy_resource(value):
+    # The copy opens its own file when it is first used, see
+    # argtypes.Resource.__getstate__
+    if not getattr(value, 'easyargs_resource', False) or value.is_stdin:
+        return value
+    return copy.copy(value)
+
+
+def _copy_resources(args, name):
+    """Returns a copy of args in which every file opened for them, other than
+    stdin and those of the argument called name, is a new copy.  Each call then reads
+    its files from the start and closes them itself."""
+    copied = {}
+    for key, value in args.items():
+        if key == name:
+            copied[key] = value
+        elif isinstance(value, (list, tuple)):
+            copied[key] = type(value)(_copy_resource(item) for item in value)
+        else:
+            copied[key] = _copy_resource(value)
+    return copied
+
+
+def _create_pool(executor, workers):
+    if executor not in EXECUTORS:
+        raise ValueError('executor must be one of {e}, not {x!r}'.format(e=', '.join(EXECUTORS), x=executor))
+
+    from concurrent import futures
+    if executor == 'process':
+        return futures.ProcessPoolExecutor(max_workers=workers)
+    return futures.ThreadPoolExecutor(max_workers=workers)
+
+
+class FanOut(object):
+    """Calls function once for each value of args[name] on a pool of workers.
+    Iterating over a FanOut yields the results in order."""
+
+    easyargs_fan_out = True
+
+    def __init__(self, function, args, name, workers=None, executor='thread'):
+        self.values = list(args[name])
+        if len(self.values) > 1:
+            value_args = [_copy_resources(args, name) for value in self.values]
+        else:
+            value_args = [dict(args) for value in self.values]
+
+        pool = _create_pool(executor, workers)
+        if executor == 'process':
+            submit_function, function = _Reference(function), None
+        else:
+            submit_function = functools.partial(dispatch.call, function)
+
+        self._futures = []
+        for value, call_args in zip(self.values, value_args):
+            call_args[name] = value
+            self._futures.append(pool.submit(submit_function, call_args))
+
+        # Nothing else will be submitted, the workers exit once they are done
+        pool.shutdown(wait=False)
+        self._outcomes = {}
+
+    def __len__(self):
+        return len(self._futures)
+
+    def _outcome(self, idx):
+        """Waits for the call for value idx, returns (succeeded, result, status)"""
+        try:
+            return self._outcomes[idx]
+        except KeyError:
+            pass
+
+        try:
+            result = self._futures[idx].result()
+            outcome = (True, result, dispatch.exit_status(result))
+        except Exception as error:
+            print('easyargs: {v!r} failed:'.format(v=self.values[idx]), file=sys.stderr)
+            traceback.print_exception(type(error), error, getattr(error, '__traceback__', None))
+            outcome = (False, None, 1)
+
+        self._outcomes[idx] = outcome
+        return outcome
+
+    def __iter__(self):
+        for idx in range(len(self._futures)):
+            succeeded, result, status = self._outcome(idx)
+            if succeeded:
+                yield result
+
+    def records(self):
+        """Yields the records to write to stdout for each call in order: its
+        result, or the items of the iterator it returned.  None is skipped."""
+        from .output import is_iterator
+        for result in self:
+            if is_iterator(result):
+                for record in result:
+                    yield record
+            elif result is not None:
+                yield result
+
+    @property
+    def exit_status(self):
+        """Waits for every call and returns their combined exit status"""
+        return dispatch.combine_statuses(self._outcome(idx)[2] for idx in range(len(self._futures)))
@@ -0,0 +1,184 @@
+"""A lightweight argument engine that works directly from a spec.
+
+Most functions only use what calculate_default_type produces: positional
+arguments, options with an int / float / str value and boolean flags.  For
+these, building an argparse parser costs far more than parsing the command
+line, so the Engine here parses argv straight from the spec and returns the
+same keyword arguments that handle_parser would pass to the function.
+
+Anything the engine does not understand raises Fallback, and the caller must
+then use argparse.  This includes -h, errors, abbreviated options, combined
+short flags and values that start with a '-', so that the help and error
+messages always come from argparse."""
+
+# The argparse parameters that the engine knows how to handle
+SUPPORTED_PARAMS = frozenset(['help', 'default', 'type', 'action', 'metavar', 'nargs'])
+SUPPORTED_ACTIONS = frozenset([None, 'store', 'store_true', 'store_false'])
+
+
+class Fallback(Exception):
+    """Raised when argparse must be used instead of the engine"""
+
+
+class _Option(object):
+    __slots__ = ('dest', 'takes_value', 'value', 'type')
+
+    def __init__(self, dest, params):
+        self.dest = dest
+        self.type = params.get('type')
+        action = params.get('action')
+        self.takes_value = action in (None, 'store')
+        if action == 'store_true':
+            self.value = True
+        elif action == 'store_false':
+            self.value = False
+        else:
+            self.value = None
+
+
+class _FunctionEngine(object):
+    """Parses the arguments of a single function spec"""
+
+    def __init__(self, spec):
+        self.options = {}
+        self.positionals = []
+        self.defaults = {}
+        self.string_defaults = []
+        num_optional_positionals = 0
+
+        for arg_name, params in spec['arguments']:
+            if not SUPPORTED_PARAMS.issuperset(params):
+                raise Fallback(arg_name)
+            if params.get('action') not in SUPPORTED_ACTIONS:
+                raise Fallback(arg_name)
+
+            if arg_name.startswith('-'):
+                if params.get('nargs') is not None:
+                    raise Fallback(arg_name)
+                option = _Option(arg_name.lstrip('-'), params)
+                self.options[arg_name] = option
+                self.defaults[option.dest] = self._default(option.dest, params)
+                continue
+
+            nargs = params.get('nargs')
+            if nargs == '?':
+                num_optional_positionals += 1
+                self.defaults[arg_name] = self._default(arg_name, params)
+            elif nargs is not None or num_optional_positionals:
+                # Required positionals after optional ones are matched in
+                # ways that are best left to argparse
+                raise Fallback(arg_name)
+            self.positionals.append((arg_name, params.get('type')))
+
+        self.num_required = len(self.positionals) - num_optional_positionals
+        self.has_optional_positionals = num_optional_positionals > 0
+
+    def _default(self, dest, params):
+        # argparse converts string defaults with the type of the argument
+        # each time it parses, as the type may open a file, see argtypes
+        default = params.get('default')
+        arg_type = params.get('type')
+        if arg_type is not None and isinstance(default, str):
+            self.string_defaults.append((dest, arg_type, default))
+        return default
+
+    def parse(self, argv):
+        args = dict(self.defaults)
+        values = []
+
+        # argparse matches optional positionals against the first run of
+        # positional values it finds, so only a single run is handled here
+        chunks = 0
+        in_chunk = False
+
+        idx = 0
+        num_tokens = len(argv)
+        while idx < num_tokens:
+            token = argv[idx]
+            idx += 1
+            if not token.startswith('-') or token == '-':
+                values.append(token)
+                if not in_chunk:
+                    chunks += 1
+                    in_chunk = True
+                continue
+
+            in_chunk = False
+            option_string, sep, value = token.partition('=')
+            option = self.options.get(option_string)
+            if option is None or (sep and not option.takes_value):
+                raise Fallback(token)
+
+            if not option.takes_value:
+                args[option.dest] = option.value
+                continue
+
+            if not sep:
+                if idx == num_tokens or argv[idx].startswith('-'):
+                    raise Fallback(token)
+                value = argv[idx]
+                idx += 1
+
+            args[option.dest] = _convert(option.type, value)
+
+        if len(values) < self.num_required or len(values) > len(self.positionals):
+            raise Fallback('positionals')
+        if self.has_optional_positionals and chunks > 1:
+            raise Fallback('positionals')
+
+        for (dest, arg_type), value in zip(self.positionals, values):
+            args[dest] = _convert(arg_type, value)
+
+        for dest, arg_type, default in self.string_defaults:
+            if args[dest] is default:
+                args[dest] = _convert(arg_type, default)
+
+        return args
+
+
+def _convert(arg_type, value):
+    if arg_type is None:
+        return value
+    try:
+        return arg_type(value)
+    except Exception:
+        # Let argparse report the error
+        raise Fallback(value)
+
+
+class Engine(object):
+    """Parses argv using a spec returned by parsers.object_spec.  Creating an
+    Engine raises Fallback if the spec uses anything it does not support."""
+
+    def __init__(self, spec):
+        if 'commands' in spec:
+            self.commands = {}
+            for name, help_text, command_spec in spec['commands']:
+                try:
+                    self.commands[name] = _FunctionEngine(command_spec)
+                except Fallback:
+                    # This command will always be parsed by argparse
+                    pass
+            self.function = None
+        else:
+            self.commands = None
+            self.function = _FunctionEngine(spec)
+
+    def parse(self, argv):
+        """Returns (command, kwargs) for argv.  command is None for a function
+        spec, otherwise it is the name of the selected sub command."""
+        if self.function is not None:
+            return None, self.function.parse(argv)
+
+        if not argv or argv[0] not in self.commands:
+            raise Fallback('command')
+
+        return argv[0], self.commands[argv[0]].parse(argv[1:])
+
+
+def compile_spec(spec):
+    """Returns an Engine for spec, or None if argparse must always be used"""
+    try:
+        return Engine(spec)
+    except Fallback:
+        return None
@@ -0,0 +1,194 @@
+"""Command groups: sub commands that have sub commands of their own.
+
+    @easyargs(groups={'remote': 'mytool.remote:Remote'}, plugins='mytool.commands')
+    class Tool(object):
+        class config(object):
+            'Read and write the configuration'
+
+            def get(self, key):
+                ...
+
+Here 'tool config get KEY' calls config().get(KEY).  A group is either a
+public class nested in the decorated class, an object registered by name
+with groups=, or an entry point in the group named by plugins=.  Nested
+classes are only groups if groups= is given, as True or as the dict of
+registered groups, and Enum and exception classes never are.  Registered
+groups and plugins can be classes or functions, given as 'module:name', and
+their modules are only imported when the command line selects the group.
+The sub parsers of a group are only built then as well."""
+
+
+class CommandGroup(object):
+    """A group called name.  load returns the class or function of the group,
+    help_text is the text shown in the sub command listing, if it is known
+    without loading the group."""
+
+    def __init__(self, name, load, help_text=None):
+        self.name = name
+        self.load = load
+        self.help_text = help_text
+
+    def help(self):
+        if self.help_text is None:
+            from . import parsers, targets
+            self.help_text = parsers.method_help_text(targets.unwrap(self.load())) or ''
+        return self.help_text
+
+    def build(self, parser, lazy=False):
+        """Adds the arguments or sub commands of the group to parser"""
+        import inspect
+        from . import parsers, targets
+
+        obj = targets.unwrap(self.load())
+        if inspect.isfunction(obj):
+            parsers.function_parser(obj, parser)
+        else:
+            parsers.class_parser(obj, parser, lazy=lazy,
+                                 groups=nested_groups(obj, parsers.filter_private_methods))
+
+    def __repr__(self):
+        return 'CommandGroup({n!r})'.format(n=self.name)
+
+
+def _constant(value):
+    return lambda: value
+
+
+def _loader(target):
+    if not isinstance(target, str):
+        return _constant(target)
+
+    def load():
+        from . import targets
+        return targets.load_target(target)
+    return load
+
+
+def _is_group_class(klass, method_filter):
+    """Returns True if klass can be a group: it has a public method or class
+    of its own and is not an Enum or an exception"""
+    import inspect
+
+    if issubclass(klass, BaseException):
+        return False
+    try:
+        import enum
+    except ImportError:
+        pass
+    else:
+        if issubclass(klass, enum.Enum):
+            return False
+
+    for cls in inspect.getmro(klass):
+        if cls is object:
+            continue
+        for name, value in vars(cls).items():
+            value = getattr(value, '__func__', value)
+            if method_filter(name) and (inspect.isfunction(value) or inspect.isclass(value)):
+                return True
+    return False
+
+
+def nested_groups(klass, method_filter):
+    """Returns a CommandGroup for each public class defined inside klass that
+    has public methods, see _is_group_class"""
+    import inspect
+
+    groups = []
+    seen = set()
+    for cls in inspect.getmro(klass):
+        prefix = getattr(cls, '__qualname__', None)
+        for name, value in sorted(vars(cls).items()):
+            if name in seen or not method_filter(name):
+                continue
+            seen.add(name)
+            if not inspect.isclass(value):
+                continue
+            # Only classes defined in the body, not ones assigned to it
+            qualname = getattr(value, '__qualname__', None)
+            if prefix is not None and qualname != prefix + '.' + value.__name__:
+                continue
+            if not _is_group_class(value, method_filter):
+                continue
+            groups.append(CommandGroup(name, _constant(value)))
+    return groups
+
+
+def registered_groups(groups):
+    """Returns a CommandGroup for each name: target pair of groups"""
+    return [CommandGroup(name, _loader(target)) for name, target in sorted(groups.items())]
+
+
+def _find_entry_points(group):
+    """Returns the entry points in group"""
+    try:
+        from importlib import metadata
+    except ImportError:
+        try:
+            import pkg_resources
+        except ImportError:
+            return []
+        return list(pkg_resources.iter_entry_points(group))
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, []))
+
+
+def _entry_points(group):
+    """Returns (name, load) for each entry point in group"""
+    return [(entry_point.name, entry_point.load) for entry_point in _find_entry_points(group)]
+
+
+def plugins_key(group):
+    """Returns a string naming every entry point in group and what it loads,
+    without loading any of them"""
+    return ';'.join(sorted('{n}={v}'.format(n=entry_point.name,
+                                            v=getattr(entry_point, 'value', entry_point))
+                           for entry_point in _find_entry_points(group)))
+
+
+def plugin_groups(group):
+    """Returns a CommandGroup for each entry point in the entry point group"""
+    return [CommandGroup(name, load)
+            for name, load in sorted(_entry_points(group), key=lambda entry_point: entry_point[0])]
+
+
+def source_files(groups, method_filter):
+    """Returns the files that the objects of groups, the classes they inherit
+    from and the groups nested in them were defined in.  Every group is
+    loaded."""
+    from . import cache, targets
+
+    files = []
+    pending = list(groups)
+    while pending:
+        obj = targets.unwrap(pending.pop().load())
+        files += cache.source_files(obj)
+        if isinstance(obj, type):
+            pending += nested_groups(obj, method_filter)
+    return sorted(set(files))
+
+
+def find_groups(klass, method_filter, groups=None, plugins=None):
+    """Returns the command groups of klass, nested classes first, then the
+    registered groups and then the plugins.  groups is either True, to only
+    use nested classes, or a dict of registered groups.  Nested classes are
+    not groups if groups is not given.  If a name is used twice, the first
+    group wins."""
+    found = []
+    if groups:
+        found += nested_groups(klass, method_filter)
+    if isinstance(groups, dict):
+        found += registered_groups(groups)
+    if plugins:
+        found += plugin_groups(plugins)
+
+    names = set()
+    unique = []
+    for group in found:
+        if group.name not in names:
+            names.add(group.name)
+            unique.append(group)
+    return unique
@@ -0,0 +1,177 @@
+"""Timing instrumentation for the phases of an easyargs call.
+
+Hooks added with add_hook are called with a PhaseTiming each time one of the
+phases (decorated, create_base_parser, function_parser, class_parser,
+handle_parser, parse and dispatch) finishes.  When no hooks are registered the
+phases are not timed at all.
+
+Setting the EASYARGS_PROFILE environment variable records every phase for the
+whole process.  A value of 1 prints a summary to stderr when the process exits,
+any other value is used as the name of a Chrome trace event file to write."""
+from __future__ import print_function
+
+import collections
+import functools
+import os
+import sys
+import time
+
+try:
+    from _thread import get_ident
+except ImportError:
+    from thread import get_ident
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+# sys.getallocatedblocks is only available in python 3.4+
+_allocated_blocks = getattr(sys, 'getallocatedblocks', None)
+
+class PhaseTiming(collections.namedtuple('PhaseTiming',
+                                         'name start duration allocations thread')):
+    """The timing of a single phase.  start and duration are in seconds and
+    allocations is the change in the number of allocated memory blocks during
+    the phase, or None if that is not available."""
+    __slots__ = ()
+
+_hooks = []
+
+
+def add_hook(hook):
+    """Registers hook to be called with a PhaseTiming when each phase ends"""
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """Removes a hook that was registered with add_hook"""
+    _hooks.remove(hook)
+
+
+class _Phase(object):
+    __slots__ = ('name', 'start', 'blocks')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.blocks = _allocated_blocks() if _allocated_blocks else None
+        self.start = _clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = _clock() - self.start
+        allocations = None
+        if self.blocks is not None:
+            allocations = _allocated_blocks() - self.blocks
+
+        timing = PhaseTiming(self.name, self.start, duration, allocations, get_ident())
+        for hook in list(_hooks):
+            hook(timing)
+        return False
+
+
+class _NullPhase(object):
+    """Used in place of _Phase when there is nobody listening"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(name):
+    """Returns a context manager that times the phase called name"""
+    if _hooks:
+        return _Phase(name)
+    return _NULL_PHASE
+
+
+def timed(name):
+    """Decorator that times every call of the decorated function as the phase
+    called name"""
+    def decorate(function):
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            with phase(name):
+                return function(*args, **kwargs)
+        return timed_function
+    return decorate
+
+
+class Recorder(object):
+    """A hook that keeps every PhaseTiming it is called with
+
+        recorder = Recorder()
+        add_hook(recorder)
+        main()
+        recorder.export_chrome_trace('trace.json')
+    """
+
+    def __init__(self):
+        self.timings = []
+
+    def __call__(self, timing):
+        self.timings.append(timing)
+
+    def summary(self):
+        """Returns a text table with the number of calls, total time and
+        allocations for each phase"""
+        totals = collections.OrderedDict()
+        for timing in self.timings:
+            calls, duration, allocations = totals.get(timing.name, (0, 0.0, 0))
+            totals[timing.name] = (calls + 1, duration + timing.duration,
+                                   allocations + (timing.allocations or 0))
+
+        lines = ['{0:20} {1:>6} {2:>12} {3:>12}'.format('phase', 'calls', 'total ms', 'allocations')]
+        for name, (calls, duration, allocations) in totals.items():
+            lines.append('{0:20} {1:>6} {2:>12.3f} {3:>12}'.format(name, calls, duration * 1000, allocations))
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        """Returns the timings in the Chrome trace event format, which can be
+        loaded in chrome://tracing or Perfetto"""
+        pid = os.getpid()
+        events = []
+        for timing in self.timings:
+            events.append({
+                'name': timing.name,
+                'cat': 'easyargs',
+                'ph': 'X',
+                'ts': timing.start * 1e6,
+                'dur': timing.duration * 1e6,
+                'pid': pid,
+                'tid': timing.thread,
+                'args': {'allocations': timing.allocations},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        """Writes the timings to path as a Chrome trace event JSON file"""
+        import json
+        with open(path, 'w') as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+
+def _report_profile(recorder, target):
+    if target == '1':
+        print(recorder.summary(), file=sys.stderr)
+    else:
+        recorder.export_chrome_trace(target)
+
+
+def _profile_from_environment():
+    target = os.environ.get('EASYARGS_PROFILE')
+    if not target or target == '0':
+        return None
+
+    import atexit
+    recorder = Recorder()
+    add_hook(recorder)
+    atexit.register(_report_profile, recorder, target)
+    return recorder
+
+
+profile = _profile_from_environment()
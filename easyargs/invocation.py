@@ -0,0 +1,124 @@
+"""Runs command lines through a decorated object in this process:
+
+    result = easyargs.invoke(main, ['Joe', '--count', '2'])
+    if result.ok:
+        print(result.value)
+
+sys.argv is not read and nothing exits the process.  The help, usage and
+error messages that argparse would print are written to the stdout and stderr
+given to invoke, and a command line that fails to parse, or a command that
+raises, gives a Result with a non zero status.  Only the messages of
+easyargs parsers are redirected, not what the command itself prints.
+
+The parser of the object is built once and shared, so invoke can be called
+from many threads at once.  Objects decorated with fast=True are parsed by
+the fast path engine where possible."""
+import threading
+
+_local = threading.local()
+
+# Objects that were not decorated, decorated once by invoke
+_decorated = {}
+
+
+class ParserExit(Exception):
+    """Raised in place of SystemExit by the parsers of an invocation"""
+
+    def __init__(self, status, message=None):
+        super(ParserExit, self).__init__(status, message)
+        self.status = status
+        self.message = message
+
+
+class Invocation(object):
+    """The streams of the invocation running on a thread"""
+
+    def __init__(self, stdout, stderr):
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+def current():
+    """Returns the Invocation running on this thread, or None"""
+    return getattr(_local, 'invocation', None)
+
+
+class Result(object):
+    """The outcome of invoke.  value is what the command returned and status
+    its exit status.  If the command line could not be parsed, error holds
+    the message and status is 2.  If the command raised, exception holds the
+    exception and status is 1."""
+
+    def __init__(self, value=None, status=0, error=None, exception=None, stdout=None,
+                 stderr=None):
+        self.value = value
+        self.status = status
+        self.error = error
+        self.exception = exception
+        self.stdout = stdout
+        self.stderr = stderr
+
+    @property
+    def ok(self):
+        return self.status == 0
+
+    def __repr__(self):
+        return 'Result(value={v!r}, status={s!r}, error={e!r}, exception={x!r})'.format(
+            v=self.value, s=self.status, e=self.error, x=self.exception)
+
+
+def _entry(obj):
+    """Returns obj decorated, only decorating it once"""
+    if hasattr(obj, 'parse_command'):
+        return obj
+
+    try:
+        return _decorated[obj]
+    except KeyError:
+        from . import decorators
+        return _decorated.setdefault(obj, decorators.make_easy_args(obj))
+
+
+def _exit_status(code):
+    # The same as the status of a process that calls sys.exit(code)
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    return 1
+
+
+def invoke(obj, argv, stdout=None, stderr=None):
+    """Parses argv with the parser of obj, a decorated function or class,
+    calls the selected command and returns a Result.  stdout and stderr
+    default to new StringIO objects, which are kept on the Result."""
+    from . import dispatch
+
+    if stdout is None or stderr is None:
+        from six import StringIO
+        stdout = StringIO() if stdout is None else stdout
+        stderr = StringIO() if stderr is None else stderr
+
+    entry = _entry(obj)
+    previous = current()
+    _local.invocation = Invocation(stdout, stderr)
+    try:
+        try:
+            function, args = entry.parse_command(list(argv))
+        except ParserExit as exit:
+            error = exit.message.strip() if exit.status and exit.message else None
+            return Result(status=exit.status, error=error, stdout=stdout, stderr=stderr)
+
+        if function is None:
+            return Result(stdout=stdout, stderr=stderr)
+
+        try:
+            value = dispatch.call(function, args, **getattr(entry, 'dispatch_options', {}))
+        except SystemExit as exit:
+            return Result(status=_exit_status(exit.code), stdout=stdout, stderr=stderr)
+        except Exception as exception:
+            return Result(status=1, exception=exception, stdout=stdout, stderr=stderr)
+
+        return Result(value, dispatch.exit_status(value), stdout=stdout, stderr=stderr)
+    finally:
+        _local.invocation = previous
@@ -7,6 +7,9 @@ from __future__ import print_function
 import argparse
 import inspect
 
+# getargspec was removed in Python 3.11
+_getargspec = getattr(inspect, 'getfullargspec', None) or inspect.getargspec
+
 
 def filter_private_methods(method):
     return not method.startswith('_')
@@ -36,7 +39,7 @@ def create_sub_parser(parser, method_info):
 
     # Get the arguments for the method
     # TODO: do something sensible with args and varargs
-    args, _, _, defaults = inspect.getargspec(method)
+    args, _, _, defaults = _getargspec(method)[:4]
 
     num_positional = len(args)
     if defaults is not None:
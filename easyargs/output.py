@@ -0,0 +1,212 @@
+"""Writes the records yielded by a command to stdout.
+
+    @easyargs(flush='auto')
+    def main(count=10):
+        for idx in range(count):
+            yield idx
+
+When a command returns a generator, or any other iterator, handle_parser
+writes each record on a line of its own.  The lines are collected in a buffer
+of buffer_size bytes and written to the binary stdout in large chunks.  The
+flush policy decides when the buffer is also written out early:
+
+    'auto'   after every record if stdout is a terminal, otherwise 'never'
+    'line'   after every record
+    'never'  only when the buffer is full and at the end
+    N        after every N records
+
+If the reader goes away, e.g. with '| head', the generator is closed so that
+it stops early, later output to stdout is discarded and nothing is printed."""
+import errno
+import itertools
+import os
+import sys
+
+BUFFER_SIZE = 1 << 20
+
+# The number of records joined at a time when flushing is left to the buffer
+BATCH_SIZE = 1024
+
+_text_type = type(u'')
+_TEXT_TYPES = frozenset([str, _text_type])
+
+FLUSH_POLICIES = ('auto', 'line', 'never')
+
+
+def is_iterator(value):
+    """Returns True for generators and other iterators, but not for files"""
+    cls = type(value)
+    return ((hasattr(cls, '__next__') or hasattr(cls, 'next')) and hasattr(cls, '__iter__')
+            and not hasattr(value, 'read'))
+
+
+def _flush_every(flush, stream):
+    """Returns the number of records between flushes, or None"""
+    if flush == 'auto':
+        isatty = getattr(stream, 'isatty', None)
+        try:
+            return 1 if isatty is not None and isatty() else None
+        except ValueError:
+            return None
+    if flush == 'line':
+        return 1
+    if flush == 'never':
+        return None
+    if isinstance(flush, int) and not isinstance(flush, bool) and flush > 0:
+        return flush
+    raise ValueError('flush must be one of {p} or a number of records, not {f!r}'.format(
+        p=', '.join(FLUSH_POLICIES), f=flush))
+
+
+class RecordWriter(object):
+    """Writes records to stream, one per line, in chunks of buffer_size.  If
+    stream has a binary buffer, as sys.stdout does, the text is encoded and
+    written to that.  Records are written in batches, so that most of the
+    work is done by str.join."""
+
+    def __init__(self, stream=None, buffer_size=BUFFER_SIZE, flush='auto'):
+        if stream is None:
+            stream = sys.stdout
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.flush_every = _flush_every(flush, stream)
+
+        self._binary = getattr(stream, 'buffer', None)
+        if self._binary is not None:
+            # Anything already printed comes first
+            stream.flush()
+            self._encoding = getattr(stream, 'encoding', None) or 'utf-8'
+            self._errors = getattr(stream, 'errors', None) or 'strict'
+            self._newline = b'\n'
+        else:
+            self._newline = u'\n'
+
+        self._chunks = []
+        self._size = 0
+
+    def _encode(self, record):
+        if isinstance(record, bytes):
+            return record if self._binary is not None else record.decode('utf-8', 'replace')
+        if type(record) not in _TEXT_TYPES:
+            record = _text_type(record)
+        return record.encode(self._encoding, self._errors) if self._binary is not None else record
+
+    def _join(self, records):
+        kinds = set(map(type, records))
+        if bytes in kinds and bytes is not str:
+            # Raw bytes records are written as they are
+            return self._newline.join([self._encode(record) for record in records]) + self._newline
+
+        if not kinds.issubset(_TEXT_TYPES):
+            records = map(_text_type, records)
+        text = u'\n'.join(records) + u'\n'
+        return text.encode(self._encoding, self._errors) if self._binary is not None else text
+
+    def write_batch(self, records):
+        """Writes a list of records"""
+        data = self._join(records)
+        self._chunks.append(data)
+        self._size += len(data)
+        if self._size >= self.buffer_size or self.flush_every is not None:
+            self.flush()
+
+    def write(self, record):
+        self.write_batch([record])
+
+    def flush(self):
+        target = self._binary if self._binary is not None else self.stream
+        if self._chunks:
+            data = self._newline[:0].join(self._chunks)
+            self._chunks = []
+            self._size = 0
+            target.write(data)
+        target.flush()
+
+
+def _is_broken_pipe(error):
+    return getattr(error, 'errno', None) in (errno.EPIPE, errno.EINVAL)
+
+
+def _discard_stdout():
+    """Sends anything else written to stdout to os.devnull, so that flushing
+    it when the process exits does not fail again"""
+    try:
+        fileno = sys.stdout.fileno()
+    except (AttributeError, ValueError, IOError, OSError):
+        return
+
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, fileno)
+    finally:
+        os.close(devnull)
+
+
+def _write_remaining(writer, batch):
+    """Writes the records read before the records raised an exception, so
+    that they are not lost.  The exception is what gets reported, so a
+    reader that has gone away is ignored."""
+    try:
+        if batch:
+            writer.write_batch(batch)
+        writer.flush()
+    except (IOError, OSError) as error:
+        if not _is_broken_pipe(error):
+            raise
+
+
+def write_records(records, stream=None, buffer_size=BUFFER_SIZE, flush='auto'):
+    """Writes every record of the iterable records to stream, or stdout.
+    Returns False if the reader went away before everything was written.  If
+    the records raise an exception, the ones before it are written first."""
+    writer = RecordWriter(stream, buffer_size, flush)
+    iterator = iter(records)
+    batch_size = writer.flush_every or BATCH_SIZE
+    batch = []
+    try:
+        while True:
+            finished = False
+            try:
+                # extend keeps the records that it read before an exception
+                batch.extend(itertools.islice(iterator, batch_size))
+                finished = True
+            finally:
+                if not finished:
+                    _write_remaining(writer, batch)
+            if not batch:
+                break
+            records_read, batch = batch, []
+            writer.write_batch(records_read)
+        writer.flush()
+    except (IOError, OSError) as error:
+        if not _is_broken_pipe(error):
+            raise
+        close = getattr(records, 'close', None)
+        if close is not None:
+            close()
+        if stream is None or stream is sys.stdout:
+            _discard_stdout()
+        return False
+    return True
+
+
+def stream_result(result, output=None):
+    """Writes result to stdout if it is an iterator, see write_records, and
+    returns None.  output holds the keyword arguments for write_records.
+
+    The records of a FanOut, see easyargs.fanout, are written as its calls
+    finish.  Their combined exit status is returned if it is 0 and otherwise
+    raised as SystemExit, so that a failed call is never silently ignored.
+    Any other result is returned as it is."""
+    if getattr(type(result), 'easyargs_fan_out', False):
+        write_records(result.records(), **(output or {}))
+        status = result.exit_status
+        if status:
+            sys.exit(status)
+        return status
+
+    if not is_iterator(result):
+        return result
+
+    write_records(result, **(output or {}))
+    return None
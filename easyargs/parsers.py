@@ -1,10 +1,47 @@
 import inspect
 import argparse
+import functools
 import re
+import sys
+import threading
+import types
 
+from . import (annotations, argtypes, dispatch, instrumentation, invocation,
+               output as command_output)
 
-def handle_parser(parser):
-    args = vars(parser.parse_args())
+
+class ArgumentParser(argparse.ArgumentParser):
+    """The parser class used by easyargs.  While easyargs.invoke is running on
+    the current thread, messages are written to its streams and exiting
+    raises invocation.ParserExit instead of SystemExit."""
+
+    def _print_message(self, message, file=None):
+        current = invocation.current()
+        if current is None:
+            return super(ArgumentParser, self)._print_message(message, file)
+
+        # print_help and print_usage pass sys.stdout, errors sys.stderr
+        if message:
+            (current.stdout if file is sys.stdout else current.stderr).write(message)
+
+    def exit(self, status=0, message=None):
+        if invocation.current() is None:
+            return super(ArgumentParser, self).exit(status, message)
+
+        if message:
+            self._print_message(message, sys.stderr)
+        raise invocation.ParserExit(status, message)
+
+
+@instrumentation.timed('handle_parser')
+def handle_parser(parser, args=None, output=None, **options):
+    """Parses args, or sys.argv if args is None, and calls the function that
+    was selected with the parsed arguments.  options are passed on to
+    dispatch.call.  If the function returns an iterator, its records are
+    written to stdout with the write_records arguments in output, see
+    easyargs.output."""
+    with instrumentation.phase('parse'):
+        args = vars(parser.parse_args(args))
 
     # Get the handler function
     try:
@@ -13,42 +50,165 @@ def handle_parser(parser):
         return
 
     # Call the original function with the parser args
-    return function(**args)
+    with instrumentation.phase('dispatch'):
+        result = dispatch.call(function, args, **options)
+        return command_output.stream_result(result, output)
+
+
+def help_texts(parser, path=()):
+    """Renders the help of parser and of every sub parser under it.  Returns a
+    dict from the path of sub command names, e.g. () or ('clone',), to the
+    text that -h prints.  Lazily built sub parsers are built."""
+    texts = {path: parser.format_help()}
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            for name in list(action.choices):
+                texts.update(help_texts(action.choices[name], path + (name,)))
+    return texts
+
+
+# Patterns used when parsing docstrings, compiled once
+_SPHINX_PARAM = re.compile(r':\s*param\s*(?P<param>\w+)\s*:(?P<help>.*)$')
+_GOOGLE_PARAM = re.compile(r'^\*{0,2}(?P<param>\w+)\s*(?:\([^)]*\))?\s*:(?P<help>.*)$')
+_NUMPY_PARAM = re.compile(r'^(?P<param>\w+)\s*(?::.*)?$')
+_NUMPY_UNDERLINE = re.compile(r'^-{3,}$')
+
+# The Google / NumPy style section headers that are recognised.  Only the
+# param sections are used, the others are removed from the description.
+PARAM_SECTIONS = frozenset(['args', 'arguments', 'parameters', 'params',
+                            'keyword args', 'keyword arguments', 'other parameters'])
+OTHER_SECTIONS = frozenset(['returns', 'return', 'yields', 'yield', 'raises',
+                            'examples', 'example', 'notes', 'note', 'see also',
+                            'attributes', 'references', 'warnings', 'warning',
+                            'todo', 'methods'])
+
+_help_text_cache = {}
+
+
+def _section_header(line, next_line):
+    """Returns (name, style) if line starts a Google or NumPy style section"""
+    if line.endswith(':'):
+        name = line[:-1].strip().lower()
+        if name in PARAM_SECTIONS or name in OTHER_SECTIONS:
+            return name, 'google'
+    elif next_line is not None and _NUMPY_UNDERLINE.match(next_line):
+        name = line.lower()
+        if name in PARAM_SECTIONS or name in OTHER_SECTIONS:
+            return name, 'numpy'
+    return None, None
+
+
+def _parse_help_text(help_text):
+    main_lines = []
+    params_help = {}
+
+    lines = help_text.splitlines()
+    stripped = [line.strip() for line in lines]
+    num_lines = len(lines)
+
+    # The current section, its style and indent and the param being written to
+    section = section_style = None
+    section_indent = 0
+    param = None
+    param_indent = None
+
+    idx = 0
+    while idx < num_lines:
+        line = stripped[idx]
+        indent = len(lines[idx]) - len(lines[idx].lstrip())
+        next_line = stripped[idx + 1] if idx + 1 < num_lines else None
+        idx += 1
+
+        if section is not None and line:
+            name, _ = _section_header(line, next_line)
+            if name is not None or (section_style == 'google' and indent <= section_indent):
+                # The current section has finished
+                section = param = param_indent = None
+
+        if section is None:
+            match = _SPHINX_PARAM.search(line)
+            if match:
+                params_help[match.group('param')] = match.group('help').strip()
+                continue
+
+            name, section_style = _section_header(line, next_line)
+            if name is None:
+                main_lines.append(line)
+                continue
+
+            section = name
+            section_indent = indent
+            if section_style == 'numpy':
+                # Skip the underline
+                idx += 1
+            continue
+
+        if not line or section not in PARAM_SECTIONS:
+            continue
+
+        if param_indent is None or indent <= param_indent:
+            pattern = _GOOGLE_PARAM if section_style == 'google' else _NUMPY_PARAM
+            match = pattern.match(line)
+            if match:
+                param = match.group('param')
+                param_indent = indent
+                help_text = match.groupdict().get('help') or ''
+                params_help[param] = help_text.strip()
+                continue
+
+        if param is not None:
+            # Continuation of the help for the current param
+            params_help[param] = (params_help[param] + ' ' + line).strip()
+
+    return ' '.join(main_lines).strip(), params_help
 
 
 def parser_help_text(help_text):
     """Takes the help text supplied as a doc string and extraxts the
-    description and any param arguments."""
+    description and any param arguments.
+
+    Params can be given as sphinx style ':param name: help' lines or in Google
+    ('Args:') or NumPy ('Parameters' followed by '----------') style sections.
+    The result is cached, so each docstring is only parsed once."""
     if help_text is None:
         return None, {}
 
-    main_text = ''
-    params_help = {}
+    try:
+        main_text, params_help = _help_text_cache[help_text]
+    except KeyError:
+        main_text, params_help = _parse_help_text(help_text)
+        _help_text_cache[help_text] = main_text, params_help
 
-    for line in help_text.splitlines():
-        line = line.strip()
-        match = re.search(r':\s*param\s*(?P<param>\w+)\s*:(?P<help>.*)$', line)
-        if match:
-            params_help[match.group('param')] = match.group('help').strip()
-        else:
-            main_text += line + ' '
+    # Return a copy so that callers cannot modify the cached value
+    return main_text, dict(params_help)
 
-    main_text = main_text.strip()
-    return main_text, params_help
 
+def _new_parser(description, response_files=False):
+    """Returns the top level parser.  response_files is True to expand @file
+    arguments, or 'lazy' to pass them to list arguments unread, see
+    easyargs.responsefiles."""
+    if not response_files:
+        return ArgumentParser(description=description)
 
-def create_base_parser(obj):
+    from . import responsefiles
+    return responsefiles.ResponseFileParser(description=description,
+                                            fromfile_prefix_chars=responsefiles.PREFIX,
+                                            lazy_lists=response_files == 'lazy')
+
+
+@instrumentation.timed('create_base_parser')
+def create_base_parser(obj, response_files=False):
     # Get the help text for the function
     help_text = inspect.getdoc(obj)
     main_text, params_help = parser_help_text(help_text)
 
-    parser = argparse.ArgumentParser(description=main_text)
+    parser = _new_parser(main_text, response_files)
     return parser
 
 
-def calculate_default_type(arg, has_default, default_value, params_help):
-    """This function looks at the default value and returns the type that
-       should be supplied to the parser"""
+def calculate_default_type(arg, has_default, default_value, params_help, annotation=None):
+    """This function looks at the default value, and the annotation if there
+       is one, and returns the type that should be supplied to the parser"""
     positional = True
     arg_params = {}
     arg_name = arg
@@ -64,27 +224,62 @@ def calculate_default_type(arg, has_default, default_value, params_help):
         positional = False
 
     # Special case when a base type is supplied
-    if default_value in (int, float):
+    if default_value in (int, float, list):
         positional = True
 
+    # Default values such as Stream open the file named by the argument
+    arg_type = argtypes.argument_type(default_value)
+    if arg_type is not None:
+        positional = True
+        arg_params['type'] = arg_type
+
+    # Typed lists, e.g. [int], are converted to an array in one step
+    array_action = argtypes.array_action(default_value)
+    if array_action is not None:
+        positional = True
+
+    # Annotations set the type, using a converter that is made once for each
+    # annotation, see easyargs.annotations
+    annotated = dict(annotations.annotation_params(annotation))
+    optional = annotated.pop('optional', False)
+    is_list = annotated.get('nargs') == '+'
+    if arg_type is None and isinstance(annotated.get('type'), argtypes.ArgumentType):
+        arg_type = annotated['type']
+    arg_params.update(annotated)
+
     # For boolean options, change the action
     if default_value is True:
         arg_params['action'] = 'store_false'
+        arg_params.pop('type', None)
     elif default_value is False:
         arg_params['action'] = 'store_true'
+        arg_params.pop('type', None)
 
     # Finally, check if the default value is an integer or a float
     # and set the arg type on the item
-    if type(default_value) in (int, float):
+    if type(default_value) in (int, float) and 'type' not in arg_params:
         arg_params['type'] = type(default_value)
 
     # Update the arg_name
     if positional:
-        if arg_name.startswith('_'):
+        if arg_name.startswith('_') or optional:
             arg_params['nargs'] = '?'
             arg_params['default'] = None
-            arg_params['metavar'] = arg_name.lstrip('_')
+            if arg_name.startswith('_'):
+                arg_params.setdefault('metavar', arg_name.lstrip('_'))
             #arg_name = arg_name.lstrip('_')
+            if arg_type is not None:
+                arg_params['default'] = arg_type.optional_default
+
+        # A list consumes all of the remaining values
+        if default_value is list or array_action is not None or is_list:
+            if arg_name.startswith('_') or optional:
+                arg_params['nargs'] = '*'
+                arg_params['default'] = []
+            else:
+                arg_params['nargs'] = '+'
+            if array_action is not None:
+                arg_params['action'] = array_action
     else:
         arg_params['default'] = default_value
         if len(arg_name) == 1:
@@ -95,59 +290,348 @@ def calculate_default_type(arg, has_default, default_value, params_help):
     return arg_name, arg_params
 
 
-def function_parser(function, parser):
-    """This function parses a function and adds its arguments to the supplied parser"""
-
-    # Store the function pointer on the parser for later use
-    parser.set_defaults(func=function)
+def _type_hints(function):
+    """Returns the annotations of function with any string annotations, e.g.
+    from 'from __future__ import annotations', evaluated where possible"""
+    import typing
+    try:
+        return typing.get_type_hints(function)
+    except Exception:
+        # Names that cannot be resolved leave the annotation as a string,
+        # which is ignored
+        return getattr(function, '__annotations__', {})
+
+
+def function_parameters(function):
+    """Returns a (name, has default, default, annotation) tuple for each
+    argument of function that can be given by name.  *args and **kwargs are
+    left out, and annotation is None if there is none."""
+    signature = getattr(inspect, 'signature', None)
+    if signature is None:
+        # Python 2 has neither signatures nor annotations
+        args, varargs, keywords, defaults = inspect.getargspec(function)
+        defaults = defaults or ()
+        num_required_args = len(args) - len(defaults)
+        return [(arg, idx >= num_required_args,
+                 defaults[idx - num_required_args] if idx >= num_required_args else None, None)
+                for idx, arg in enumerate(args)]
+
+    hints = _type_hints(function) if getattr(function, '__annotations__', None) else {}
+    parameters = []
+    for parameter in signature(function).parameters.values():
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+
+        has_default = parameter.default is not parameter.empty
+        annotation = hints.get(parameter.name)
+        if isinstance(annotation, str):
+            annotation = None
+        parameters.append((parameter.name, has_default,
+                           parameter.default if has_default else None, annotation))
+    return parameters
+
+
+def function_spec(function, bound=False):
+    """Inspects a function and returns its spec.  The spec is a dict holding
+    the description of the function and the (name, params) pairs that should
+    be added to a parser for each of its arguments.  If bound is True the
+    function is a method taken from a class dict and its first argument, self
+    or cls, is left out."""
 
     # Get the help text and parse it for params
     help_text = inspect.getdoc(function)
     main_text, params_help = parser_help_text(help_text)
 
-    # Get the function information
-    args, varargs, keywords, defaults = inspect.getargspec(function)
-    if args is None:
-        args = []
-
-    if defaults is None:
-        defaults = []
+    parameters = function_parameters(function)
 
     # If the function is a class method, it will have a self that needs to be removed
-    if len(args) and args[0] == 'self':
-        args.pop(0)
-
-    # Work out whether the argument has a default by subtracting the length
-    # of the default args from the number of arguments
-    num_required_args = len(args) - len(defaults)
-    for idx, arg in enumerate(args):
-        if idx < num_required_args:
-            arg_name, arg_params = calculate_default_type(arg, False, None, params_help)
-        else:
-            default_value = defaults[idx - num_required_args]
-            arg_name, arg_params = calculate_default_type(arg, True, default_value, params_help)
+    if len(parameters) and (bound or parameters[0][0] == 'self'):
+        parameters.pop(0)
+
+    arguments = []
+    for arg, has_default, default_value, annotation in parameters:
+        arg_name, arg_params = calculate_default_type(arg, has_default, default_value,
+                                                      params_help, annotation)
+        arguments.append((arg_name, arg_params))
+
+    return {'description': main_text, 'arguments': arguments}
+
+
+def apply_function_spec(spec, function, parser):
+    """Adds the arguments from a function spec to the supplied parser"""
 
+    # Store the function pointer on the parser for later use
+    parser.set_defaults(func=function)
+
+    for arg_name, arg_params in spec['arguments']:
         parser.add_argument(arg_name, **arg_params)
 
 
+@instrumentation.timed('function_parser')
+def function_parser(function, parser):
+    """This function parses a function and adds its arguments to the supplied parser"""
+    apply_function_spec(function_spec(function), function, parser)
+
+
 def filter_private_methods(method):
     """Simple filter method.  Ignores private functions"""
     return not method.startswith('_')
 
 
-def class_parser(klass, parser, method_filter=filter_private_methods):
-    # Create a subparser object to handle the sub commands
-    subparsers = parser.add_subparsers(help='sub-command help')
-
-    # Find all of the methods in the object instance
-    all_methods = inspect.getmembers(klass, inspect.ismethod)
+def _class_of(obj):
+    """Returns the class of a class, an instance or a dispatch.Instance"""
+    if isinstance(obj, dispatch.Instance):
+        return obj.klass
+    if inspect.isclass(obj):
+        return obj
+    return type(obj)
+
+
+def method_table(klass, method_filter=filter_private_methods):
+    """Returns a (name, function) pair for each method of klass that passes
+    method_filter, sorted by name.  klass can also be an instance.
+
+    The dicts of the classes in the MRO are read directly, so properties and
+    other descriptors are never evaluated.  Functions and class methods are
+    included, static methods are not, and the functions are returned unbound,
+    see function_spec(bound=True)."""
+    methods = {}
+    for cls in inspect.getmro(_class_of(klass)):
+        if cls is object:
+            continue
+        for name, value in vars(cls).items():
+            # The first class in the MRO that defines a name wins, even if
+            # it is not a method
+            if name in methods or not method_filter(name):
+                continue
+            if isinstance(value, classmethod):
+                value = value.__func__
+            methods[name] = value if isinstance(value, types.FunctionType) else None
+
+    return sorted([(name, function) for name, function in methods.items() if function is not None],
+                  key=lambda method: method[0])
+
+
+def method_getter(obj):
+    """Returns a function that looks up a method of obj by name.  If obj is a
+    class, or a dispatch.Instance, it is only instantiated when one of the
+    methods is called."""
+    if inspect.isclass(obj):
+        obj = dispatch.Instance(obj)
+    if isinstance(obj, dispatch.Instance):
+        return obj.method
+    return functools.partial(getattr, obj)
+
+
+class _LazyParserMap(dict):
+    """The name to parser mapping used by LazySubParsersAction.  Names can be
+    registered with a build function, the parser is only created the first
+    time that the name is looked up."""
+
+    def __init__(self, action):
+        super(_LazyParserMap, self).__init__()
+        self._action = action
+        self._pending = {}
+        self._order = []
+        self._lock = threading.Lock()
+        # The name being built by this thread, other threads wait for it
+        self._local = threading.local()
+
+    def register(self, name, build):
+        self._pending[name] = build
+        self._order.append(name)
+
+    def __setitem__(self, name, parser):
+        if name not in self._order:
+            self._order.append(name)
+        # A parser that is being built is only stored once it is complete
+        if name != getattr(self._local, 'building', None):
+            super(_LazyParserMap, self).__setitem__(name, parser)
+
+    def __missing__(self, name):
+        # Parsers may be used from several threads at once, see invocation
+        with self._lock:
+            if super(_LazyParserMap, self).__contains__(name):
+                return super(_LazyParserMap, self).__getitem__(name)
+
+            # A KeyError here is reported by argparse as an unknown parser
+            build = self._pending[name]
+            self._local.building = name
+            try:
+                parser = self._action.add_parser(name)
+            finally:
+                self._local.building = None
+            build(parser)
+
+            del self._pending[name]
+            super(_LazyParserMap, self).__setitem__(name, parser)
+            return parser
+
+    def __contains__(self, name):
+        # add_parser checks for conflicting names on Python 3.11 and later
+        if name == getattr(self._local, 'building', None):
+            return False
+        return super(_LazyParserMap, self).__contains__(name) or name in self._pending
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def keys(self):
+        return list(self._order)
+
+
+class _LazyChoicesPseudoAction(argparse._SubParsersAction._ChoicesPseudoAction):
+    """Holds the help text for a lazily built sub parser.  The help text is
+    only calculated when the help is actually displayed"""
+
+    def __init__(self, name, help_text):
+        self._help_text = help_text
+        self._help = None
+        super(_LazyChoicesPseudoAction, self).__init__(name, (), None)
+
+    @property
+    def help(self):
+        if self._help_text is not None:
+            self._help = self._help_text()
+            self._help_text = None
+        return self._help
+
+    @help.setter
+    def help(self, value):
+        self._help = value
+
+
+class LazySubParsersAction(argparse._SubParsersAction):
+    """A sub parsers action that only builds a sub parser when argv selects
+    it"""
+
+    def __init__(self, *args, **kwargs):
+        super(LazySubParsersAction, self).__init__(*args, **kwargs)
+        self._name_parser_map = _LazyParserMap(self)
+        self.choices = self._name_parser_map
+
+    def add_lazy_parser(self, name, build, help_text=None):
+        """Registers a sub parser called name.  build will be called with the
+        new parser once it is needed and help_text, if supplied, is called
+        to get the help for the sub command listing."""
+        self._name_parser_map.register(name, build)
+        if help_text is not None:
+            self._choices_actions.append(_LazyChoicesPseudoAction(name, help_text))
+
+
+def method_help_text(method):
+    """Returns the help text used in the sub command listing for method"""
+    main_text, params_help = parser_help_text(inspect.getdoc(method))
+    return main_text
+
+
+def _method_parser(function, method, parser):
+    apply_function_spec(function_spec(function, bound=True), method, parser)
+
+
+def _add_subparsers(parser, lazy, groups):
+    # Command groups are always built lazily
+    if lazy or groups:
+        return parser.add_subparsers(help='sub-command help', action=LazySubParsersAction)
+    return parser.add_subparsers(help='sub-command help')
+
+
+def _add_groups(subparsers, groups, lazy):
+    """Registers a lazily built sub parser for each command group, see
+    easyargs.groups.  Methods take precedence over groups with the same name."""
+    for group in groups:
+        if group.name in subparsers.choices:
+            continue
+        subparsers.add_lazy_parser(group.name, functools.partial(group.build, lazy=lazy),
+                                   group.help)
+
+
+@instrumentation.timed('class_parser')
+def class_parser(klass, parser, method_filter=filter_private_methods, lazy=False, methods=None,
+                 groups=None):
+    """This function adds a sub parser to the supplied parser for each public
+    method of klass.  If lazy is True the sub parsers are only built when the
+    command line selects them.  klass can be a class, which is instantiated
+    once a command is called, or an instance.  methods is the result of
+    method_table, if that has already been worked out, and groups the command
+    groups, see easyargs.groups."""
+    if methods is None:
+        methods = method_table(klass, method_filter)
+    if groups is None:
+        groups = []
 
-    # Let's filter the list down to what we actually want to expose
-    methods_to_expose = [m for m in all_methods if method_filter(m[0])]
+    # Create a subparser object to handle the sub commands
+    subparsers = _add_subparsers(parser, lazy, groups)
+    get_method = method_getter(klass)
 
     # Let's now create a sub parser for each method found
-    for name, method in methods_to_expose:
-        help_text = inspect.getdoc(method)
-        main_text, params_help = parser_help_text(help_text)
-        method_parser = subparsers.add_parser(name, help=main_text)
-        function_parser(method, method_parser)
+    for name, function in methods:
+        method = get_method(name)
+        if lazy:
+            subparsers.add_lazy_parser(name,
+                                       functools.partial(_method_parser, function, method),
+                                       functools.partial(method_help_text, function))
+            continue
+
+        spec = function_spec(function, bound=True)
+        method_parser = subparsers.add_parser(name, help=spec['description'])
+        apply_function_spec(spec, method, method_parser)
+
+    _add_groups(subparsers, groups, lazy)
+
+
+def class_spec(klass, method_filter=filter_private_methods, methods=None):
+    """Inspects a class, or an instance, and returns its spec.  As well as the
+    description, the spec holds a (name, help, function spec) tuple for each
+    sub command."""
+    if methods is None:
+        methods = method_table(klass, method_filter)
+
+    commands = []
+    for name, function in methods:
+        spec = function_spec(function, bound=True)
+        commands.append((name, spec['description'], spec))
+
+    main_text, params_help = parser_help_text(inspect.getdoc(_class_of(klass)))
+    return {'description': main_text, 'commands': commands}
+
+
+def object_spec(obj, method_filter=filter_private_methods, methods=None):
+    """Returns the spec for either a function or a class"""
+    if inspect.isfunction(obj):
+        return function_spec(obj)
+
+    return class_spec(obj, method_filter, methods)
+
+
+@instrumentation.timed('spec_parser')
+def spec_parser(spec, obj, lazy=False, groups=None, response_files=False):
+    """Builds a parser from a spec returned by object_spec without inspecting
+    obj again.  obj is the function or class the spec was made from.  groups
+    are the command groups, see easyargs.groups."""
+    parser = _new_parser(spec['description'], response_files)
+    if 'commands' not in spec:
+        apply_function_spec(spec, obj, parser)
+        return parser
+
+    if groups is None:
+        groups = []
+    subparsers = _add_subparsers(parser, lazy, groups)
+
+    get_method = method_getter(obj)
+    for name, help_text, command_spec in spec['commands']:
+        method = get_method(name)
+        if lazy:
+            subparsers.add_lazy_parser(name,
+                                       functools.partial(apply_function_spec, command_spec, method),
+                                       lambda help_text=help_text: help_text)
+            continue
+
+        method_parser = subparsers.add_parser(name, help=help_text)
+        apply_function_spec(command_spec, method, method_parser)
+
+    _add_groups(subparsers, groups, lazy)
+    return parser
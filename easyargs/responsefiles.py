@@ -0,0 +1,167 @@
+"""Response files: arguments that are read from a file named by @file.
+
+    prog @arguments.txt
+    find . -name '*.log' -print0 | prog @-
+
+argparse's fromfile_prefix_chars reads the whole file and takes one argument
+per line.  Here the file is read in chunks as it is tokenised, and two formats
+are understood.  If there is a NUL byte near the start of the file the
+arguments are NUL separated, as written by find -print0 or xargs -0.
+Otherwise each line is split like a shell command line, so several arguments
+can share a line and quotes keep spaces in an argument.  @- reads stdin.
+
+With lazy_lists the files are not read while parsing at all.  A response file
+given as the value of a list argument is passed to the function as part of a
+LazyArguments, which reads the file as it is iterated over.  In this mode a
+response file can only hold values, not options."""
+import io
+import os
+import shlex
+import sys
+
+from .parsers import ArgumentParser
+
+PREFIX = '@'
+STDIN = '-'
+CHUNK_SIZE = 1 << 16
+
+# Lines containing any of these are split with shlex, others with str.split
+_QUOTING = frozenset('\'"\\#')
+
+_decode = getattr(os, 'fsdecode', lambda value: value)
+
+
+def _open(path):
+    """Returns (file, whether to close it) for path, '-' is stdin"""
+    if path == STDIN:
+        return getattr(sys.stdin, 'buffer', sys.stdin), False
+    return io.open(path, 'rb'), True
+
+
+def _split_line(line):
+    text = _decode(line.rstrip(b'\r'))
+    if _QUOTING.isdisjoint(text):
+        return text.split()
+    return shlex.split(text, comments=True)
+
+
+def _nul_separated(source, data):
+    while True:
+        parts = data.split(b'\0')
+        data = parts.pop()
+        for part in parts:
+            if part:
+                yield _decode(part)
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        data += chunk
+
+    if data.strip():
+        yield _decode(data.rstrip(b'\r\n'))
+
+
+def _quoted(source, data):
+    while True:
+        lines = data.split(b'\n')
+        data = lines.pop()
+        for line in lines:
+            for argument in _split_line(line):
+                yield argument
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        data += chunk
+
+    for argument in _split_line(data):
+        yield argument
+
+
+def iter_arguments(path):
+    """Yields the arguments in the response file at path without reading the
+    whole file first.  In the quoted format, an argument that starts with @
+    names another response file, which is read in its place."""
+    source, close = _open(path)
+    try:
+        first = source.read(CHUNK_SIZE)
+        if b'\0' in first:
+            for argument in _nul_separated(source, first):
+                yield argument
+            return
+
+        for argument in _quoted(source, first):
+            if argument.startswith(PREFIX) and len(argument) > 1:
+                for nested in iter_arguments(argument[1:]):
+                    yield nested
+            else:
+                yield argument
+    finally:
+        if close:
+            source.close()
+
+
+class ResponseFile(str):
+    """An @file argument that is read later, see LazyArguments"""
+
+    @property
+    def path(self):
+        return self[len(PREFIX):]
+
+
+class LazyArguments(object):
+    """The values of a list argument, where any response files are only read
+    while the values are iterated over.  There is no len, as counting the
+    values would read the files, and @- can only be read once."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def __iter__(self):
+        for value in self.values:
+            if isinstance(value, ResponseFile):
+                for argument in iter_arguments(value.path):
+                    yield argument
+            else:
+                yield value
+
+    def __repr__(self):
+        return 'LazyArguments({v!r})'.format(v=[str(value) for value in self.values])
+
+
+class ResponseFileParser(ArgumentParser):
+    """An ArgumentParser that streams @file response files.  Use it with
+    fromfile_prefix_chars=PREFIX, sub parsers do not need it."""
+
+    def __init__(self, *args, **kwargs):
+        self.lazy_lists = kwargs.pop('lazy_lists', False)
+        super(ResponseFileParser, self).__init__(*args, **kwargs)
+
+    def _read_args_from_files(self, arg_strings):
+        expanded = []
+        for arg_string in arg_strings:
+            if not arg_string or arg_string[0] not in self.fromfile_prefix_chars:
+                expanded.append(arg_string)
+            elif self.lazy_lists:
+                expanded.append(ResponseFile(arg_string))
+            else:
+                try:
+                    expanded.extend(iter_arguments(arg_string[1:]))
+                except (IOError, OSError) as error:
+                    self.error(str(error))
+                except ValueError as error:
+                    # shlex could not split a line, e.g. an unclosed quote
+                    self.error('response file {p!r}: {e}'.format(p=arg_string[1:], e=error))
+        return expanded
+
+    def parse_known_args(self, args=None, namespace=None):
+        namespace, extras = super(ResponseFileParser, self).parse_known_args(args, namespace)
+        if not self.lazy_lists:
+            return namespace, extras
+
+        for dest, value in list(vars(namespace).items()):
+            if isinstance(value, list) and any(isinstance(item, ResponseFile) for item in value):
+                setattr(namespace, dest, LazyArguments(value))
+            elif isinstance(value, ResponseFile):
+                self.error('argument {d}: response files can only be used for list arguments'.format(
+                    d=dest))
+        return namespace, extras
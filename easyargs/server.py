@@ -0,0 +1,207 @@
+"""A warm server for a decorated entry point.
+
+The server imports the program and builds its parser once, then listens on a
+Unix socket.  For every connection it forks, and the child takes over the
+client's stdin, stdout and stderr, current directory, environment and argv,
+runs the entry point and sends the exit status back.  Repeated invocations
+therefore skip interpreter start up, imports and parser construction.
+
+Clients connect with easyargs/client.py, or a shim script written by
+write_shim.  This needs a POSIX system."""
+from __future__ import print_function
+
+import array
+import os
+import signal
+import socket
+import stat
+import sys
+import traceback
+
+from . import client, dispatch
+
+
+class ServerError(Exception):
+    """Raised if the server cannot be started"""
+
+
+def _is_socket(path):
+    """Returns True if path is a socket, False if it is anything else and
+    None if it does not exist"""
+    try:
+        mode = os.lstat(path).st_mode
+    except OSError:
+        return None
+    return stat.S_ISSOCK(mode)
+
+
+def parse_request(payload):
+    """Unpacks a request made by client.encode_request, returns
+    (argv, cwd, environ)"""
+    fields = payload.split(b'\0')
+    cwd = os.fsdecode(fields[0])
+    argc = int(fields[1])
+    argv = [os.fsdecode(arg) for arg in fields[2:2 + argc]]
+
+    environ = {}
+    for entry in fields[2 + argc:]:
+        key, _, value = entry.partition(b'=')
+        environ[os.fsdecode(key)] = os.fsdecode(value)
+    return argv, cwd, environ
+
+
+def receive_request(connection):
+    """Reads a request and the client's stdin, stdout and stderr file
+    descriptors from connection"""
+    fds = array.array('i')
+    header, ancillary, flags, address = connection.recvmsg(
+        client.HEADER.size, socket.CMSG_LEN(3 * fds.itemsize))
+    for level, kind, data in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - (len(data) % fds.itemsize)])
+
+    if len(header) != client.HEADER.size or len(fds) != 3:
+        raise ValueError('malformed request')
+
+    size = client.HEADER.unpack(header)[0]
+    payload = b''
+    while len(payload) < size:
+        chunk = connection.recv(size - len(payload))
+        if not chunk:
+            raise ValueError('truncated request')
+        payload += chunk
+
+    return parse_request(payload), list(fds)
+
+
+def run_entry(entry):
+    """Runs the decorated entry point, returns its exit status"""
+    try:
+        return dispatch.exit_status(entry())
+    except SystemExit as exit:
+        if exit.code is None:
+            return 0
+        if isinstance(exit.code, int):
+            return exit.code
+        print(exit.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def handle_connection(entry, connection, prog):
+    """Runs in the forked child: takes over the client's environment and
+    runs the entry point"""
+    (argv, cwd, environ), fds = receive_request(connection)
+
+    for target, fd in enumerate(fds):
+        if fd != target:
+            os.dup2(fd, target)
+            os.close(fd)
+
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(environ)
+    sys.argv = [prog] + argv
+
+    status = run_entry(entry)
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except Exception:
+        pass
+
+    connection.sendall(client.STATUS.pack(status))
+
+
+def _reap_children():
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except OSError:
+            return
+        if pid == 0:
+            return
+
+
+def _terminate(signum, frame):
+    sys.exit(0)
+
+
+def serve(entry, socket_path, prog=None, ready=None):
+    """Serves the decorated entry point on the Unix socket at socket_path until
+    interrupted.  prog is used as sys.argv[0] for each command, ready is
+    called once the server is listening.  Raises ServerError if socket_path
+    exists and is not a socket."""
+    if prog is None:
+        prog = os.path.basename(sys.argv[0])
+
+    # Do all of the expensive work once, before forking.  argparse takes the
+    # program name from sys.argv when the parser is built.
+    sys.argv = [prog]
+    entry.build_parser()
+
+    # Remove the socket left by a server that was killed, but never a file
+    # that was given by mistake
+    existing = _is_socket(socket_path)
+    if existing is False:
+        raise ServerError('{p} exists and is not a socket'.format(p=socket_path))
+    if existing:
+        os.remove(socket_path)
+
+    # Make sure that the socket is removed when the server is terminated
+    previous_handler = signal.signal(signal.SIGTERM, _terminate)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(socket_path)
+        # Anybody that can connect can run commands as this user
+        os.chmod(socket_path, stat.S_IRUSR | stat.S_IWUSR)
+        listener.listen(64)
+        if ready is not None:
+            ready()
+
+        while True:
+            connection, _ = listener.accept()
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            pid = os.fork()
+            if pid == 0:
+                status = 0
+                try:
+                    signal.signal(signal.SIGTERM, previous_handler)
+                    listener.close()
+                    handle_connection(entry, connection, prog)
+                except Exception:
+                    traceback.print_exc()
+                    status = 1
+                finally:
+                    os._exit(status)
+
+            connection.close()
+            _reap_children()
+    finally:
+        listener.close()
+        if _is_socket(socket_path):
+            os.remove(socket_path)
+
+
+def write_shim(path, socket_path, python=None):
+    """Writes an executable shell script to path that runs its arguments on
+    the server at socket_path.  The client is run without site packages, so
+    the shim starts as quickly as possible."""
+    if python is None:
+        python = sys.executable
+
+    client_path = os.path.abspath(client.__file__)
+    if client_path.endswith(('.pyc', '.pyo')):
+        client_path = client_path[:-1]
+
+    with open(path, 'w') as shim:
+        shim.write('#!/bin/sh\nexec "{p}" -S "{c}" "{s}" "$@"\n'.format(
+            p=python, c=client_path, s=os.path.abspath(socket_path)))
+
+    mode = os.stat(path).st_mode
+    os.chmod(path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
@@ -0,0 +1,54 @@
+"""Helpers for finding decorated objects given on the command line"""
+import importlib
+import os
+import sys
+
+
+def load_target(target):
+    """Imports a 'module:name' target and returns the object it names.  name
+    can be a dotted path to an attribute of the module."""
+    module_name, sep, name = target.partition(':')
+    if not sep or not module_name or not name:
+        raise ValueError("target must be given as 'module:name', not {t!r}".format(t=target))
+
+    # Allow targets in the current directory to be imported
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    obj = importlib.import_module(module_name)
+    for attribute in name.split('.'):
+        obj = getattr(obj, attribute)
+    return obj
+
+
+def unwrap(obj):
+    """Returns the function or class underneath an easyargs decorated object"""
+    return getattr(obj, '__wrapped__', obj)
+
+
+def target_spec(obj):
+    """Returns the spec of a target, see parsers.object_spec"""
+    build_spec = getattr(obj, 'build_spec', None)
+    if build_spec is not None:
+        return build_spec()
+
+    from . import parsers
+    return parsers.object_spec(unwrap(obj))
+
+
+def check_static(obj, tool, defaults=False):
+    """Raises ValueError if obj has command groups, which tool, e.g. compile,
+    cannot write out as it works from the spec of obj alone.  If defaults is
+    True, the same goes for defaults read from config files or the
+    environment, see easyargs.config."""
+    name = getattr(unwrap(obj), '__name__', obj)
+    build_groups = getattr(obj, 'build_groups', None)
+    groups = build_groups() if build_groups is not None else None
+    if groups:
+        raise ValueError('{t} does not support command groups, {o} has {g}'.format(
+            t=tool, o=name, g=', '.join(group.name for group in groups)))
+
+    layered = getattr(obj, 'layered_defaults', None) or {}
+    if defaults and (layered.get('config') or layered.get('env')):
+        raise ValueError('{t} does not support defaults from config files or the environment, '
+                         '{o} uses them'.format(t=tool, o=name))
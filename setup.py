@@ -17,13 +17,18 @@ here = path.abspath(path.dirname(__file__))
 with open(path.join(here, 'README.rst'), encoding='utf-8') as f:
     long_description = f.read()
 
+# Get the version from the package without importing it
+version = {}
+with open(path.join(here, 'easyargs', 'version.py'), encoding='utf-8') as f:
+    exec(f.read(), version)
+
 setup(
     name='easyargs',
 
     # Versions should comply with PEP440.  For a discussion on single-sourcing
     # the version across setup.py and the project code, see
     # https://packaging.python.org/en/latest/single_source_version.html
-    version='0.9.4',
+    version=version['__version__'],
 
     description='Making argument parsing easy',
     long_description=long_description,
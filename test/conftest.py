@@ -0,0 +1,8 @@
+import sys
+
+# These tests use syntax that is not available in older pythons
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_aio.py')
+if sys.version_info < (3, 9):
+    collect_ignore.append('test_annotations.py')
@@ -0,0 +1,35 @@
+"""Fixtures shared by the tests"""
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+# The root of the repository, to put on the path of a subprocess
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(obj, argv, environ=None):
+    """Calls the decorated obj with argv as the command line, and environ
+    added to the environment"""
+    with mock.patch('sys.argv', ['prog'] + argv), \
+            mock.patch.dict('os.environ', environ or {}):
+        return obj()
+
+
+class FileTestCase(unittest.TestCase):
+    """Gives each test a temporary directory to write files to"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        """Writes content, text or bytes, to the file name in the directory
+        and returns its path"""
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb' if isinstance(content, bytes) else 'w') as f:
+            f.write(content)
+        return path
@@ -0,0 +1,115 @@
+from __future__ import print_function
+
+import asyncio
+import unittest
+import mock
+import six
+
+import easyargs
+from easyargs import aio, argtypes
+from helpers import FileTestCase
+
+
+class TestCoroutineEntryPoints(unittest.TestCase):
+    @mock.patch('sys.argv', [__name__, 'Joe', '--count', '2'])
+    def test_coroutine_function(self):
+        @easyargs
+        async def main(name, count=1):
+            await asyncio.sleep(0)
+            return name * count
+
+        self.assertEqual(main(), 'JoeJoe')
+
+    @mock.patch('sys.argv', [__name__, 'Joe', '--count', '2'])
+    def test_coroutine_function_fast_path(self):
+        @easyargs(fast=True)
+        async def main(name, count=1):
+            return name * count
+
+        self.assertEqual(main(), 'JoeJoe')
+
+    @mock.patch('sys.argv', [__name__, 'fetch', 'url'])
+    def test_coroutine_method(self):
+        @easyargs
+        class Client(object):
+            async def fetch(self, url):
+                await asyncio.sleep(0)
+                return 'fetched ' + url
+
+        self.assertEqual(Client(), 'fetched url')
+
+    @mock.patch.dict('os.environ', {'EASYARGS_UVLOOP': '0'})
+    def test_uvloop_can_be_disabled(self):
+        loop = aio.new_event_loop()
+        try:
+            self.assertTrue(isinstance(loop, asyncio.AbstractEventLoop))
+            self.assertEqual(type(loop).__module__.split('.')[0], 'asyncio')
+        finally:
+            loop.close()
+
+
+class TestRunMany(unittest.TestCase):
+    def setUp(self):
+        self.running = 0
+        self.peak = 0
+
+        @easyargs(auto_call=False)
+        async def fetch(url, delay=0.0):
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            await asyncio.sleep(delay)
+            self.running -= 1
+            if url == 'bad':
+                raise ValueError(url)
+            return url.upper()
+
+        self.fetch = fetch
+
+    def test_results_in_order(self):
+        argvs = [['a', '--delay', '0.02'], ['b'], ['c', '--delay', '0.01']]
+        self.assertEqual(aio.run_many(self.fetch, argvs), ['A', 'B', 'C'])
+
+    def test_concurrency_limit(self):
+        argvs = [[str(idx), '--delay', '0.01'] for idx in range(10)]
+        aio.run_many(self.fetch, argvs, concurrency=3)
+        self.assertEqual(self.peak, 3)
+
+    def test_return_exceptions(self):
+        results = aio.run_many(self.fetch, [['a'], ['bad']], return_exceptions=True)
+        self.assertEqual(results[0], 'A')
+        self.assertTrue(isinstance(results[1], ValueError))
+
+    def test_usage_error(self):
+        with mock.patch('sys.stderr', new_callable=six.StringIO):
+            self.assertRaises(SystemExit, aio.run_many, self.fetch, [['a'], []])
+
+    def test_env_defaults(self):
+        @easyargs(auto_call=False, env=True)
+        async def fetch(url, retries=3):
+            return url, retries
+
+        with mock.patch.dict('os.environ', {'FETCH_RETRIES': '1'}):
+            self.assertEqual(aio.run_many(fetch, [['a'], ['b', '--retries', '2']]),
+                             [('a', 1), ('b', 2)])
+
+
+class TestGatherFiles(FileTestCase):
+    def test_files_are_released(self):
+        path = self.write('items.txt', 'a\nb\n')
+        streams = []
+
+        @easyargs(auto_call=False)
+        async def count(lines=argtypes.Stream):
+            streams.append(lines)
+            return len(list(lines))
+
+        self.assertEqual(aio.run_many(count, [[path], [path]]), [2, 2])
+        self.assertEqual([stream._file for stream in streams], [None, None])
+
+    def test_map_over(self):
+        @easyargs(auto_call=False, map_over='urls')
+        async def fetch(urls=list):
+            return urls.upper()
+
+        results = aio.run_many(fetch, [['a', 'b']])
+        self.assertEqual(list(results[0]), ['A', 'B'])
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import enum
+import pathlib
+import unittest
+from typing import List, Literal, Optional
+
+import mock
+import six
+
+import easyargs
+from easyargs import annotations, argtypes, compiler, fastpath, parsers
+from helpers import FileTestCase, run
+
+
+class Level(enum.Enum):
+    debug = 10
+    info = 20
+
+
+class TestAnnotatedArguments(unittest.TestCase):
+    def setUp(self):
+        @easyargs
+        def main(path: pathlib.Path, count: int, level: Level = Level.info,
+                 mode: Literal['fast', 'safe'] = 'fast', retries: Optional[int] = None,
+                 ids: list[int] = None, ratio: float = 1, verbose: bool = False, *rest, **options):
+            return path, count, level, mode, retries, ids, ratio, verbose
+
+        self.main = main
+
+    def test_defaults(self):
+        self.assertEqual(run(self.main, ['out.txt', '3']),
+                         (pathlib.Path('out.txt'), 3, Level.info, 'fast', None, None, 1, False))
+
+    def test_converted(self):
+        argv = ['out.txt', '3', '--level', 'debug', '--mode', 'safe', '--retries', '2',
+                '--ids', '1', '2', '--ratio', '2', '--verbose']
+        self.assertEqual(run(self.main, argv),
+                         (pathlib.Path('out.txt'), 3, Level.debug, 'safe', 2, [1, 2], 2.0, True))
+
+    def test_enum_value(self):
+        self.assertEqual(run(self.main, ['x', '1', '--level', '20'])[2], Level.info)
+
+    def test_invalid_choice(self):
+        with mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            self.assertRaises(SystemExit, run, self.main, ['x', '1', '--mode', 'slow'])
+        self.assertTrue("invalid choice: 'slow' (choose from 'fast', 'safe')" in stderr.getvalue())
+
+    def test_help_lists_choices(self):
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertRaises(SystemExit, run, self.main, ['-h'])
+        self.assertTrue('--level {debug,info}' in stdout.getvalue())
+        self.assertTrue('--mode {fast,safe}' in stdout.getvalue())
+
+
+class TestPositionals(FileTestCase):
+    def test_optional_and_lists(self):
+        @easyargs
+        def main(flag: bool, names: List[str], _sizes: list[int], maybe: Optional[float]):
+            return flag, names, _sizes, maybe
+
+        name, params = parsers.calculate_default_type('maybe', False, None, {}, Optional[float])
+        self.assertEqual((name, params), ('maybe', {'type': float, 'nargs': '?', 'default': None}))
+
+        name, params = parsers.calculate_default_type('_sizes', False, None, {}, list[int])
+        self.assertEqual(params['nargs'], '*')
+        self.assertEqual(params['default'], [])
+
+        self.assertEqual(run(main, ['yes', 'a', 'b']), (True, ['a', 'b'], [], None))
+
+    def test_stream(self):
+        name, params = parsers.calculate_default_type('_lines', False, None, {}, argtypes.Stream)
+        self.assertTrue(isinstance(params['type'], argtypes.Stream))
+        self.assertEqual(params['default'], '-')
+
+        name, params = parsers.calculate_default_type('data', False, None, {}, argtypes.MappedFile)
+        self.assertEqual(name, 'data')
+        self.assertTrue(isinstance(params['type'], argtypes.MappedFile))
+
+    def test_list_of_streams_closed(self):
+        paths = [self.write(name, name + '\n') for name in ('a.txt', 'b.txt')]
+
+        received = []
+
+        @easyargs
+        def main(sources: list[argtypes.Stream]):
+            received.extend(sources)
+            return [line for source in sources for line in source]
+
+        self.assertEqual(run(main, paths), ['a.txt', 'b.txt'])
+        self.assertEqual([source._file for source in received], [None, None])
+
+        @easyargs
+        def lines(sources: list[argtypes.Stream]):
+            received[:] = sources
+            for source in sources:
+                for line in source:
+                    yield line
+
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            run(lines, paths)
+        self.assertEqual(stdout.getvalue(), 'a.txt\nb.txt\n')
+        self.assertEqual([source._file for source in received], [None, None])
+
+    def test_unknown_annotations_ignored(self):
+        def main(a: 'NotDefined', b: Optional[int | str] = None):
+            pass
+
+        spec = parsers.function_spec(main)
+        self.assertEqual(spec['arguments'], [('a', {}), ('-b', {'default': None})])
+
+
+class TestConverters(unittest.TestCase):
+    def test_made_once(self):
+        self.assertTrue(annotations.annotation_params(Level) is annotations.annotation_params(Level))
+
+        def first(level: Level):
+            pass
+
+        def second(level: Level = Level.debug):
+            pass
+
+        self.assertTrue(parsers.function_spec(first)['arguments'][0][1]['type']
+                        is parsers.function_spec(second)['arguments'][0][1]['type'])
+
+    def test_fast_path(self):
+        def main(count: int, level: Level = Level.info, mode: Literal['a', 'b'] = 'a'):
+            pass
+
+        engine = fastpath.compile_spec(parsers.function_spec(main))
+        self.assertEqual(engine.parse(['2', '--level', 'debug']),
+                         (None, {'count': 2, 'level': Level.debug, 'mode': 'a'}))
+        self.assertRaises(fastpath.Fallback, engine.parse, ['2', '--mode', 'c'])
+
+    def test_compiled(self):
+        spec = parsers.function_spec(TestCompiledTarget.main)
+        source = compiler.generate(spec, 'test.test_annotations:TestCompiledTarget.main')
+        self.assertTrue('EnumType(enum=Level)' in source)
+        self.assertTrue("Choices(values=('a', 'b'))" in source)
+        self.assertTrue('default=Level.info' in source)
+        self.assertTrue('from {m} import Level'.format(m=Level.__module__) in source)
+
+
+class TestCompiledTarget(object):
+    @staticmethod
+    def main(level: Level = Level.info, mode: Literal['a', 'b'] = 'a'):
+        pass
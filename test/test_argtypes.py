@@ -0,0 +1,215 @@
+from __future__ import print_function
+
+import array
+import os
+import pickle
+import unittest
+import mock
+import six
+
+import easyargs
+from easyargs import argtypes, parsers
+from helpers import FileTestCase
+
+
+class TestDefaultType(unittest.TestCase):
+    def test_class_sentinel_is_positional(self):
+        name, params = parsers.calculate_default_type('lines', True, argtypes.Stream, {})
+        self.assertEqual(name, 'lines')
+        self.assertTrue(isinstance(params['type'], argtypes.Stream))
+
+    def test_optional_defaults_to_stdin(self):
+        stream = argtypes.Stream(buffering=1)
+        name, params = parsers.calculate_default_type('_lines', True, stream, {})
+        self.assertEqual(params['type'], stream)
+        self.assertEqual(params['nargs'], '?')
+        self.assertEqual(params['default'], '-')
+
+
+class TestStream(FileTestCase):
+    def test_lines_are_streamed(self):
+        path = self.write('items.txt', 'a\nb\r\nc')
+        seen = []
+
+        @easyargs
+        def main(lines=argtypes.Stream):
+            self.assertEqual(lines._file, None)
+            for line in lines:
+                seen.append(line)
+            return lines
+
+        with mock.patch('sys.argv', [__name__, path]):
+            lines = main()
+
+        self.assertEqual(seen, ['a', 'b', 'c'])
+        # The file is closed once the function returns
+        self.assertEqual(lines._file, None)
+
+    def test_options(self):
+        path = self.write('items.txt', 'a\nb\n')
+
+        @easyargs
+        def main(lines=argtypes.Stream(buffering=4096, binary=True, keep_ends=True)):
+            return list(lines)
+
+        with mock.patch('sys.argv', [__name__, path]):
+            self.assertEqual(main(), [b'a\n', b'b\n'])
+
+    def test_stdin(self):
+        @easyargs
+        def main(_lines=argtypes.Stream, count=1):
+            return list(_lines) * count
+
+        for argv in ([], ['-'], ['--count', '2']):
+            sys_stdin = six.StringIO('x\ny\n')
+            with mock.patch('sys.argv', [__name__] + argv), mock.patch('sys.stdin', sys_stdin):
+                expected = ['x', 'y'] * (2 if argv[:1] == ['--count'] else 1)
+                self.assertEqual(main(), expected)
+                self.assertFalse(sys_stdin.closed)
+
+    def test_fast_path(self):
+        path = self.write('items.txt', '1\n2\n')
+
+        @easyargs(fast=True)
+        def main(lines=argtypes.Stream, offset=0):
+            return [int(line) + offset for line in lines]
+
+        with mock.patch('sys.argv', [__name__, path, '--offset', '1']):
+            self.assertEqual(main(), [2, 3])
+
+    def test_missing_file(self):
+        @easyargs(fast=True)
+        def main(lines=argtypes.Stream):
+            pass
+
+        with mock.patch('sys.argv', [__name__, os.path.join(self.directory, 'missing')]), \
+                mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            self.assertRaises(SystemExit, main)
+
+        self.assertTrue("can't open" in stderr.getvalue())
+
+
+class TestMappedFile(FileTestCase):
+    def test_file_is_mapped_lazily(self):
+        path = self.write('data.bin', 'hello world\nsecond line\n')
+
+        @easyargs
+        def main(data=argtypes.MappedFile, count=1):
+            self.assertEqual(data._file, None)
+            self.assertEqual(len(data), 24)
+            self.assertEqual(data[:5], b'hello')
+            self.assertEqual(data.find(b'world'), 6)
+            self.assertTrue(data.view.readonly)
+            self.assertEqual(bytes(data.view[12:18]), b'second')
+            return data
+
+        with mock.patch('sys.argv', [__name__, path]):
+            data = main()
+
+        self.assertEqual(data._file, None)
+        self.assertEqual(data._view, None)
+
+    def test_empty_file(self):
+        path = self.write('empty', '')
+
+        @easyargs(fast=True)
+        def main(data=argtypes.MappedFile):
+            return len(data), bytes(data.view)
+
+        with mock.patch('sys.argv', [__name__, path]):
+            self.assertEqual(main(), (0, b''))
+
+    def test_optional_file(self):
+        @easyargs
+        def main(_data=argtypes.MappedFile):
+            return _data
+
+        with mock.patch('sys.argv', [__name__]):
+            self.assertEqual(main(), None)
+
+    def test_not_a_regular_file(self):
+        @easyargs
+        def main(data=argtypes.MappedFile):
+            pass
+
+        with mock.patch('sys.argv', [__name__, self.directory]), \
+                mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            self.assertRaises(SystemExit, main)
+
+        self.assertTrue("not a regular file" in stderr.getvalue())
+
+    def test_pickled_view_is_not_open(self):
+        view = argtypes.MappedFile()(self.write('data.bin', 'abc'))
+        self.assertEqual(view[1:], b'bc')
+
+        copy = pickle.loads(pickle.dumps(view))
+        self.assertEqual(copy._file, None)
+        self.assertEqual(copy[:], b'abc')
+        copy.close()
+        view.close()
+
+
+class TestTypedLists(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict('os.environ', {'EASYARGS_NUMPY': '0'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_default_type(self):
+        name, params = parsers.calculate_default_type('values', True, [int], {})
+        self.assertEqual(name, 'values')
+        self.assertEqual(params, {'nargs': '+', 'action': argtypes.IntArrayAction})
+
+        name, params = parsers.calculate_default_type('_values', True, [float], {})
+        self.assertEqual(params['nargs'], '*')
+        self.assertEqual(params['action'], argtypes.FloatArrayAction)
+
+    def test_unsupported_item_type(self):
+        self.assertEqual(argtypes.array_action([str]), None)
+        self.assertEqual(argtypes.array_action([[]]), None)
+        self.assertEqual(argtypes.array_action([int, float]), None)
+
+    def test_values_converted_to_array(self):
+        @easyargs
+        def main(values=[int], _weights=[float]):
+            return values, _weights
+
+        with mock.patch('sys.argv', [__name__, '1', '2', '3']):
+            values, weights = main()
+
+        self.assertEqual(values, array.array(argtypes.IntArrayAction.typecode, [1, 2, 3]))
+        self.assertEqual(weights, array.array('d'))
+
+    def test_float_values(self):
+        @easyargs
+        def main(_weights=[float]):
+            return _weights
+
+        with mock.patch('sys.argv', [__name__, '1', '2.5']):
+            self.assertEqual(main(), array.array('d', [1.0, 2.5]))
+
+    def test_invalid_value(self):
+        @easyargs
+        def main(values=[int]):
+            pass
+
+        with mock.patch('sys.argv', [__name__, '1', 'x', '3']), \
+                mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            self.assertRaises(SystemExit, main)
+
+        self.assertTrue("argument values: invalid int value: 'x'" in stderr.getvalue())
+
+    @unittest.skipIf(argtypes._use_numpy() is None, 'numpy is not installed')
+    def test_numpy(self):
+        import numpy
+
+        @easyargs
+        def main(values=[float]):
+            return values
+
+        with mock.patch.dict('os.environ', {'EASYARGS_NUMPY': '1'}), \
+                mock.patch('sys.argv', [__name__, '1', '2.5']):
+            values = main()
+
+        self.assertTrue(isinstance(values, numpy.ndarray))
+        self.assertEqual(values.tolist(), [1.0, 2.5])
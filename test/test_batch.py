@@ -0,0 +1,95 @@
+from __future__ import print_function
+
+import os
+import mock
+import six
+
+import easyargs
+from helpers import FileTestCase
+
+BATCH = '''# Commits to make
+commit -m "First change"
+
+commit -a -m Second
+commit --unknown
+fail
+'''
+
+
+class TestBatchMode(FileTestCase):
+    def setUp(self):
+        super(TestBatchMode, self).setUp()
+        called = mock.MagicMock()
+        created = mock.MagicMock()
+        self.function_called = called
+        self.created = created
+
+        @easyargs(batch=True)
+        class GitClone(object):
+            """A git clone"""
+
+            def __init__(self):
+                created()
+
+            def commit(self, a=False, m=None, amend=False):
+                """Commit a change to the index"""
+                called(a, m, amend)
+
+            def fail(self):
+                raise RuntimeError('failed')
+
+        self.parser = GitClone
+
+    def run_batch(self, argv, stdin=''):
+        with mock.patch('sys.argv', [__name__] + argv):
+            with mock.patch('sys.stdin', six.StringIO(stdin)):
+                with mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+                    status = self.parser()
+        return status, stderr.getvalue()
+
+    def test_batch_from_stdin(self):
+        status, stderr = self.run_batch(['--easyargs-batch', '-'], BATCH)
+
+        self.assertEqual(status, 2)
+        self.assertEqual(self.function_called.call_args_list,
+                         [mock.call(False, 'First change', False),
+                          mock.call(True, 'Second', False)])
+        self.assertEqual(self.created.call_count, 1)
+
+        report = [line for line in stderr.splitlines() if '\t' in line]
+        self.assertEqual(report, ['2\t0', '4\t0', '5\t2', '6\t1'])
+        self.assertTrue('RuntimeError: failed' in stderr)
+
+    def test_batch_from_file(self):
+        batch_file = self.write('batch.txt', 'commit -m One\ncommit -m Two\n')
+        status, stderr = self.run_batch(['--easyargs-batch', batch_file])
+
+        self.assertEqual(status, 0)
+        self.assertEqual(stderr, '1\t0\n2\t0\n')
+        self.function_called.assert_called_with(False, 'Two', False)
+
+    def test_unclosed_quote(self):
+        status, stderr = self.run_batch(['--easyargs-batch', '-'],
+                                        'commit -m One\ncommit -m "Two\ncommit -m Three\n')
+
+        self.assertEqual(status, 2)
+        self.assertEqual([line for line in stderr.splitlines() if '\t' in line],
+                         ['1\t0', '2\t2', '3\t0'])
+        self.assertTrue('line 2: No closing quotation' in stderr)
+        self.function_called.assert_called_with(False, 'Three', False)
+
+    def test_missing_batch_file(self):
+        with self.assertRaises(SystemExit) as context:
+            self.run_batch(['--easyargs-batch', os.path.join(self.directory, 'missing.txt')])
+        self.assertEqual(context.exception.code, 2)
+
+    def test_batch_option_needs_enabling(self):
+        @easyargs
+        def main(name):
+            return name
+
+        with mock.patch('sys.argv', [__name__, 'Joe']):
+            self.assertEqual(main(), 'Joe')
+        with mock.patch('sys.argv', [__name__, '--easyargs-batch', '-']):
+            with mock.patch('sys.stderr', new_callable=six.StringIO):
+                self.assertRaises(SystemExit, main)
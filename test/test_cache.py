@@ -0,0 +1,311 @@
+from __future__ import print_function
+
+import os
+import sys
+import unittest
+import mock
+import six
+
+import easyargs
+from easyargs import cache, parsers
+from helpers import FileTestCase
+
+
+class TestParserCache(unittest.TestCase):
+    def setUp(self):
+        called = mock.MagicMock()
+        self.function_called = called
+
+        @easyargs
+        def cached(name, count=1):
+            """A cached program"""
+            called(name, count)
+
+        self.parser = cached
+
+    @mock.patch('sys.argv', [__name__, 'Joe'])
+    def test_parser_built_once(self):
+        with mock.patch.object(parsers, 'function_parser',
+                               wraps=parsers.function_parser) as function_parser:
+            self.parser()
+            self.parser()
+            self.parser()
+
+        self.assertEqual(function_parser.call_count, 1)
+        self.function_called.assert_called_with('Joe', 1)
+
+    @mock.patch('sys.argv', [__name__, 'Joe'])
+    def test_cache_clear_rebuilds(self):
+        with mock.patch.object(parsers, 'function_parser',
+                               wraps=parsers.function_parser) as function_parser:
+            self.parser()
+            self.parser.cache_clear()
+            self.parser()
+
+        self.assertEqual(function_parser.call_count, 2)
+
+    @mock.patch('sys.argv', [__name__, 'Joe'])
+    def test_docstring_change_rebuilds(self):
+        with mock.patch.object(parsers, 'function_parser',
+                               wraps=parsers.function_parser) as function_parser:
+            self.parser()
+            self.parser.__wrapped__.__doc__ = 'A changed program'
+            self.parser()
+
+        self.assertEqual(function_parser.call_count, 2)
+
+    def test_class_instance_created_once(self):
+        created = mock.MagicMock()
+
+        @easyargs
+        class Tool(object):
+            def __init__(self):
+                created()
+
+            def run(self, value=1):
+                return value
+
+        with mock.patch('sys.argv', [__name__, 'run', '--value', '3']):
+            self.assertEqual(Tool(), 3)
+            self.assertEqual(Tool(), 3)
+
+        self.assertEqual(created.call_count, 1)
+
+    def test_key_checked_once_per_call(self):
+        @easyargs(fast=True)
+        class Tool(object):
+            def run(self, value=1):
+                return value
+
+        with mock.patch('sys.argv', [__name__, 'run', '--value', '3']), \
+                mock.patch.object(cache, 'cache_key', wraps=cache.cache_key) as cache_key:
+            self.assertEqual(Tool(), 3)
+            self.assertEqual(cache_key.call_count, 1)
+
+            # The fast path falls back to argparse for abbreviated options
+            with mock.patch('sys.argv', [__name__, 'run', '--val', '4']):
+                self.assertEqual(Tool(), 4)
+            self.assertEqual(cache_key.call_count, 2)
+
+    def test_replaced_method_rebuilds(self):
+        class Tool(object):
+            def run(self, value=1):
+                return value
+
+        decorated = easyargs(Tool)
+        with mock.patch('sys.argv', [__name__, 'run', '--value', '3']):
+            self.assertEqual(decorated(), 3)
+
+            def run(self, value=1):
+                return -value
+
+            Tool.run = run
+            self.assertEqual(decorated(), -3)
+
+    def test_variant_kept_for_latest_key(self):
+        parser_cache = cache.ParserCache(self.parser.__wrapped__, mock.MagicMock())
+        build = mock.MagicMock(side_effect=lambda: object())
+
+        first = parser_cache.variant('parser', 'a', build)
+        self.assertTrue(parser_cache.variant('parser', 'a', build) is first)
+        self.assertFalse(parser_cache.variant('parser', 'b', build) is first)
+        self.assertEqual(build.call_count, 2)
+
+        parser_cache.clear()
+        parser_cache.variant('parser', 'b', build)
+        self.assertEqual(build.call_count, 3)
+
+
+class TestSpecCache(FileTestCase):
+    def setUp(self):
+        super(TestSpecCache, self).setUp()
+        called = mock.MagicMock()
+        self.function_called = called
+
+        def decorate():
+            @easyargs(disk_cache=self.directory)
+            def cached(name, count=1, greeting='Hello'):
+                """A cached program
+                :param count: How many times to greet
+                """
+                called(name, count, greeting)
+            return cached
+
+        self.decorate = decorate
+
+    @mock.patch('sys.argv', [__name__, 'Joe', '--count', '2'])
+    def test_spec_loaded_from_disk(self):
+        self.decorate()()
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+        with mock.patch.object(parsers, 'object_spec') as object_spec:
+            self.decorate()()
+
+        object_spec.assert_not_called()
+        self.function_called.assert_called_with('Joe', 2, 'Hello')
+
+    @mock.patch('sys.argv', [__name__, 'Joe'])
+    def test_source_modification_invalidates(self):
+        self.decorate()()
+
+        # Move the mtime of this file so that the cache entry is stale
+        source = self.decorate().__wrapped__.__code__.co_filename
+        stat = os.stat(source)
+        os.utime(source, (stat.st_atime, stat.st_mtime + 1))
+        try:
+            with mock.patch.object(parsers, 'object_spec',
+                                   wraps=parsers.object_spec) as object_spec:
+                self.decorate()()
+        finally:
+            os.utime(source, (stat.st_atime, stat.st_mtime))
+
+        self.assertEqual(object_spec.call_count, 1)
+
+    def test_class_spec_loaded_from_disk(self):
+        called = self.function_called
+        directory = self.directory
+
+        def decorate():
+            @easyargs(disk_cache=directory)
+            class GitClone(object):
+                """A git clone"""
+
+                def commit(self, a=False, m=None, amend=False):
+                    """Commit a change to the index"""
+                    called(a, m, amend)
+            return GitClone
+
+        with mock.patch('sys.argv', [__name__, 'commit', '-a']):
+            decorate()()
+
+        with mock.patch.object(parsers, 'object_spec') as object_spec:
+            with mock.patch('sys.argv', [__name__, 'commit', '-m', 'Foo']):
+                decorate()()
+
+        object_spec.assert_not_called()
+        called.assert_called_with(False, 'Foo', False)
+
+
+class TestHelpCache(FileTestCase):
+    def setUp(self):
+        super(TestHelpCache, self).setUp()
+        directory = self.directory
+
+        def decorate():
+            @easyargs(disk_cache=directory)
+            class GitClone(object):
+                """A git clone"""
+
+                def clone(self, src, _dest):
+                    """Clone a repository"""
+
+                def commit(self, a=False, m=None, amend=False):
+                    """Commit a change to the index"""
+            return GitClone
+
+        self.decorate = decorate
+
+    def help_output(self, argv):
+        with mock.patch('sys.argv', [__name__] + argv), \
+                mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertRaises(SystemExit, self.decorate())
+        return stdout.getvalue()
+
+    def test_help_answered_from_disk(self):
+        top = self.help_output(['-h'])
+        commit = self.help_output(['commit', '--help'])
+        self.assertTrue('A git clone' in top)
+        self.assertTrue('usage: {m} commit [-h] [-a] [-m M] [--amend]'.format(m=__name__) in commit)
+
+        with mock.patch.object(parsers, 'create_base_parser') as create_base_parser, \
+                mock.patch.object(parsers, 'spec_parser') as spec_parser:
+            self.assertEqual(self.help_output(['-h']), top)
+            self.assertEqual(self.help_output(['commit', '-h']), commit)
+            self.assertTrue('clone [-h] src [dest]' in self.help_output(['clone', '-h']))
+
+        create_base_parser.assert_not_called()
+        spec_parser.assert_not_called()
+
+    def test_key_includes_width(self):
+        self.help_output(['-h'])
+        self.help_output(['-h'])
+        with mock.patch.object(cache, 'terminal_columns', return_value=1000):
+            self.help_output(['-h'])
+
+        # The spec and the help for two terminal widths
+        self.assertEqual(len(os.listdir(self.directory)), 3)
+
+    def test_help_request(self):
+        from easyargs.decorators import help_request
+        self.assertEqual(help_request(['-h']), ())
+        self.assertEqual(help_request(['remote', 'add', '--help']), ('remote', 'add'))
+        self.assertEqual(help_request(['commit', '-a', '-h']), None)
+        self.assertEqual(help_request(['commit']), None)
+        self.assertEqual(help_request([]), None)
+
+
+DEPLOY_MODULE = '''
+class Deploy(object):
+    """Deploy the tool"""
+
+    def push(self, target{extra}):
+        """Push a release"""
+'''
+
+
+class TestHelpCacheDependencies(FileTestCase):
+    def setUp(self):
+        super(TestHelpCacheDependencies, self).setUp()
+        self.cache_directory = os.path.join(self.directory, 'cache')
+        sys.path.insert(0, self.directory)
+        self.write_group('')
+
+    def tearDown(self):
+        sys.path.remove(self.directory)
+        sys.modules.pop('easyargs_deploy_group', None)
+        super(TestHelpCacheDependencies, self).tearDown()
+
+    def write_group(self, extra, mtime=None):
+        path = self.write('easyargs_deploy_group.py', DEPLOY_MODULE.format(extra=extra))
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        # As if in a new process
+        sys.modules.pop('easyargs_deploy_group', None)
+
+    def help_output(self, argv, **options):
+        @easyargs(disk_cache=self.cache_directory, **options)
+        class Tool(object):
+            def status(self):
+                pass
+
+        with mock.patch('sys.argv', ['tool'] + argv), \
+                mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertRaises(SystemExit, Tool)
+        return stdout.getvalue()
+
+    def test_registered_group_changed(self):
+        groups = {'deploy': 'easyargs_deploy_group:Deploy'}
+        self.assertTrue('push [-h] target\n' in self.help_output(['deploy', 'push', '-h'],
+                                                                 groups=groups))
+
+        self.write_group(', force=False', mtime=1)
+        self.assertTrue('push [-h] [--force] target' in self.help_output(['deploy', 'push', '-h'],
+                                                                         groups=groups))
+
+    def test_plugins_changed(self):
+        from easyargs import groups
+
+        entry_point = mock.MagicMock(value='easyargs_deploy_group:Deploy')
+        entry_point.name = 'deploy'
+        with mock.patch.object(groups, '_find_entry_points', return_value=[entry_point]):
+            entry_point.load.side_effect = lambda: __import__('easyargs_deploy_group').Deploy
+            self.assertTrue('{status,deploy}' in self.help_output(['-h'], plugins='tool.commands'))
+
+        with mock.patch.object(groups, '_find_entry_points', return_value=[]):
+            self.assertTrue('{status}' in self.help_output(['-h'], plugins='tool.commands'))
+
+    def test_base_class_files(self):
+        self.assertEqual(cache.source_files(TestHelpCacheDependencies),
+                         [cache.source_file(TestHelpCacheDependencies),
+                          cache.source_file(FileTestCase),
+                          cache.source_file(unittest.TestCase)])
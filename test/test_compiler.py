@@ -0,0 +1,144 @@
+from __future__ import print_function
+
+import unittest
+import mock
+import six
+
+import easyargs
+from easyargs import argtypes, compiler, dispatch, targets
+
+created = mock.MagicMock()
+
+
+@easyargs
+class GitClone(object):
+    """A git clone"""
+
+    def __init__(self):
+        created()
+
+    def clone(self, src, _dest, depth=1, v=False):
+        """Clone a repository
+        :param depth: How deep to clone
+        """
+        return src, _dest, depth, v
+
+    def commit(self, a=False, m=None, amend=False):
+        """Commit a change to the index"""
+        return 3
+
+
+@easyargs(map_over='names')
+def greet(names=list, greeting='Hello', _extra=argtypes.Stream(buffering=4096)):
+    """Greet somebody"""
+    return greeting + ' ' + names
+
+
+@easyargs(flush='line', output_buffer=4096)
+def count(number):
+    """Count up to number"""
+    for idx in range(int(number)):
+        yield idx
+
+
+@easyargs(groups=True)
+class Grouped(object):
+    def status(self):
+        pass
+
+    class config(object):
+        def get(self, key):
+            pass
+
+
+@easyargs(config='greet.json', env=True)
+def configured(name, greeting='Hello'):
+    pass
+
+
+def compile_target(name):
+    """Generates the module for a target in this file, returns (source, namespace)"""
+    target = '{m}:{n}'.format(m=__name__, n=name)
+    entry = targets.load_target(target)
+    source = compiler.generate(targets.target_spec(entry), target, entry.dispatch_options,
+                               entry.output_options)
+    namespace = {'__name__': 'cli_generated'}
+    exec(compile(source, 'cli_generated.py', 'exec'), namespace)
+    return source, namespace
+
+
+class TestCompiler(unittest.TestCase):
+    def test_class(self):
+        source, namespace = compile_target('GitClone')
+        self.assertFalse('easyargs.parsers' in source)
+
+        self.assertEqual(namespace['main'](['clone', 'repo', '--depth', '2']), ('repo', None, 2, False))
+        self.assertEqual(namespace['main'](['commit', '-a']), 3)
+
+    def test_class_created_once_a_command_is_called(self):
+        source, namespace = compile_target('GitClone')
+        created.reset_mock()
+        with mock.patch('sys.stdout'):
+            self.assertRaises(SystemExit, namespace['main'], ['-h'])
+        with mock.patch('sys.stderr'):
+            self.assertRaises(SystemExit, namespace['main'], ['clone'])
+        created.assert_not_called()
+
+        namespace['main'](['commit'])
+        self.assertEqual(created.call_count, 1)
+
+    def test_same_help(self):
+        source, namespace = compile_target('GitClone')
+        with mock.patch('sys.argv', ['git']):
+            generated = namespace['build_parser'](dispatch.Instance(GitClone.__wrapped__))
+            self.assertEqual(generated.format_help(), GitClone.build_parser().format_help())
+
+    def test_function_with_options(self):
+        source, namespace = compile_target('greet')
+        self.assertTrue("OPTIONS = {'executor': 'thread', 'map_over': 'names', 'workers': None}"
+                        in source)
+        self.assertTrue('from easyargs.argtypes import Stream' in source)
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertEqual(namespace['main'](['a', 'b', '--greeting', 'Hi']), 0)
+        self.assertEqual(stdout.getvalue(), 'Hi a\nHi b\n')
+
+    def test_generator_written_to_stdout(self):
+        source, namespace = compile_target('count')
+        self.assertTrue("OUTPUT = {'buffer_size': 4096, 'flush': 'line'}" in source)
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertEqual(namespace['main'](['3']), None)
+        self.assertEqual(stdout.getvalue(), '0\n1\n2\n')
+
+    def test_generate_is_deterministic(self):
+        self.assertEqual(compile_target('GitClone')[0], compile_target('GitClone')[0])
+
+    def test_unsupported_default(self):
+        spec = {'description': '', 'arguments': [('--when', {'default': object()})]}
+        self.assertRaises(ValueError, compiler.generate, spec, 'module:main')
+
+
+class TestUnsupportedTargets(unittest.TestCase):
+    def test_groups(self):
+        from easyargs.__main__ import EasyArgs
+
+        target = '{m}:Grouped'.format(m=__name__)
+        for argv in (['compile', target], ['compile', target, '-o', 'cli.py', '--check'],
+                     ['completion', target]):
+            with mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+                self.assertEqual(easyargs.invoke(EasyArgs, argv).value, 2)
+            self.assertTrue('does not support command groups, Grouped has config'
+                            in stderr.getvalue())
+
+        targets.check_static(GitClone, 'compile')
+
+    def test_config_defaults(self):
+        from easyargs.__main__ import EasyArgs
+
+        target = '{m}:configured'.format(m=__name__)
+        with mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            self.assertEqual(easyargs.invoke(EasyArgs, ['compile', target]).value, 2)
+        self.assertTrue('compile does not support defaults from config files or the environment'
+                        in stderr.getvalue())
+
+        # Completion does not depend on the defaults
+        targets.check_static(configured, 'completion')
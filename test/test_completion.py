@@ -0,0 +1,82 @@
+from __future__ import print_function
+
+import shutil
+import subprocess
+import unittest
+
+from easyargs import completion, parsers, targets
+
+BASH = shutil.which('bash') if hasattr(shutil, 'which') else None
+
+
+class GitClone(object):
+    """A git clone"""
+
+    def clone(self, src, _dest, depth=1, v=False):
+        """Clone a repository
+        :param depth: How deep [default: 1]: it's limited
+        """
+
+    def commit(self, a=False, m=None, amend=False):
+        """Commit a change to the index"""
+
+
+def greet(name, count=1, loud=False):
+    """Greet somebody"""
+
+
+def complete_bash(script, words):
+    """Runs the bash completion function for words, the last of which is
+    being completed, and returns the completions"""
+    code = script + '''
+COMP_WORDS=({words})
+COMP_CWORD={cword}
+COMPREPLY=()
+_easyargs_git
+printf '%s\\n' "${{COMPREPLY[@]}}"
+'''.format(words=' '.join("'{w}'".format(w=word) for word in words), cword=len(words) - 1)
+    output = subprocess.check_output([BASH, '--norc', '-c', code], universal_newlines=True)
+    return output.split()
+
+
+class TestCompletion(unittest.TestCase):
+    def setUp(self):
+        self.spec = parsers.object_spec(GitClone())
+
+    def test_unknown_shell(self):
+        self.assertRaises(ValueError, completion.completion_script, self.spec, 'git', 'tcsh')
+
+    def test_zsh(self):
+        script = completion.completion_script(self.spec, 'git', 'zsh')
+        self.assertTrue(script.startswith('#compdef git\n'))
+        self.assertTrue("'clone:Clone a repository'" in script)
+        self.assertTrue("'--depth=[How deep \\[default\\: 1\\]\\: it'\\''s limited]:depth:_default'"
+                        in script)
+        self.assertTrue("'-m+[]:m:_default'" in script)
+        self.assertTrue("'::dest:_default'" in script)
+
+    def test_fish(self):
+        script = completion.completion_script(self.spec, 'git', 'fish')
+        lines = script.splitlines()
+        self.assertTrue("complete -c git -n '__fish_use_subcommand' -f -a clone "
+                        "-d 'Clone a repository'" in lines)
+        self.assertTrue("complete -c git -n '__fish_seen_subcommand_from clone' -l depth -r "
+                        "-d 'How deep [default: 1]: it\\'s limited'" in lines)
+        self.assertTrue("complete -c git -n '__fish_seen_subcommand_from commit' -s a" in lines)
+
+    def test_function_spec(self):
+        script = completion.completion_script(parsers.object_spec(greet), 'greet', 'bash')
+        self.assertTrue('words="-h --help --count --loud"; values="--count"' in script)
+
+    def test_target_spec(self):
+        self.assertEqual(targets.target_spec(greet), parsers.object_spec(greet))
+        self.assertEqual(targets.target_spec(GitClone)['commands'], self.spec['commands'])
+
+    @unittest.skipIf(BASH is None, 'bash is not installed')
+    def test_bash(self):
+        script = completion.completion_script(self.spec, 'git', 'bash')
+        self.assertEqual(complete_bash(script, ['git', '']), ['-h', '--help', 'clone', 'commit'])
+        self.assertEqual(complete_bash(script, ['git', 'c']), ['clone', 'commit'])
+        self.assertEqual(complete_bash(script, ['git', 'clone', '--']), ['--help', '--depth'])
+        self.assertEqual(complete_bash(script, ['git', 'commit', '-m', '']), [])
+        self.assertEqual(complete_bash(script, ['git', 'clone', 's']), [])
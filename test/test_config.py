@@ -0,0 +1,109 @@
+from __future__ import print_function
+
+import os
+import mock
+import six
+
+import easyargs
+from easyargs import config
+from helpers import FileTestCase, run
+
+
+class ConfigTestCase(FileTestCase):
+    def setUp(self):
+        super(ConfigTestCase, self).setUp()
+        config._parsed.clear()
+
+
+class TestLayeredDefaults(ConfigTestCase):
+    def test_json(self):
+        path = self.write('greet.json', '{"count": 3, "greeting": "Hi", "loud": true}')
+
+        @easyargs(config=path)
+        def greet(name, count=1, greeting='Hello', loud=False):
+            return name, count, greeting, loud
+
+        self.assertEqual(run(greet, ['Joe']), ('Joe', 3, 'Hi', True))
+        self.assertEqual(run(greet, ['Joe', '--count', '5']), ('Joe', 5, 'Hi', True))
+
+    def test_missing_file(self):
+        @easyargs(config=os.path.join(self.directory, 'missing.json'))
+        def greet(name, count=1):
+            return name, count
+
+        self.assertEqual(run(greet, ['Joe']), ('Joe', 1))
+
+    def test_toml_sub_commands(self):
+        path = self.write('git.toml', 'verbose = true\n\n[commit]\nm = "From the config"\n')
+
+        @easyargs(config=path)
+        class Git(object):
+            def commit(self, m='', verbose=False):
+                return m, verbose
+
+            def push(self, remote='origin', verbose=False):
+                return remote, verbose
+
+        self.assertEqual(run(Git, ['commit']), ('From the config', True))
+        self.assertEqual(run(Git, ['push']), ('origin', True))
+
+    def test_ini(self):
+        path = self.write('tool.ini', '[DEFAULT]\ndry-run = yes\n\n[deploy]\ntarget = staging\n')
+
+        @easyargs(config=path)
+        class Tool(object):
+            def deploy(self, target='prod', dry_run=False):
+                return target, dry_run
+
+        self.assertEqual(run(Tool, ['deploy']), ('staging', True))
+
+    def test_environment(self):
+        path = self.write('git.json', '{"m": "file", "commit": {"author": "file"}}')
+
+        @easyargs(config=path, env=True)
+        class Git(object):
+            def commit(self, m='', author='', amend=False):
+                return m, author, amend
+
+        environ = {'GIT_M': 'environment', 'GIT_COMMIT_AUTHOR': 'Joe', 'GIT_AUTHOR': 'Jane',
+                   'GIT_COMMIT_AMEND': '1'}
+        self.assertEqual(run(Git, ['commit'], environ), ('environment', 'Joe', True))
+        self.assertEqual(run(Git, ['commit', '-m', 'argv'], environ), ('argv', 'Joe', True))
+
+    def test_environment_prefix(self):
+        @easyargs(env='my-tool', fast=True)
+        def main(name, _output, count=1):
+            return name, count, _output
+
+        environ = {'MY_TOOL_COUNT': '4', 'MY_TOOL_OUTPUT': 'out.txt'}
+        self.assertEqual(run(main, ['x'], environ), ('x', 4, 'out.txt'))
+        self.assertEqual(run(main, ['x']), ('x', 1, None))
+
+    def test_invalid_boolean(self):
+        @easyargs(env=True)
+        def main(verbose=False):
+            return verbose
+
+        with mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            self.assertRaises(SystemExit, run, main, [], {'MAIN_VERBOSE': 'maybe'})
+        self.assertTrue("invalid boolean value: 'maybe'" in stderr.getvalue())
+
+
+class TestLoad(ConfigTestCase):
+    def test_cached_until_changed(self):
+        path = self.write('tool.json', '{"count": 1}')
+        with mock.patch.dict(config.READERS, {'.json': mock.MagicMock(wraps=config._read_json)}):
+            self.assertEqual(config.load(path), {'count': 1})
+            self.assertEqual(config.load(path), {'count': 1})
+            self.assertEqual(config.READERS['.json'].call_count, 1)
+
+            self.write('tool.json', '{"count": 22}')
+            self.assertEqual(config.load(path), {'count': 22})
+            self.assertEqual(config.READERS['.json'].call_count, 2)
+
+    def test_invalid_file(self):
+        path = self.write('tool.json', '{"count": ')
+        self.assertRaises(config.ConfigError, config.load, path)
+
+        path = self.write('tool.yaml', 'count: 1')
+        self.assertRaises(config.ConfigError, config.load, path)
@@ -0,0 +1,173 @@
+from __future__ import print_function
+
+import os
+import threading
+import time
+import unittest
+import mock
+import six
+
+import easyargs
+from easyargs import argtypes
+from helpers import FileTestCase, run
+
+
+@easyargs(map_over='numbers', executor='process', workers=2)
+def square_in_process(numbers=list, offset=0):
+    return (int(numbers) + offset) ** 2, os.getpid()
+
+
+class TestListArguments(unittest.TestCase):
+    @mock.patch('sys.argv', [__name__, 'a', 'b', 'c'])
+    def test_list_consumes_values(self):
+        @easyargs
+        def main(files=list):
+            return files
+
+        self.assertEqual(main(), ['a', 'b', 'c'])
+
+    @mock.patch('sys.argv', [__name__])
+    def test_optional_list(self):
+        @easyargs
+        def main(_files=list):
+            return _files
+
+        self.assertEqual(main(), [])
+
+
+class TestFanOut(unittest.TestCase):
+    @mock.patch('sys.argv', [__name__, '3', '1', '2', '--prefix', 'n'])
+    def test_results_in_order(self):
+        threads = set()
+
+        @easyargs(map_over='delays', workers=3)
+        def main(delays=list, prefix=''):
+            threads.add(threading.current_thread().name)
+            time.sleep(float(delays) / 100)
+            return prefix + delays
+
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertEqual(main(), 0)
+        self.assertEqual(stdout.getvalue(), 'n3\nn1\nn2\n')
+        self.assertEqual(len(threads), 3)
+
+    @mock.patch('sys.argv', [__name__, 'ok', 'bad', 'two'])
+    def test_failures_set_exit_status(self):
+        @easyargs(map_over='names')
+        def main(names=list):
+            if names == 'bad':
+                raise RuntimeError(names)
+            if names == 'two':
+                return 2
+            return names
+
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout, \
+                mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            with self.assertRaises(SystemExit) as context:
+                main()
+
+        self.assertEqual(context.exception.code, 2)
+        self.assertEqual(stdout.getvalue(), 'ok\n2\n')
+        self.assertTrue("'bad' failed" in stderr.getvalue())
+        self.assertTrue('RuntimeError: bad' in stderr.getvalue())
+
+    def test_invoke_returns_fan_out(self):
+        @easyargs(map_over='names')
+        def main(names=list):
+            if names == 'bad':
+                raise ValueError(names)
+            if names == 'three':
+                return 3
+            return names
+
+        with mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            result = easyargs.invoke(main, ['ok', 'bad', 'three'])
+            self.assertEqual(list(result.value), ['ok', 3])
+            self.assertEqual(result.value.exit_status, 3)
+            self.assertEqual(result.status, 3)
+
+        self.assertTrue('ValueError: bad' in stderr.getvalue())
+
+    def test_iterator_results_streamed(self):
+        @easyargs(map_over='counts')
+        def main(counts=list):
+            return iter(range(int(counts)))
+
+        with mock.patch('sys.argv', [__name__, '2', '3']), \
+                mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            main()
+        self.assertEqual(stdout.getvalue(), '0\n1\n0\n1\n2\n')
+
+    @mock.patch('sys.argv', [__name__, 'process', 'a', 'b'])
+    def test_class_method(self):
+        @easyargs(map_over='items')
+        class Tool(object):
+            def process(self, items=list):
+                return items.upper()
+
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            Tool()
+        self.assertEqual(stdout.getvalue(), 'A\nB\n')
+
+    def test_process_pool(self):
+        results = list(easyargs.invoke(square_in_process, ['1', '2', '3', '--offset', '1']).value)
+        self.assertEqual([result for result, pid in results], [4, 9, 16])
+        self.assertFalse(os.getpid() in [pid for result, pid in results])
+
+    def test_map_over_checked_when_decorated(self):
+        def misspelled(files=list):
+            pass
+
+        def text(files='abc'):
+            pass
+
+        self.assertRaises(ValueError, easyargs(map_over='file'), misspelled)
+        self.assertRaises(ValueError, easyargs(map_over='files'), text)
+
+        class Tool(object):
+            def first(self, items=list):
+                pass
+
+            def second(self, items=1):
+                pass
+
+        self.assertRaises(ValueError, easyargs(map_over='items'), Tool)
+
+    def test_typed_lists(self):
+        @easyargs(map_over='numbers')
+        def main(numbers=[int]):
+            return numbers * 2
+
+        self.assertEqual(list(easyargs.invoke(main, ['1', '2']).value), [2, 4])
+
+    @mock.patch('sys.argv', [__name__, '1'])
+    def test_process_pool_needs_top_level_function(self):
+        @easyargs(map_over='numbers', executor='process')
+        def main(numbers=list):
+            pass
+
+        self.assertRaises(ValueError, main)
+
+
+class TestFanOutFiles(FileTestCase):
+    def test_each_call_reads_the_whole_file(self):
+        path = self.write('lines.txt', 'x\n' * 2000)
+        sources = []
+
+        @easyargs(map_over='names', workers=4)
+        def main(src=argtypes.Stream, names=list):
+            sources.append(src)
+            return '{n} {c}'.format(n=names, c=sum(1 for line in src))
+
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            run(main, [path, 'a', 'b', 'c', 'd'])
+        self.assertEqual(stdout.getvalue(), 'a 2000\nb 2000\nc 2000\nd 2000\n')
+        self.assertEqual(len(set(map(id, sources))), 4)
+        self.assertEqual([source._file for source in sources], [None] * 4)
+
+    def test_stdin_is_shared(self):
+        @easyargs(map_over='names')
+        def main(src=argtypes.Stream, names=list):
+            return id(src)
+
+        self.assertEqual(len(set(easyargs.invoke(main, ['-', 'a', 'b']).value)), 1)
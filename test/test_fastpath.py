@@ -0,0 +1,137 @@
+from __future__ import print_function
+
+import argparse
+import unittest
+import mock
+
+import easyargs
+from easyargs import fastpath, parsers
+
+
+def greet(name, count=1, ratio=0.5, greeting='Hello', loud=False, quiet=True):
+    """A simple greeting program"""
+
+
+def clone(src, _dest, depth=1, v=False):
+    """Clone a repository"""
+
+
+class GitClone(object):
+    """A git clone"""
+
+    def clone(self, src, _dest):
+        """Clone a repository"""
+
+    def commit(self, a=False, m=None, amend=False):
+        """Commit a change to the index"""
+
+
+class ExitCalled(Exception):
+    pass
+
+
+def argparse_result(obj, argv):
+    """Parses argv with argparse, returns (command, kwargs) or None on error"""
+    parser = argparse.ArgumentParser()
+    if isinstance(obj, GitClone):
+        parsers.class_parser(obj, parser)
+    else:
+        parsers.function_parser(obj, parser)
+
+    with mock.patch.object(parser, 'exit', side_effect=ExitCalled):
+        with mock.patch.object(parser, 'error', side_effect=ExitCalled):
+            try:
+                args = vars(parser.parse_args(argv))
+            except ExitCalled:
+                return None
+
+    function = args.pop('func')
+    command = function.__name__ if isinstance(obj, GitClone) else None
+    return command, args
+
+
+class TestEquivalence(unittest.TestCase):
+    def assert_equivalent(self, obj, argv, fallback=False):
+        engine = fastpath.compile_spec(parsers.object_spec(obj))
+        self.assertTrue(engine is not None)
+        try:
+            result = engine.parse(argv)
+        except fastpath.Fallback:
+            self.assertTrue(fallback, 'unexpected fallback for {a}'.format(a=argv))
+            return
+
+        self.assertFalse(fallback, 'expected fallback for {a}'.format(a=argv))
+        self.assertEqual(result, argparse_result(obj, argv))
+
+    def test_function_arguments(self):
+        for argv in (['Joe'],
+                     ['Joe', '--count', '3'],
+                     ['--count', '3', 'Joe'],
+                     ['Joe', '--count=3', '--ratio', '1.5'],
+                     ['Joe', '--greeting', 'Hola', '--greeting', 'Hi'],
+                     ['Joe', '--loud', '--quiet'],
+                     ['-'],
+                     ['Joe', '--greeting', '']):
+            self.assert_equivalent(greet, argv)
+
+    def test_optional_positionals(self):
+        for argv in (['src'],
+                     ['src', 'dest'],
+                     ['src', 'dest', '-v'],
+                     ['-v', 'src', 'dest'],
+                     ['src', 'dest', '--depth', '1']):
+            self.assert_equivalent(clone, argv)
+
+    def test_class_commands(self):
+        for argv in (['clone', 'src'],
+                     ['clone', 'src', 'dest'],
+                     ['commit'],
+                     ['commit', '-a', '-m', 'Message', '--amend'],
+                     ['commit', '-m=Message']):
+            self.assert_equivalent(GitClone(), argv)
+
+    def test_fallbacks(self):
+        for obj, argv in ((greet, ['-h']),
+                          (greet, []),
+                          (greet, ['Joe', 'Bob']),
+                          (greet, ['Joe', '--count', 'three']),
+                          (greet, ['Joe', '--count', '-1']),
+                          (greet, ['Joe', '--cou', '3']),
+                          (greet, ['Joe', '--loud=1']),
+                          (greet, ['Joe', '--']),
+                          (greet, ['Joe', '--greeting']),
+                          (clone, ['src', '-v', 'dest']),
+                          (GitClone(), []),
+                          (GitClone(), ['push']),
+                          (GitClone(), ['commit', '-am', 'Message'])):
+            self.assert_equivalent(obj, argv, fallback=True)
+
+    def test_unsupported_spec(self):
+        spec = {'description': '', 'arguments': [('--files', {'nargs': '+'})]}
+        self.assertTrue(fastpath.compile_spec(spec) is None)
+
+
+class TestFastDecorator(unittest.TestCase):
+    def setUp(self):
+        called = mock.MagicMock()
+        self.function_called = called
+
+        @easyargs(fast=True)
+        def main(name, count=1, greeting='Hello'):
+            called(name, count, greeting)
+            return count
+
+        self.parser = main
+
+    @mock.patch('sys.argv', [__name__, 'Joe', '--count', '2'])
+    def test_argparse_not_used(self):
+        with mock.patch.object(parsers, 'create_base_parser') as create_base_parser:
+            self.assertEqual(self.parser(), 2)
+
+        create_base_parser.assert_not_called()
+        self.function_called.assert_called_with('Joe', 2, 'Hello')
+
+    @mock.patch('sys.argv', [__name__, 'Joe', '--cou', '2'])
+    def test_falls_back_to_argparse(self):
+        self.assertEqual(self.parser(), 2)
+        self.function_called.assert_called_with('Joe', 2, 'Hello')
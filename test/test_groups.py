@@ -0,0 +1,160 @@
+from __future__ import print_function
+
+import enum
+import sys
+import unittest
+import mock
+import six
+
+import easyargs
+from easyargs import groups
+from helpers import FileTestCase, run
+
+REMOTE_MODULE = '''
+class Remote(object):
+    """Manage remotes"""
+
+    def add(self, name, url):
+        """Add a remote"""
+        return 'add', name, url
+
+    def remove(self, name):
+        """Remove a remote"""
+        return 'remove', name
+'''
+
+
+class TestNestedGroups(unittest.TestCase):
+    def setUp(self):
+        created = self.created = mock.MagicMock()
+
+        @easyargs(groups=True)
+        class Tool(object):
+            """A tool"""
+
+            def status(self):
+                """Show the status"""
+                return 'status'
+
+            class config(object):
+                """Read and write the configuration"""
+
+                def __init__(self):
+                    created()
+
+                def get(self, key):
+                    """Get a value"""
+                    return 'get', key
+
+                class backup(object):
+                    """Back up the configuration"""
+
+                    def save(self, path='backup.cfg'):
+                        return 'save', path
+
+            # Assigned classes are not groups
+            error = ValueError
+
+        self.Tool = Tool
+
+    def test_nested_command(self):
+        self.assertEqual(run(self.Tool, ['config', 'get', 'name']), ('get', 'name'))
+        self.assertEqual(self.created.call_count, 1)
+
+    def test_deeply_nested_command(self):
+        self.assertEqual(run(self.Tool, ['config', 'backup', 'save', '--path', 'x']), ('save', 'x'))
+
+    def test_help(self):
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertRaises(SystemExit, run, self.Tool, ['-h'])
+        self.assertTrue('{status,config}' in stdout.getvalue())
+        self.assertTrue('Read and write the configuration' in stdout.getvalue())
+
+    def test_method_is_still_called(self):
+        self.assertEqual(run(self.Tool, ['status']), 'status')
+
+
+class TestNestedClassesThatAreNotGroups(unittest.TestCase):
+    def setUp(self):
+        class Tool(object):
+            def status(self):
+                return 'status'
+
+            class Level(enum.Enum):
+                debug = 10
+
+            class Error(Exception):
+                pass
+
+            class Settings(object):
+                timeout = 10
+
+            class remote(object):
+                def show(self):
+                    return 'show'
+
+        self.Tool = Tool
+
+    def test_opt_in(self):
+        with mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertRaises(SystemExit, run, easyargs(self.Tool), ['-h'])
+        self.assertTrue('{status}' in stdout.getvalue())
+
+    def test_only_classes_with_commands(self):
+        found = groups.find_groups(self.Tool, lambda name: not name.startswith('_'), True)
+        self.assertEqual([group.name for group in found], ['remote'])
+
+
+class TestLazyGroups(FileTestCase):
+    def setUp(self):
+        super(TestLazyGroups, self).setUp()
+        self.write('easyargs_remote_plugin.py', REMOTE_MODULE)
+        sys.path.insert(0, self.directory)
+
+    def tearDown(self):
+        sys.path.remove(self.directory)
+        sys.modules.pop('easyargs_remote_plugin', None)
+        super(TestLazyGroups, self).tearDown()
+
+    def test_registered_group_is_imported_when_selected(self):
+        @easyargs(groups={'remote': 'easyargs_remote_plugin:Remote'})
+        class Tool(object):
+            def status(self):
+                return 'status'
+
+        self.assertEqual(run(Tool, ['status']), 'status')
+        self.assertFalse('easyargs_remote_plugin' in sys.modules)
+
+        self.assertEqual(run(Tool, ['remote', 'add', 'origin', 'url']), ('add', 'origin', 'url'))
+        self.assertTrue('easyargs_remote_plugin' in sys.modules)
+
+    def test_plugins(self):
+        def deploy(target, dry_run=False):
+            """Deploy the tool"""
+            return target, dry_run
+
+        load = mock.MagicMock(return_value=deploy)
+        with mock.patch.object(groups, '_entry_points', return_value=[('deploy', load)]) as found:
+            @easyargs(plugins='tool.commands')
+            class Tool(object):
+                def status(self):
+                    return 'status'
+
+            self.assertEqual(run(Tool, ['status']), 'status')
+            load.assert_not_called()
+
+            self.assertEqual(run(Tool, ['deploy', 'prod', '--dry_run']), ('prod', True))
+            self.assertEqual(load.call_count, 1)
+
+        found.assert_called_with('tool.commands')
+
+    def test_first_group_wins(self):
+        class Tool(object):
+            class remote(object):
+                def show(self):
+                    pass
+
+        found = groups.find_groups(Tool, lambda name: not name.startswith('_'),
+                                   {'remote': 'easyargs_remote_plugin:Remote'})
+        self.assertEqual([group.name for group in found], ['remote'])
+        self.assertTrue(found[0].load() is Tool.remote)
@@ -54,3 +54,67 @@ class TestHelpText(unittest.TestCase):
             'count': 'How many times to greet them.',
             'greeting': 'Which greeting to use.'
         })
+
+    def test_google_style(self):
+        input = """A simple greeting program
+
+    Args:
+        name (str): Name to greet.
+        count: How many times
+            to greet them.
+        greeting:  Which greeting to use.
+
+    Returns:
+        Nothing at all
+    """
+        main_text, params_help = parser_help_text(input)
+        self.assertEqual(main_text, 'A simple greeting program')
+        self.assertEqual(params_help, {
+            'name': 'Name to greet.',
+            'count': 'How many times to greet them.',
+            'greeting': 'Which greeting to use.'
+        })
+
+    def test_numpy_style(self):
+        input = """A simple greeting program
+
+    Parameters
+    ----------
+    name : str
+        Name to greet.
+    count : int
+        How many times
+        to greet them.
+    greeting
+        Which greeting to use.
+
+    Returns
+    -------
+    None
+    """
+        main_text, params_help = parser_help_text(input)
+        self.assertEqual(main_text, 'A simple greeting program')
+        self.assertEqual(params_help, {
+            'name': 'Name to greet.',
+            'count': 'How many times to greet them.',
+            'greeting': 'Which greeting to use.'
+        })
+
+    def test_text_after_google_section(self):
+        input = """A simple greeting program
+    Args:
+        name: Name to greet.
+    It is very simple
+    """
+        main_text, params_help = parser_help_text(input)
+        self.assertEqual(main_text, 'A simple greeting program It is very simple')
+        self.assertEqual(params_help, {'name': 'Name to greet.'})
+
+    def test_result_is_not_shared(self):
+        input = """A simple greeting program
+    :param name:      Name to greet.
+    """
+        main_text, params_help = parser_help_text(input)
+        params_help['name'] = 'Changed'
+        main_text, params_help = parser_help_text(input)
+        self.assertEqual(params_help, {'name': 'Name to greet.'})
@@ -0,0 +1,97 @@
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+import unittest
+
+from helpers import ROOT
+
+# Modules that should only be imported once a decorated object is called
+HEAVY_MODULES = ('argparse', 'inspect', 're', 'gettext', 'pickle', 'tempfile')
+
+DECORATE = '''
+import easyargs
+
+@easyargs
+def main(name, count=1):
+    pass
+'''
+
+
+def import_times(code):
+    """Runs code with -X importtime and returns a list of (depth, cumulative, module)"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', code],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               env=env, universal_newlines=True)
+    stdout, stderr = process.communicate()
+    assert process.returncode == 0, stderr
+
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((depth, int(cumulative), module))
+    return imports
+
+
+def imported_by(imports, package):
+    """Returns the modules imported while importing package.  importtime lists
+    the modules imported by a package before the package itself."""
+    for idx, (depth, cumulative, module) in enumerate(imports):
+        if module == package:
+            break
+    else:
+        raise AssertionError('{p} was not imported'.format(p=package))
+
+    modules = []
+    for child_depth, _, child in reversed(imports[:idx]):
+        if child_depth <= depth:
+            break
+        modules.append(child)
+    return modules
+
+
+@unittest.skipIf(sys.version_info < (3, 7), '-X importtime needs python 3.7')
+class TestImportTime(unittest.TestCase):
+    def test_import_is_light(self):
+        imports = import_times('import easyargs')
+        modules = imported_by(imports, 'easyargs')
+        for heavy in HEAVY_MODULES:
+            self.assertFalse(heavy in modules, '{m} imported by easyargs'.format(m=heavy))
+
+    def test_decoration_is_light(self):
+        code = DECORATE + '''
+import sys
+for module in {heavy!r}:
+    assert module not in sys.modules or module in {preloaded!r}, module
+'''
+        # Anything the interpreter loads at startup does not count
+        preloaded = [depth_module[2] for depth_module in import_times('pass')]
+        code = code.format(heavy=HEAVY_MODULES, preloaded=preloaded)
+        import_times(code)
+
+
+class TestLazySubmodules(unittest.TestCase):
+    def test_parsers_attribute(self):
+        code = '''
+import sys
+import easyargs
+assert 'easyargs.parsers' not in sys.modules
+assert easyargs.parsers is sys.modules['easyargs.parsers']
+assert easyargs.parsers.handle_parser
+'''
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        process = subprocess.Popen([sys.executable, '-c', code], stderr=subprocess.PIPE,
+                                   env=env, universal_newlines=True)
+        _, stderr = process.communicate()
+        self.assertEqual(process.returncode, 0, stderr)
+
+    def test_missing_attribute(self):
+        import easyargs
+        self.assertRaises(AttributeError, getattr, easyargs, 'missing')
+        self.assertFalse(hasattr(easyargs, '__wrapped__'))
@@ -0,0 +1,88 @@
+from __future__ import print_function
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+import mock
+
+import easyargs
+from easyargs import instrumentation
+from helpers import FileTestCase, ROOT
+
+
+class TestInstrumentationHooks(unittest.TestCase):
+    def setUp(self):
+        self.recorder = instrumentation.Recorder()
+        instrumentation.add_hook(self.recorder)
+
+    def tearDown(self):
+        instrumentation.remove_hook(self.recorder)
+
+    def phases(self):
+        return [timing.name for timing in self.recorder.timings]
+
+    @mock.patch('sys.argv', [__name__, 'Joe'])
+    def test_function_phases(self):
+        @easyargs
+        def main(name, count=1):
+            pass
+
+        main()
+        self.assertEqual(self.phases(), ['create_base_parser', 'function_parser',
+                                         'parse', 'dispatch', 'handle_parser', 'decorated'])
+        for timing in self.recorder.timings:
+            self.assertTrue(timing.duration >= 0)
+
+    @mock.patch('sys.argv', [__name__, 'clone', 'repo'])
+    def test_class_phases(self):
+        @easyargs
+        class GitClone(object):
+            def clone(self, src):
+                pass
+
+        GitClone()
+        self.assertTrue('class_parser' in self.phases())
+
+    def test_no_timing_without_hooks(self):
+        instrumentation.remove_hook(self.recorder)
+        try:
+            self.assertTrue(isinstance(instrumentation.phase('parse'), instrumentation._NullPhase))
+        finally:
+            instrumentation.add_hook(self.recorder)
+
+    def test_chrome_trace(self):
+        with instrumentation.phase('outer'):
+            with instrumentation.phase('inner'):
+                pass
+
+        events = self.recorder.chrome_trace()['traceEvents']
+        self.assertEqual([event['name'] for event in events], ['inner', 'outer'])
+        self.assertEqual(events[0]['ph'], 'X')
+        self.assertTrue(events[1]['ts'] <= events[0]['ts'])
+
+
+class TestProfileEnvironment(FileTestCase):
+    def run_profiled(self, profile):
+        script = os.path.join(ROOT, 'examples', 'simple_test.py')
+        env = dict(os.environ, PYTHONPATH=ROOT, EASYARGS_PROFILE=profile)
+        process = subprocess.Popen([sys.executable, script, 'World'],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   env=env, universal_newlines=True)
+        stdout, stderr = process.communicate()
+        self.assertEqual(process.returncode, 0, stderr)
+        return stdout, stderr
+
+    def test_summary_on_stderr(self):
+        stdout, stderr = self.run_profiled('1')
+        self.assertTrue('Hello World!' in stdout)
+        self.assertTrue('function_parser' in stderr)
+        self.assertTrue('decorated' in stderr)
+
+    def test_chrome_trace_file(self):
+        trace = os.path.join(self.directory, 'trace.json')
+        self.run_profiled(trace)
+        with open(trace) as trace_file:
+            events = json.load(trace_file)['traceEvents']
+        self.assertTrue('handle_parser' in [event['name'] for event in events])
@@ -0,0 +1,120 @@
+from __future__ import print_function
+
+import threading
+import unittest
+import mock
+import six
+
+import easyargs
+from easyargs import invocation, parsers
+
+
+@easyargs
+def greet(name, count=1, greeting='Hello'):
+    """Greets somebody"""
+    if count < 0:
+        raise ValueError('count must not be negative')
+    return '{g} {n}'.format(g=greeting, n=name) * count
+
+
+class TestInvoke(unittest.TestCase):
+    @mock.patch('sys.argv', ['prog', '--not-an-option'])
+    def test_result(self):
+        result = easyargs.invoke(greet, ['Joe', '--count', '2'])
+        self.assertTrue(result.ok)
+        self.assertEqual(result.value, 'Hello JoeHello Joe')
+        self.assertEqual(result.status, 0)
+
+    def test_parse_error(self):
+        result = easyargs.invoke(greet, ['Joe', '--count', 'many'])
+        self.assertEqual(result.status, 2)
+        self.assertTrue("invalid int value: 'many'" in result.error)
+        self.assertTrue(result.stderr.getvalue().startswith('usage:'))
+        self.assertEqual(result.stdout.getvalue(), '')
+
+    def test_help(self):
+        stdout = six.StringIO()
+        result = easyargs.invoke(greet, ['-h'], stdout=stdout)
+        self.assertEqual(result.status, 0)
+        self.assertEqual(result.error, None)
+        self.assertTrue('Greets somebody' in stdout.getvalue())
+
+    def test_exception(self):
+        result = easyargs.invoke(greet, ['Joe', '--count', '-1'])
+        self.assertEqual(result.status, 1)
+        self.assertTrue(isinstance(result.exception, ValueError))
+
+    def test_messages_not_redirected_outside_invoke(self):
+        with mock.patch('sys.argv', ['prog', 'Joe', '--count', 'many']), \
+                mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            self.assertRaises(SystemExit, greet)
+        self.assertTrue('invalid int value' in stderr.getvalue())
+
+    def test_undecorated_objects_decorated_once(self):
+        class Tool(object):
+            def add(self, a=0, b=0):
+                return a + b
+
+        with mock.patch.object(parsers, 'class_parser', wraps=parsers.class_parser) as class_parser:
+            self.assertEqual(easyargs.invoke(Tool, ['add', '-a', '1', '-b', '2']).value, 3)
+            self.assertEqual(easyargs.invoke(Tool, ['add', '-a', '3']).value, 3)
+        self.assertEqual(class_parser.call_count, 1)
+
+    def test_fast_path(self):
+        @easyargs(fast=True)
+        def add(a, b=0):
+            return int(a) + b
+
+        with mock.patch.object(parsers, 'spec_parser') as spec_parser:
+            self.assertEqual(easyargs.invoke(add, ['1', '-b', '2']).value, 3)
+        spec_parser.assert_not_called()
+
+        # Errors still come from argparse
+        self.assertEqual(easyargs.invoke(add, ['1', '-b', 'x']).status, 2)
+
+
+class TestThreads(unittest.TestCase):
+    def test_many_threads(self):
+        created = mock.MagicMock()
+
+        @easyargs(lazy=True, groups=True)
+        class Calculator(object):
+            def __init__(self):
+                created()
+
+            def add(self, a, b=0):
+                return int(a) + b
+
+            def negate(self, a):
+                return -int(a)
+
+            class convert(object):
+                def hex(self, value=0):
+                    return hex(value)
+
+        errors = []
+
+        def work(offset):
+            for idx in range(100):
+                value = offset + idx
+                checks = [(['add', str(value), '-b', '1'], value + 1),
+                          (['negate', str(value)], -value),
+                          (['convert', 'hex', '--value', str(value)], hex(value))]
+                for argv, expected in checks:
+                    result = easyargs.invoke(Calculator, argv)
+                    if result.value != expected:
+                        errors.append((argv, result))
+
+                result = easyargs.invoke(Calculator, ['add', 'x', '-b', 'y'])
+                if result.status != 2:
+                    errors.append(result)
+
+        threads = [threading.Thread(target=work, args=(offset * 1000,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(created.call_count, 1)
+        self.assertEqual(invocation.current(), None)
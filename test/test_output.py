@@ -0,0 +1,191 @@
+from __future__ import print_function
+
+import errno
+import io
+import os
+import subprocess
+import sys
+import unittest
+import mock
+import six
+
+import easyargs
+from easyargs import argtypes, output
+from helpers import FileTestCase, ROOT
+
+HEAD_SCRIPT = '''
+import sys
+import easyargs
+
+@easyargs
+def main(count):
+    count = int(count)
+    written = 0
+    try:
+        for idx in range(count):
+            yield idx
+            written += 1
+    finally:
+        if written < count:
+            sys.stderr.write('closed early\\n')
+
+main()
+'''
+
+
+class BinaryStdout(io.TextIOWrapper):
+    """A text stream over a BytesIO that counts the writes to its buffer"""
+
+    def __init__(self):
+        self.raw_writes = []
+        buffer = io.BytesIO()
+        original_write = buffer.write
+
+        def write(data):
+            self.raw_writes.append(bytes(data))
+            return original_write(data)
+
+        buffer.write = write
+        super(BinaryStdout, self).__init__(buffer, encoding='utf-8')
+
+    def output(self):
+        return b''.join(self.raw_writes).decode('utf-8')
+
+
+class BrokenPipe(object):
+    def __init__(self):
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        raise IOError(errno.EPIPE, 'Broken pipe')
+
+    def flush(self):
+        pass
+
+
+class TestRecordWriter(unittest.TestCase):
+    def test_records(self):
+        stream = six.StringIO()
+        self.assertTrue(output.write_records(['a', 1, b'c', (1, 2)], stream, flush='never'))
+        self.assertEqual(stream.getvalue(), 'a\n1\nc\n(1, 2)\n')
+
+    def test_written_to_binary_buffer_in_chunks(self):
+        stream = BinaryStdout()
+        count = 3 * output.BATCH_SIZE
+        output.write_records((str(idx) for idx in range(count)), stream, buffer_size=20000,
+                             flush='never')
+        self.assertEqual(stream.output(), ''.join('{i}\n'.format(i=idx) for idx in range(count)))
+        # Each batch of records is about 4800 bytes
+        self.assertEqual(len(stream.raw_writes), 1)
+
+        stream = BinaryStdout()
+        output.write_records((str(idx) for idx in range(count)), stream, buffer_size=1000,
+                             flush='never')
+        self.assertEqual(len(stream.raw_writes), 3)
+
+    def test_flush_policies(self):
+        for flush, writes in (('line', 10), (4, 3), ('never', 1)):
+            stream = BinaryStdout()
+            output.write_records(range(10), stream, flush=flush)
+            self.assertEqual(len(stream.raw_writes), writes, flush)
+
+        terminal = BinaryStdout()
+        terminal.isatty = lambda: True
+        output.write_records(range(10), terminal)
+        self.assertEqual(len(terminal.raw_writes), 10)
+
+        self.assertRaises(ValueError, output.RecordWriter, six.StringIO(), flush='often')
+
+    def test_broken_pipe_closes_generator(self):
+        closed = []
+
+        def records():
+            try:
+                for idx in range(100):
+                    yield idx
+            finally:
+                closed.append(True)
+
+        stream = BrokenPipe()
+        self.assertFalse(output.write_records(records(), stream, flush='line'))
+        self.assertEqual(closed, [True])
+        self.assertEqual(stream.writes, 1)
+
+    def test_records_before_an_exception_are_written(self):
+        def records():
+            for idx in range(5):
+                yield idx
+            raise RuntimeError('failed')
+
+        stream = BinaryStdout()
+        self.assertRaises(RuntimeError, output.write_records, records(), stream, flush='never')
+        self.assertEqual(stream.output(), '0\n1\n2\n3\n4\n')
+
+        @easyargs
+        def main(count=5):
+            for idx in range(count):
+                yield idx
+            raise RuntimeError('failed')
+
+        with mock.patch('sys.argv', ['prog']), \
+                mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertRaises(RuntimeError, main)
+        self.assertEqual(stdout.getvalue(), '0\n1\n2\n3\n4\n')
+
+    def test_is_iterator(self):
+        self.assertTrue(output.is_iterator(iter([1])))
+        self.assertTrue(output.is_iterator(idx for idx in range(3)))
+        self.assertFalse(output.is_iterator([1]))
+        self.assertFalse(output.is_iterator('abc'))
+        self.assertFalse(output.is_iterator(six.StringIO()))
+
+
+class TestGeneratorCommands(FileTestCase):
+    def test_generator_written_to_stdout(self):
+        @easyargs(flush='never')
+        def main(count):
+            for idx in range(int(count)):
+                yield idx * idx
+
+        with mock.patch('sys.argv', ['prog', '4']), \
+                mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            self.assertEqual(main(), None)
+        self.assertEqual(stdout.getvalue(), '0\n1\n4\n9\n')
+
+    def test_files_closed_after_generator(self):
+        path = self.write('words.txt', 'one\ntwo\n')
+        streams = []
+
+        @easyargs(fast=True)
+        def main(lines=argtypes.Stream):
+            streams.append(lines)
+            for line in lines:
+                yield line.upper()
+
+        with mock.patch('sys.argv', ['prog', path]), \
+                mock.patch('sys.stdout', new_callable=six.StringIO) as stdout:
+            main()
+        self.assertEqual(stdout.getvalue(), 'ONE\nTWO\n')
+        self.assertEqual(streams[0]._file, None)
+
+    def test_invoke_returns_generator(self):
+        @easyargs
+        def main(count):
+            return (idx for idx in range(int(count)))
+
+        self.assertEqual(list(easyargs.invoke(main, ['3']).value), [0, 1, 2])
+
+    @unittest.skipIf(not hasattr(os, 'fork'), 'needs a pipe that can be closed early')
+    def test_reader_goes_away(self):
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        process = subprocess.Popen([sys.executable, '-c', HEAD_SCRIPT, '10000000'],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        self.assertEqual(process.stdout.readline(), b'0\n')
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        process.wait()
+
+        self.assertEqual(stderr, b'closed early\n')
+        self.assertEqual(process.returncode, 0)
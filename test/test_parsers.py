@@ -339,3 +339,121 @@ class TestValueReturnedWhenNotUsingAutoCall(unittest.TestCase):
         from easyargs import parsers
         result = parsers.handle_parser(parser)
         self.assertEqual(result, 5)
+
+
+class TestLazyClassParser(unittest.TestCase):
+    def setUp(self):
+        called = mock.MagicMock()
+        self.function_called = called
+
+        @easyargs(lazy=True)
+        class GitClone(object):
+            """A git clone"""
+
+            def clone(self, src, _dest):
+                """Clone a repository"""
+                called(src, _dest)
+
+            def commit(self, a=False, m=None, amend=False):
+                """Commit a change to the index"""
+                called(a, m, amend)
+
+        self.parser = GitClone
+
+    def test_help_text(self):
+        stdout, stderr = parser_test_helper(self.parser,
+                                            self.function_called,
+                                            ['-h'],
+                                            None,
+                                            True)
+        self.assertTrue('usage: test_parsers [-h] {clone,commit}' in stdout)
+        self.assertTrue('clone         Clone a repository' in stdout)
+        self.assertTrue('commit        Commit a change to the index' in stdout)
+
+    def test_only_selected_command_is_built(self):
+        from easyargs import parsers
+        with mock.patch.object(parsers, '_method_parser',
+                               wraps=parsers._method_parser) as method_parser:
+            parser_test_helper(self.parser,
+                               self.function_called,
+                               ['commit', '-am', 'Foo'],
+                               (True, 'Foo', False),
+                               False)
+
+        self.assertEqual(method_parser.call_count, 1)
+        self.assertEqual(method_parser.call_args[0][0].__name__, 'commit')
+
+    def test_unknown_command(self):
+        stdout, stderr = parser_test_helper(self.parser,
+                                            self.function_called,
+                                            ['push'],
+                                            None,
+                                            True)
+        self.assertTrue('invalid choice' in stderr)
+
+
+class TestDeferredInstantiation(unittest.TestCase):
+    def setUp(self):
+        self.created = created = mock.MagicMock()
+        self.evaluated = evaluated = mock.MagicMock()
+
+        class Base(object):
+            def status(self, verbose=False):
+                """Show the status"""
+                return 'base'
+
+            def log(self):
+                """Show the log"""
+
+        @easyargs
+        class Tool(Base):
+            """A tool with an expensive __init__"""
+
+            def __init__(self):
+                created()
+
+            @property
+            def connection(self):
+                evaluated()
+
+            def status(self, verbose=False):
+                """Show the status"""
+                return verbose
+
+            @classmethod
+            def version(cls, short=False):
+                """Show the version"""
+                return cls.__name__, short
+
+            @staticmethod
+            def helper():
+                pass
+
+        self.Tool = Tool
+
+    def test_help_does_not_instantiate(self):
+        stdout, stderr = parser_test_helper(self.Tool, mock.MagicMock(), ['-h'], None, True)
+        self.assertTrue('{log,status,version}' in stdout)
+        self.created.assert_not_called()
+        self.evaluated.assert_not_called()
+
+    def test_bad_arguments_do_not_instantiate(self):
+        parser_test_helper(self.Tool, mock.MagicMock(), ['status', '--unknown'], None, True)
+        self.created.assert_not_called()
+
+    def test_instantiated_once_dispatched(self):
+        with mock.patch('sys.argv', [__name__, 'status', '--verbose']):
+            self.assertEqual(self.Tool(), True)
+        self.assertEqual(self.created.call_count, 1)
+        self.evaluated.assert_not_called()
+
+    def test_class_method(self):
+        with mock.patch('sys.argv', [__name__, 'version', '--short']):
+            self.assertEqual(self.Tool(), ('Tool', True))
+
+    def test_method_table(self):
+        from easyargs import parsers
+        methods = parsers.method_table(self.Tool.__wrapped__)
+        self.assertEqual([name for name, function in methods], ['log', 'status', 'version'])
+        # The subclass overrides the method from the base class
+        self.assertTrue(dict(methods)['status'] is vars(self.Tool.__wrapped__)['status'])
@@ -0,0 +1,115 @@
+from __future__ import print_function
+
+import io
+import os
+import mock
+import six
+
+import easyargs
+from easyargs import responsefiles
+from helpers import FileTestCase
+
+
+class TestIterArguments(FileTestCase):
+    def test_quoted(self):
+        path = self.write('args', b'one two\n"three four" \'five\'  # a comment\n\nsix\\ seven\r\n')
+        self.assertEqual(list(responsefiles.iter_arguments(path)),
+                         ['one', 'two', 'three four', 'five', 'six seven'])
+
+    def test_nul_separated(self):
+        path = self.write('args', b'a b\0c\nd\0\0e\0')
+        self.assertEqual(list(responsefiles.iter_arguments(path)), ['a b', 'c\nd', 'e'])
+
+    def test_small_chunks(self):
+        quoted = self.write('quoted', b'alpha beta\ngamma "delta epsilon"\nzeta')
+        nul = self.write('nul', b'alpha\0beta gamma\0delta')
+        with mock.patch.object(responsefiles, 'CHUNK_SIZE', 3):
+            self.assertEqual(list(responsefiles.iter_arguments(quoted)),
+                             ['alpha', 'beta', 'gamma', 'delta epsilon', 'zeta'])
+        with mock.patch.object(responsefiles, 'CHUNK_SIZE', 8):
+            self.assertEqual(list(responsefiles.iter_arguments(nul)),
+                             ['alpha', 'beta gamma', 'delta'])
+
+    def test_nested(self):
+        inner = self.write('inner', b'b c')
+        outer = self.write('outer', 'a @{i} d'.format(i=inner).encode('utf-8'))
+        self.assertEqual(list(responsefiles.iter_arguments(outer)), ['a', 'b', 'c', 'd'])
+
+    def test_stdin(self):
+        stdin = mock.MagicMock()
+        stdin.buffer = io.BytesIO(b'x\0y\0')
+        with mock.patch('sys.stdin', stdin):
+            self.assertEqual(list(responsefiles.iter_arguments('-')), ['x', 'y'])
+
+
+class TestResponseFileParser(FileTestCase):
+    def test_expanded_into_argv(self):
+        path = self.write('args', b'World --count 2\n--greeting "Good day"')
+
+        @easyargs(response_files=True, fast=True)
+        def main(name, count=1, greeting='Hello'):
+            return name, count, greeting
+
+        with mock.patch('sys.argv', ['prog', '@' + path]):
+            self.assertEqual(main(), ('World', 2, 'Good day'))
+
+    def test_sub_command(self):
+        path = self.write('args', b'-m "A message"')
+
+        @easyargs(response_files=True)
+        class Git(object):
+            def commit(self, a=False, m=None):
+                return a, m
+
+        with mock.patch('sys.argv', ['prog', 'commit', '-a', '@' + path]):
+            self.assertEqual(Git(), (True, 'A message'))
+
+    def test_missing_file(self):
+        @easyargs(response_files=True)
+        def main(files=list):
+            pass
+
+        with mock.patch('sys.argv', ['prog', '@' + os.path.join(self.directory, 'missing')]), \
+                mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            self.assertRaises(SystemExit, main)
+        self.assertTrue('No such file' in stderr.getvalue())
+
+    def test_unclosed_quote(self):
+        path = self.write('args', b'a.txt "b.txt\n')
+
+        @easyargs(response_files=True)
+        def main(files=list):
+            pass
+
+        with mock.patch('sys.argv', ['prog', '@' + path]), \
+                mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            with self.assertRaises(SystemExit) as context:
+                main()
+        self.assertEqual(context.exception.code, 2)
+        self.assertTrue('No closing quotation' in stderr.getvalue())
+
+    def test_lazy_list(self):
+        path = self.write('files', b'b.txt\0c.txt\0')
+
+        @easyargs(response_files='lazy')
+        def main(files=list, verbose=False):
+            return files
+
+        with mock.patch('sys.argv', ['prog', 'a.txt', '@' + path, '--verbose']), \
+                mock.patch.object(responsefiles, 'iter_arguments',
+                                  wraps=responsefiles.iter_arguments) as iter_arguments:
+            files = main()
+            iter_arguments.assert_not_called()
+            self.assertTrue(isinstance(files, responsefiles.LazyArguments))
+            self.assertEqual(list(files), ['a.txt', 'b.txt', 'c.txt'])
+            self.assertRaises(TypeError, len, files)
+
+    def test_lazy_needs_list_argument(self):
+        @easyargs(response_files='lazy')
+        def main(name):
+            pass
+
+        with mock.patch('sys.argv', ['prog', '@names']), \
+                mock.patch('sys.stderr', new_callable=six.StringIO) as stderr:
+            self.assertRaises(SystemExit, main)
+        self.assertTrue('response files can only be used for list arguments' in stderr.getvalue())
@@ -0,0 +1,94 @@
+from __future__ import print_function
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import unittest
+
+from helpers import FileTestCase, ROOT
+
+CLIENT = os.path.join(ROOT, 'easyargs', 'client.py')
+
+
+@unittest.skipIf(not hasattr(socket, 'AF_UNIX') or sys.version_info < (3, 3),
+                 'the server needs Unix sockets and python 3.3')
+class TestServer(FileTestCase):
+    def setUp(self):
+        super(TestServer, self).setUp()
+        self.socket = os.path.join(self.directory, 'server.sock')
+        self.shim = os.path.join(self.directory, 'shim')
+
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, 'examples')]))
+        self.server = subprocess.Popen([sys.executable, '-m', 'easyargs', 'serve', 'simple_test:main',
+                                        '--socket', self.socket, '--shim', self.shim],
+                                       stderr=subprocess.PIPE, env=env)
+
+        for _ in range(100):
+            if os.path.exists(self.socket):
+                break
+            time.sleep(0.05)
+        else:
+            self.fail('server did not start')
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.wait()
+        self.server.stderr.close()
+        super(TestServer, self).tearDown()
+
+    def run_client(self, command):
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   universal_newlines=True)
+        stdout, stderr = process.communicate()
+        return process.returncode, stdout, stderr
+
+    def test_command_output_and_status(self):
+        status, stdout, stderr = self.run_client([sys.executable, CLIENT, self.socket,
+                                                  'World', '--count', '2'])
+        self.assertEqual(status, 0)
+        self.assertEqual(stdout, 'Hello World!\nHello World!\n')
+
+    def test_usage_error(self):
+        status, stdout, stderr = self.run_client([sys.executable, CLIENT, self.socket])
+        self.assertEqual(status, 2)
+        self.assertTrue('usage: main [-h]' in stderr)
+
+    def test_shim(self):
+        status, stdout, stderr = self.run_client([self.shim, 'Shim', '--greeting', 'Hi'])
+        self.assertEqual(status, 0)
+        self.assertEqual(stdout, 'Hi Shim!\n')
+
+    def test_socket_removed_on_exit(self):
+        self.server.terminate()
+        self.server.wait()
+        self.assertFalse(os.path.exists(self.socket))
+
+
+@unittest.skipIf(not hasattr(socket, 'AF_UNIX') or sys.version_info < (3, 3),
+                 'the server needs Unix sockets and python 3.3')
+class TestSocketPath(FileTestCase):
+    def test_regular_file_is_not_removed(self):
+        path = self.write('notes.txt', 'keep me')
+
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, 'examples')]))
+        process = subprocess.Popen([sys.executable, '-m', 'easyargs', 'serve', 'simple_test:main',
+                                    '--socket', path], stderr=subprocess.PIPE, env=env,
+                                   universal_newlines=True)
+        stderr = process.communicate()[1]
+
+        self.assertEqual(process.returncode, 2)
+        self.assertTrue('notes.txt exists and is not a socket' in stderr)
+        with open(path) as f:
+            self.assertEqual(f.read(), 'keep me')
+
+    def test_socket_detection(self):
+        from easyargs import server
+
+        path = os.path.join(self.directory, 'server.sock')
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        self.assertTrue(server._is_socket(path))
+        self.assertEqual(server._is_socket(os.path.join(self.directory, 'missing')), None)